@@ -0,0 +1,43 @@
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from app.core.config import settings
+from app.infrastructure.stockfish.pools import Workload
+from app.services.admission_service import (
+    AdmissionController,
+    AdmissionRejected,
+)
+
+
+def admission_for(request: Request, workload: Workload) -> AdmissionController:
+    return request.app.state.admission[workload]
+
+
+def client_key(request: Request) -> str:
+    """
+    Tenant used for fair queuing: the client header, else the address.
+    """
+    client = request.headers.get(settings.ADMISSION_CLIENT_HEADER)
+    if client:
+        return client
+
+    return request.client.host if request.client else "unknown"
+
+
+def max_wait(deadline_ms: Optional[int] = None) -> float:
+    """
+    Longest useful engine wait: never past the request's own deadline.
+    """
+    if deadline_ms is None:
+        return settings.ADMISSION_MAX_WAIT
+
+    return min(settings.ADMISSION_MAX_WAIT, deadline_ms / 1000)
+
+
+def too_busy(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
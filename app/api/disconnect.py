@@ -0,0 +1,80 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+
+T = TypeVar("T")
+
+# nginx's "client closed request"; never seen by the departed client
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """
+    Return once the client has gone away. The body must already be
+    read: every later ASGI message is the disconnect.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+def count_cancellation(request: Request, route: str) -> None:
+    request.app.state.cancellations[route] += 1
+
+
+async def cancel_on_disconnect(
+    request: Request,
+    route: str,
+    awaitable: Awaitable[T],
+) -> T:
+    """
+    Await `awaitable`, cancelling it as soon as the client disconnects.
+    Cancellation stops the running engine search and returns its engine
+    to the pool instead of finishing work nobody will read.
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.create_task(wait_for_disconnect(request))
+
+    try:
+        await asyncio.wait(
+            {work, watcher},
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        disconnected = not work.done()
+    finally:
+        if not work.done():
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+        watcher.cancel()
+
+    if disconnected:
+        count_cancellation(request, route)
+        raise HTTPException(
+            status_code=CLIENT_CLOSED_REQUEST,
+            detail="Client disconnected",
+        )
+
+    return work.result()
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that calls `on_close` however the response ends:
+    body sent, client gone mid-body, or gone before the body started.
+    In the last case the body generator never runs, so its own finally
+    cannot release what was taken for it (an admission slot, say).
+    """
+
+    def __init__(self, content, on_close: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
@@ -1,43 +1,86 @@
-from fastapi import APIRouter, HTTPException, Request
+import asyncio
+import functools
+import io
+import json
+import math
+import tempfile
+from typing import AsyncIterator, List, Optional, Sequence
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.admission import admission_for, client_key, max_wait, too_busy
+from app.api.disconnect import (
+    ClosingStreamingResponse,
+    cancel_on_disconnect,
+    count_cancellation,
+)
 from app.schemas.analysis import (
     AnalysisResponseSchema,
+    AnalysisStreamSummarySchema,
+    BatchGameResultSchema,
     MoveAnalysisSchema,
     OpeningSchema,
 )
 from app.schemas.analysis_request import AnalysisRequestSchema
+from app.schemas.analysis_job import AnalysisJobRequestSchema, AnalysisJobSchema
+from app.services.admission_service import AdmissionRejected
 from app.services.analysis_service import AnalysisService
+from app.services.batch_analysis_service import BatchAnalysisService
+from app.services.job_service import AnalysisJob
 from app.services.summary_service import SummaryService
 from app.services.key_move_service import KeyMoveService
 from app.schemas.key_moves import KeyMomentSchema
+from app.domain.analysis_pipeline import AnalysisSnapshot
+from app.domain.enums import JobStatus, QualityTier
+from app.domain.key_moves import KeyMoment
+from app.domain.models import EvaluatedMove
+from app.domain.opening_names import OpeningInfo
+from app.infrastructure.stockfish.pools import Workload
 
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
+# Uploads larger than this are spooled to disk instead of memory
+BATCH_SPOOL_MAX_BYTES = 1024 * 1024
 
-@router.post("", response_model=AnalysisResponseSchema)
-def analyze_game(request: Request, payload: AnalysisRequestSchema):
-    engine_pool = request.app.state.engine_pool
-    analysis_service = AnalysisService(engine_pool)
-    summary_service = SummaryService()
-    key_move_service = KeyMoveService()
 
-    try:
-        # 🔑 IMPORTANT: unpack opening info
-        moves, opening = analysis_service.analyze_pgn(
-            payload.pgn,
-            depth=payload.depth,
-            player_elo=payload.player_elo,
-        )
+def _move_schema(m: EvaluatedMove) -> MoveAnalysisSchema:
+    return MoveAnalysisSchema(
+        move_number=m.move_number,
+        color=m.color,
+        uci=m.uci,
+        san=m.san,
+        eval_before=m.eval_before,
+        eval_after=m.eval_after,
+        eval_loss=m.eval_loss,
+        quality=m.quality.value,
+        is_check=m.is_check,
+        is_checkmate=m.is_checkmate,
+        is_capture=m.is_capture,
+        clock=m.clock,
+        best_move_uci=m.best_move_uci,
+        best_move_san=m.best_move_san,
+        depth=m.depth,
+        stop_reason=m.stop_reason.value if m.stop_reason else None,
+    )
 
-        summary = summary_service.summarize(moves)
-        key_moments = key_move_service.find_key_moments(moves)
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
 
-    except RuntimeError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+
+def _build_response(
+    moves: Sequence[EvaluatedMove],
+    opening: Optional[OpeningInfo],
+    summary: Optional[dict] = None,
+    key_moments: Optional[List[KeyMoment]] = None,
+    quality_tier: QualityTier = QualityTier.FULL,
+) -> AnalysisResponseSchema:
+    if summary is None:
+        summary = SummaryService().summarize(moves)
+    if key_moments is None:
+        key_moments = KeyMoveService().find_key_moments(moves)
 
     return AnalysisResponseSchema(
         opening=(
@@ -48,26 +91,7 @@ def analyze_game(request: Request, payload: AnalysisRequestSchema):
             if opening
             else None
         ),
-        moves=[
-            MoveAnalysisSchema(
-                move_number=m.move_number,
-                color=m.color,
-                uci=m.uci,
-                san=m.san,
-                eval_before=m.eval_before,
-                eval_after=m.eval_after,
-                eval_loss=m.eval_loss,
-                quality=m.quality.value,
-                is_check=m.is_check,
-                is_checkmate=m.is_checkmate,
-                is_capture=m.is_capture,
-                clock=m.clock,
-                best_move_uci=m.best_move_uci,
-                best_move_san=m.best_move_san,
-                
-            )
-            for m in moves
-        ],
+        moves=[_move_schema(m) for m in moves],
         summary=summary,
         key_moments=[
             KeyMomentSchema(
@@ -81,5 +105,294 @@ def analyze_game(request: Request, payload: AnalysisRequestSchema):
             )
             for k in key_moments
         ],
+        quality_tier=quality_tier.value,
+    )
+
+
+def _snapshot_response(snapshot: AnalysisSnapshot) -> AnalysisResponseSchema:
+    """
+    Response from the snapshot's running tallies and key moments,
+    so a resumed analysis does not rescan the whole game.
+    """
+    return _build_response(
+        snapshot.moves,
+        snapshot.opening,
+        summary=SummaryService().summarize_tallies(
+            snapshot.tallies["white"],
+            snapshot.tallies["black"],
+        ),
+        key_moments=KeyMoveService().top_key_moments(snapshot.key_moments),
+        quality_tier=snapshot.quality_tier,
+    )
+
+
+def _job_schema(job: AnalysisJob) -> AnalysisJobSchema:
+    return AnalysisJobSchema(
+        job_id=job.id,
+        status=job.status,
+        priority=job.priority,
+        plies_done=job.plies_done,
+        plies_total=job.plies_total,
+        result=(
+            _build_response(job.moves, job.opening)
+            if job.status == JobStatus.DONE
+            else None
+        ),
+        error=job.error,
+    )
+
+
+@router.post("", response_model=AnalysisResponseSchema)
+async def analyze_game(request: Request, payload: AnalysisRequestSchema):
+    engine_pools = request.app.state.engine_pools
+    analysis_service = AnalysisService(
+        engine_pools,
+        request.app.state.search_service,
+        request.app.state.game_cache,
+    )
+    admit = functools.partial(
+        admission_for(request, Workload.ANALYSIS).admit,
+        client_key(request),
+        max_wait=max_wait(payload.deadline_ms),
+        service_time=(
+            payload.deadline_ms / 1000
+            if payload.deadline_ms is not None
+            else None
+        ),
+    )
+
+    try:
+        # Resumes from a cached prefix when this game was seen before.
+        # Abandoned (engine stopped and released) if the client leaves.
+        snapshot = await cancel_on_disconnect(
+            request,
+            "analysis",
+            analysis_service.analyze_pgn_snapshot(
+                payload.pgn,
+                depth=payload.depth,
+                player_elo=payload.player_elo,
+                deadline_ms=payload.deadline_ms,
+                admit=admit,
+            ),
+        )
+
+        return _snapshot_response(snapshot)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except AdmissionRejected as e:
+        raise too_busy(e)
+
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/stream")
+async def analyze_game_stream(request: Request, payload: AnalysisRequestSchema):
+    """
+    Server-sent events: one "move" event per ply as soon as it is
+    evaluated, then a "summary" event with opening, summary and key
+    moments. Engine failures mid-stream are sent as an "error" event.
 
+    Parsed and admitted before the response starts, so invalid PGN
+    gets a 400 and a saturated pool a 429. The admission slot is given
+    back when the response ends, even if the body never started.
+
+    With deadline_ms every move is evaluated within that budget (from
+    the request's arrival), so move events come once the shallow pass
+    is done.
+    """
+    analysis_service = AnalysisService(
+        request.app.state.engine_pools,
+        request.app.state.search_service,
+    )
+    admission = admission_for(request, Workload.ANALYSIS)
+    deadline = (
+        asyncio.get_running_loop().time() + payload.deadline_ms / 1000
+        if payload.deadline_ms is not None
+        else None
+    )
+
+    try:
+        plan = analysis_service.plan_pgn(payload.pgn)
+        ticket = await admission.enter(
+            client_key(request),
+            plan.search_plies,
+            max_wait(payload.deadline_ms),
+            service_time=(
+                payload.deadline_ms / 1000
+                if payload.deadline_ms is not None
+                else None
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise too_busy(e)
+
+    opening = plan.opening
+    tier = analysis_service.quality_tier()
+    move_stream = analysis_service.iter_moves(
+        plan,
+        payload.depth,
+        payload.player_elo,
+        deadline=deadline,
+        tier=tier,
+    )
+
+    async def events() -> AsyncIterator[str]:
+        moves: List[EvaluatedMove] = []
+
+        try:
+            async for m in move_stream:
+                moves.append(m)
+                yield _sse("move", _move_schema(m).model_dump_json())
+
+        except (ValueError, RuntimeError) as e:
+            yield _sse("error", json.dumps({"detail": str(e)}))
+            return
+
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away: closing the stream stops the search
+            count_cancellation(request, "stream")
+            raise
+
+        finally:
+            try:
+                await move_stream.aclose()
+            finally:
+                admission.leave(ticket)
+
+        response = _build_response(moves, opening, quality_tier=tier)
+        final = AnalysisStreamSummarySchema(
+            opening=response.opening,
+            summary=response.summary,
+            key_moments=response.key_moments,
+            quality_tier=response.quality_tier,
+        )
+        yield _sse("summary", final.model_dump_json())
+
+    return ClosingStreamingResponse(
+        events(),
+        on_close=functools.partial(admission.leave, ticket),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.post("/batch")
+async def analyze_batch(
+    request: Request,
+    depth: Optional[int] = Query(None, description="Stockfish search depth override"),
+    player_elo: int = Query(1200, ge=100, le=3000),
+):
+    """
+    Multi-game PGN as the raw request body (may be sent chunked).
+    Streams one BatchGameResultSchema JSON line per game as it finishes.
+
+    A saturated pool gets a 429 up front. Once accepted every game
+    waits for its own admission slot, however long that takes.
+    """
+    admission = admission_for(request, Workload.ANALYSIS)
+    client = client_key(request)
+    try:
+        admission.check(client, max_wait())
+    except AdmissionRejected as e:
+        raise too_busy(e)
+
+    upload = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+
+    batch_service = BatchAnalysisService(
+        AnalysisService(
+            request.app.state.engine_pools,
+            request.app.state.search_service,
+        ),
+        max_concurrent=request.app.state.engine_pools.get(
+            Workload.ANALYSIS
+        ).size,
+        admit=functools.partial(
+            admission.admit,
+            client,
+            max_wait=math.inf,
+            bounded=False,
+        ),
     )
+
+    async def lines() -> AsyncIterator[str]:
+        pgn_stream = io.TextIOWrapper(upload, encoding="utf-8", errors="replace")
+        results = batch_service.iter_results(pgn_stream, depth, player_elo)
+        try:
+            async for r in results:
+                line = BatchGameResultSchema(
+                    game_index=r.game_index,
+                    headers=r.headers,
+                    result=(
+                        _build_response(r.moves, r.opening)
+                        if r.error is None
+                        else None
+                    ),
+                    error=r.error,
+                )
+                yield line.model_dump_json() + "\n"
+        except (asyncio.CancelledError, GeneratorExit):
+            count_cancellation(request, "batch")
+            raise
+        finally:
+            try:
+                await results.aclose()
+            finally:
+                pgn_stream.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs", response_model=AnalysisJobSchema, status_code=202)
+async def submit_analysis_job(
+    request: Request,
+    payload: AnalysisJobRequestSchema,
+):
+    """
+    Queue a background analysis. A saturated pool gets a 429 up front;
+    the job itself waits for an admission slot when its turn comes.
+    """
+    scheduler = request.app.state.job_scheduler
+    client = client_key(request)
+
+    try:
+        admission_for(request, Workload.ANALYSIS).check(client, max_wait())
+        job = scheduler.submit(
+            payload.pgn,
+            depth=payload.depth,
+            player_elo=payload.player_elo,
+            priority=payload.priority,
+            deadline_ms=payload.deadline_ms,
+            client=client,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise too_busy(e)
+
+    return _job_schema(job)
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobSchema)
+async def get_analysis_job(request: Request, job_id: str):
+    job = request.app.state.job_scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _job_schema(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=AnalysisJobSchema)
+async def cancel_analysis_job(request: Request, job_id: str):
+    job = await request.app.state.job_scheduler.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _job_schema(job)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics(request: Request) -> dict:
+    """
+    Runs on the event loop: the pools, admission controllers and
+    sessions it reads are only ever touched from there.
+    """
+    search_service = request.app.state.search_service
+
+    return {
+        "engine_pools": request.app.state.engine_pools.stats(),
+        "admission": {
+            workload.value: controller.stats()
+            for workload, controller in request.app.state.admission.items()
+        },
+        "search": await search_service.stats(),
+        "game_cache": request.app.state.game_cache.stats(),
+        "analysis_jobs": request.app.state.job_scheduler.stats(),
+        "play_sessions": request.app.state.play_sessions.stats(),
+        "cancellations": dict(request.app.state.cancellations),
+    }
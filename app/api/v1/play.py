@@ -1,32 +1,131 @@
 from fastapi import APIRouter, HTTPException, Request
 
-from app.schemas.play import PlayRequestSchema, PlayResponseSchema
+from app.api.admission import admission_for, client_key, max_wait, too_busy
+from app.core.config import settings
+from app.infrastructure.stockfish.pools import Workload
+from app.services.admission_service import AdmissionRejected
+from app.schemas.play import (
+    PlayRequestSchema,
+    PlayResponseSchema,
+    PlaySessionCreateSchema,
+    PlaySessionMoveRequestSchema,
+    PlaySessionMoveSchema,
+    PlaySessionSchema,
+)
 from app.services.play_service import PlayService
+from app.services.play_session_service import PlaySession
 
 router = APIRouter(prefix="/play", tags=["play"])
 
 
 @router.post("/move", response_model=PlayResponseSchema)
-def play_engine_move(
+async def play_engine_move(
     request: Request,
     payload: PlayRequestSchema,
 ):
-    engine_pool = request.app.state.engine_pool
-    service = PlayService(engine_pool)
+    engine_pools = request.app.state.engine_pools
+    service = PlayService(engine_pools, request.app.state.search_service)
+
+    admission = admission_for(request, Workload.PLAY)
 
     try:
-        result = service.play_move(
-            fen=payload.fen,
-            depth=payload.depth,
-            elo=payload.elo,
-        )
+        async with admission.admit(client_key(request), 1, max_wait()):
+            result = await service.play_move(
+                fen=payload.fen,
+                depth=payload.depth,
+                elo=payload.elo,
+            )
         return result
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    except AdmissionRejected as e:
+        raise too_busy(e)
+
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"{type(e).__name__}: {e}",
         )
+
+
+# -------------------------------------------------
+# Sessions (engine bound to the game, pondering)
+# -------------------------------------------------
+
+def _session_schema(session: PlaySession) -> PlaySessionSchema:
+    return PlaySessionSchema(
+        session_id=session.id,
+        fen=session.board.fen(),
+        depth=session.depth,
+        elo=session.elo,
+        idle_timeout=settings.PLAY_SESSION_IDLE_TIMEOUT,
+    )
+
+
+@router.post(
+    "/sessions",
+    response_model=PlaySessionSchema,
+    status_code=201,
+)
+async def create_play_session(
+    request: Request,
+    payload: PlaySessionCreateSchema,
+):
+    sessions = request.app.state.play_sessions
+
+    try:
+        session = await sessions.create(
+            fen=payload.fen,
+            depth=payload.depth,
+            elo=payload.elo,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return _session_schema(session)
+
+
+@router.get("/sessions/{session_id}", response_model=PlaySessionSchema)
+async def get_play_session(request: Request, session_id: str):
+    session = request.app.state.play_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return _session_schema(session)
+
+
+@router.post(
+    "/sessions/{session_id}/move",
+    response_model=PlaySessionMoveSchema,
+)
+async def play_session_move(
+    request: Request,
+    session_id: str,
+    payload: PlaySessionMoveRequestSchema,
+):
+    sessions = request.app.state.play_sessions
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    try:
+        return await sessions.move(session, payload.uci)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def close_play_session(request: Request, session_id: str):
+    if not await request.app.state.play_sessions.close(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
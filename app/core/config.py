@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -16,28 +18,287 @@ class Settings(BaseSettings):
         description="Number of Stockfish engines in the pool",
     )
 
+    STOCKFISH_ACQUIRE_TIMEOUT: float = Field(
+        default=30.0,
+        description="Seconds a request waits for a free engine (503 after)",
+    )
+
+    STOCKFISH_SEARCH_TIMEOUT: float = Field(
+        default=60.0,
+        description="Wall-clock cap per engine command, hung engines respawn",
+    )
+
+    STOCKFISH_PING_TIMEOUT: float = Field(
+        default=2.0,
+        description="Seconds to answer isready when acquired / released",
+    )
+
+    STOCKFISH_BREAKER_THRESHOLD: int = Field(
+        default=5,
+        description="Engine failures within the window that open the breaker",
+    )
+
+    STOCKFISH_BREAKER_WINDOW: float = Field(
+        default=60.0,
+        description="Seconds over which engine failures are counted",
+    )
+
+    STOCKFISH_BREAKER_COOLDOWN: float = Field(
+        default=30.0,
+        description="Seconds without respawn attempts once the breaker opens",
+    )
+
+    STOCKFISH_PRIORITY_AGING: float = Field(
+        default=10.0,
+        description="Seconds of waiting that lift an acquire one priority",
+    )
+
+    # -------------------------------------------------
+    # Admission control (429 + Retry-After when saturated)
+    # -------------------------------------------------
+    ADMISSION_MAX_QUEUE: int = Field(
+        default=32,
+        description="Requests per pool waiting for an engine (429 beyond)",
+    )
+
+    ADMISSION_MAX_WAIT: float = Field(
+        default=30.0,
+        description="Expected engine wait (seconds) that gets a 429",
+    )
+
+    ADMISSION_PLY_SECONDS: float = Field(
+        default=0.1,
+        description="Engine seconds per ply assumed until measured",
+    )
+
+    ADMISSION_FAIR_QUEUING: bool = Field(
+        default=False,
+        description="Serve queued requests round-robin by client",
+    )
+
+    ADMISSION_CLIENT_HEADER: str = Field(
+        default="X-Client-ID",
+        description="Header naming the client (remote address if absent)",
+    )
+
+    # -------------------------------------------------
+    # Quality degradation under load
+    # -------------------------------------------------
+    QUALITY_DEGRADATION_ENABLED: bool = Field(
+        default=True,
+        description="Cut depth / MultiPV of interactive requests under load",
+    )
+
+    QUALITY_REDUCED_AT: float = Field(
+        default=1.0,
+        description="Pool utilisation (busy + waiting / size) for REDUCED",
+    )
+
+    QUALITY_MINIMAL_AT: float = Field(
+        default=1.5,
+        description="Pool utilisation for MINIMAL (acquires queue up)",
+    )
+
     # -------------------------------------------------
     # Engine resources
     # -------------------------------------------------
     STOCKFISH_THREADS: int = Field(default=1)
     STOCKFISH_HASH_MB: int = Field(default=256)
 
+    STOCKFISH_HASH_BUDGET_MB: Optional[int] = Field(
+        default=None,
+        description="Total hash split over engines (size * HASH_MB if unset)",
+    )
+
+    STOCKFISH_EVAL_FILE: Optional[str] = Field(
+        default=None,
+        description="NNUE network for analysis engines (default net if unset)",
+    )
+
+    # -------------------------------------------------
+    # Play pool (separate engines for bot moves)
+    # -------------------------------------------------
+    PLAY_POOL_SIZE: int = Field(
+        default=3,
+        description=(
+            "Engines reserved for play (0 = share the analysis pool); "
+            "sessions get at most all but one"
+        ),
+    )
+
+    PLAY_POOL_THREADS: int = Field(default=1)
+    PLAY_POOL_HASH_MB: int = Field(default=16)
+
+    PLAY_POOL_EVAL_FILE: Optional[str] = Field(
+        default=None,
+        description="NNUE network for play engines (default net if unset)",
+    )
+
+    PLAY_POOL_AUTOSCALE: bool = Field(default=False)
+    PLAY_POOL_MAX_SIZE: Optional[int] = Field(default=None)
+
+    PLAY_SESSION_MAX: int = Field(
+        default=2,
+        description=(
+            "Play sessions at once, capped at PLAY_POOL_SIZE - 1 "
+            "(sessions are off with a single play engine)"
+        ),
+    )
+
+    PLAY_SESSION_IDLE_TIMEOUT: float = Field(
+        default=120.0,
+        description="Seconds without a move before a session is closed",
+    )
+
+    PLAY_SESSION_ACQUIRE_TIMEOUT: float = Field(
+        default=2.0,
+        description="Seconds a new session waits for a free play engine",
+    )
+
+    # -------------------------------------------------
+    # Pool autoscaling
+    # -------------------------------------------------
+    STOCKFISH_AUTOSCALE: bool = Field(
+        default=False,
+        description="Grow/shrink between POOL_SIZE and the host limit",
+    )
+
+    STOCKFISH_POOL_MAX_SIZE: Optional[int] = Field(
+        default=None,
+        description="Upper pool size (from CPU affinity and RAM if unset)",
+    )
+
+    STOCKFISH_SCALE_UP_WAIT: float = Field(
+        default=0.25,
+        description="Acquire wait (seconds) that triggers adding engines",
+    )
+
+    STOCKFISH_SCALE_DOWN_IDLE: float = Field(
+        default=300.0,
+        description="Seconds an engine must sit idle before it is retired",
+    )
+
+    STOCKFISH_SCALE_INTERVAL: float = Field(
+        default=1.0,
+        description="Seconds between autoscaling decisions",
+    )
+
+    STOCKFISH_ENGINE_MB: int = Field(
+        default=64,
+        description="Memory per engine process excluding hash (for the limit)",
+    )
+
+    STOCKFISH_RAM_FRACTION: float = Field(
+        default=0.75,
+        description="Share of available memory the engines may use",
+    )
+
     # -------------------------------------------------
-    # FAST + DEEP ANALYSIS STRATEGY
+    # ANALYSIS DEPTH
     # -------------------------------------------------
     STOCKFISH_BASE_DEPTH: int = Field(
         default=14,
         description="Fast baseline depth (all moves)",
     )
 
-    STOCKFISH_DEEP_TIME: float = Field(
-        default=0.15,
-        description="Time (seconds) for selective deep analysis",
+    # -------------------------------------------------
+    # Single-search analysis (one MultiPV search per ply)
+    # -------------------------------------------------
+    ANALYSIS_MULTIPV: int = Field(
+        default=4,
+        description="MultiPV width of the per-ply analysis search",
+    )
+
+    ANALYSIS_ALT_MARGIN_CP: int = Field(
+        default=30,
+        description="Centipawn margin for counting near-best alternatives",
+    )
+
+    ANALYSIS_PARALLEL_ENGINES: int = Field(
+        default=1,
+        description="Max pooled engines one game fans out to (1 = sequential)",
+    )
+
+    # -------------------------------------------------
+    # Convergence-based early stopping
+    # -------------------------------------------------
+    ANALYSIS_CONVERGENCE_ENABLED: bool = Field(
+        default=False,
+        description="Stop analysis searches once score and best move settle",
+    )
+
+    ANALYSIS_CONVERGENCE_MIN_DEPTH: int = Field(
+        default=10,
+        description="Never stop for convergence before this depth",
+    )
+
+    ANALYSIS_CONVERGENCE_TOLERANCE_CP: int = Field(
+        default=10,
+        description="Max score change (cp) between stable iterations",
+    )
+
+    ANALYSIS_CONVERGENCE_ITERATIONS: int = Field(
+        default=3,
+        description="Stable iterations in a row needed to stop",
+    )
+
+    # -------------------------------------------------
+    # Deadline ("anytime") analysis
+    # -------------------------------------------------
+    ANALYSIS_DEADLINE_SHALLOW_DEPTH: int = Field(
+        default=8,
+        description="Depth of the first pass over every ply",
+    )
+
+    ANALYSIS_DEADLINE_SHALLOW_SHARE: float = Field(
+        default=0.3,
+        description="Max share of the budget the first pass may use",
+    )
+
+    ANALYSIS_DEADLINE_SAFETY_MS: int = Field(
+        default=50,
+        description="Budget kept back for engine stop latency and assembly",
+    )
+
+    # -------------------------------------------------
+    # Background analysis jobs
+    # -------------------------------------------------
+    ANALYSIS_JOB_RESULT_TTL: float = Field(
+        default=3600.0,
+        description="Seconds a finished job's result stays retrievable",
     )
 
-    STOCKFISH_REPLY_TIME: float = Field(
-        default=0.10,
-        description="Time (seconds) for opponent best reply eval",
+    ANALYSIS_JOB_MAX_RETAINED: int = Field(
+        default=1000,
+        description="Max finished jobs kept in memory",
+    )
+
+    # -------------------------------------------------
+    # Evaluation cache
+    # -------------------------------------------------
+    EVAL_CACHE_MAX_ENTRIES: int = Field(
+        default=100_000,
+        description="Max positions kept in the in-memory evaluation cache",
+    )
+
+    EVAL_STORE_PATH: Optional[str] = Field(
+        default=None,
+        description="SQLite file shared by all workers (disabled if unset)",
+    )
+
+    EVAL_STORE_MAX_ENTRIES: int = Field(
+        default=2_000_000,
+        description="Row cap of the on-disk store before compaction",
+    )
+
+    EVAL_STORE_PRELOAD: int = Field(
+        default=0,
+        description="Hottest store entries loaded into memory on startup",
+    )
+
+    GAME_CACHE_MAX_ENTRIES: int = Field(
+        default=1000,
+        description="Max analysed games kept for incremental re-analysis",
     )
 
     # -------------------------------------------------
@@ -47,6 +308,20 @@ class Settings(BaseSettings):
     STOCKFISH_MAX_ELO: int = 3000
     STOCKFISH_MIN_ELO_NATIVE: int = 1320
 
+    STOCKFISH_DEPTH: int = Field(
+        default=14,
+        description="Depth of full-strength (no Elo, 1800+) bot moves",
+    )
+
+    PLAY_EVAL_FALLBACK_DEPTH: int = Field(
+        default=8,
+        description="Depth of the eval search when the move has no line",
+    )
+
+    PLAY_OPENING_TABLE_PATH: Optional[str] = Field(
+        default=None,
+        description="Precomputed per-Elo-band opening moves (engine if unset)",
+    )
 
     OPENING_MAX_FULL_MOVES: int = Field(
         default=10,
@@ -66,6 +341,16 @@ class Settings(BaseSettings):
         description="Max full moves to consider opening book",
     )
 
+    ECO_DATA_PATH: Optional[str] = Field(
+        default=None,
+        description="ECO .tsv file or directory of them (seed lines if unset)",
+    )
+
+    OPENING_BOOK_PATH: Optional[str] = Field(
+        default=None,
+        description="Polyglot .bin book or ECO .tsv file (seed book if unset)",
+    )
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,8 +1,7 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
-from app.infrastructure.stockfish.pool import StockfishEnginePool
-from app.core.config import settings
+from app.infrastructure.stockfish.pools import EnginePools
 
 
 @asynccontextmanager
@@ -12,12 +11,10 @@ async def lifespan(app: FastAPI):
     """
 
     # ---------- STARTUP ----------
-    engine_pool = StockfishEnginePool(
-        path=settings.STOCKFISH_PATH,
-        size=2,
-    )
+    engine_pools = EnginePools.from_settings()
+    await engine_pools.create()
 
-    app.state.engine_pool = engine_pool
+    app.state.engine_pools = engine_pools
 
     print("🚀 Application startup (engine pool ready)")
 
@@ -25,4 +22,4 @@ async def lifespan(app: FastAPI):
 
     # ---------- SHUTDOWN ----------
     print("🛑 Application shutdown (closing engine pool)")
-    engine_pool.shutdown()
+    await engine_pools.shutdown()
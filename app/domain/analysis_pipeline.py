@@ -0,0 +1,355 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import chess
+import chess.pgn
+
+from app.domain.enums import MoveQuality, QualityTier
+from app.domain.models import EvaluatedMove
+from app.domain.analysis import classify_move
+from app.domain.material import material_count, is_piece_hanging
+from app.domain.brilliance import BrilliantContext, calculate_brilliant_move
+from app.domain.evaluation import PositionEval, count_alternative_moves
+from app.domain.opening import is_opening_phase
+from app.domain.opening_book import is_book_position
+from app.domain.opening_names import (
+    OpeningClassifier,
+    OpeningInfo,
+    get_eco_index,
+)
+from app.domain.key_moves import detect_key_moments, KeyMoment
+from app.domain.stats import PlayerTally, tally_moves
+
+
+@dataclass(frozen=True)
+class PlyPlan:
+    """
+    Everything about a mainline ply that is known without an engine.
+    """
+
+    index: int
+    move_number: int
+    color: str  # "white" or "black"
+    move: chess.Move
+    san: str
+    is_capture: bool
+    is_book: bool
+
+    # First engine ply after the start or after a book ply:
+    # the position before the move needs its own search.
+    needs_before_search: bool
+
+    board_before: chess.Board
+    board_after: chess.Board
+
+
+@dataclass(frozen=True)
+class GamePlan:
+    plies: List[PlyPlan]
+    opening: Optional[OpeningInfo]
+
+    @property
+    def search_plies(self) -> int:
+        """
+        Plies that need engine work (everything past the book).
+        """
+        return sum(1 for ply in self.plies if not ply.is_book)
+
+
+def plan_game(
+    game: chess.pgn.Game,
+    book_max_full_moves: int,
+    start_ply: int = 0,
+    prev_is_book: bool = True,
+) -> GamePlan:
+    """
+    Walk the mainline once and compute all engine-independent ply data.
+    The opening is the deepest named ECO line the game reaches.
+
+    With start_ply > 0 the first plies are an already analysed prefix:
+    they are only replayed, and prev_is_book carries its state.
+    """
+    board = game.board()
+    plies: List[PlyPlan] = []
+
+    classifier = OpeningClassifier(get_eco_index())
+    classifier.push(board)
+
+    move_number = 1
+
+    for index, move in enumerate(game.mainline_moves()):
+        if index < start_ply:
+            if board.turn == chess.BLACK:
+                move_number += 1
+            board.push(move)
+            classifier.push(board)
+            continue
+
+        color = "white" if board.turn == chess.WHITE else "black"
+        # Without the move stack: copying it would make planning
+        # quadratic in game length, and searches are cached per
+        # position (Zobrist hash) anyway, history unseen
+        board_before = board.copy(stack=False)
+
+        is_book = (
+            is_opening_phase(move_number, book_max_full_moves)
+            and is_book_position(board_before)
+        )
+
+        san = board.san(move)
+        is_capture = board.is_capture(move)
+        board.push(move)
+        classifier.push(board)
+
+        plies.append(
+            PlyPlan(
+                index=index,
+                move_number=move_number,
+                color=color,
+                move=move,
+                san=san,
+                is_capture=is_capture,
+                is_book=is_book,
+                needs_before_search=not is_book and prev_is_book,
+                board_before=board_before,
+                board_after=board.copy(stack=False),
+            )
+        )
+
+        prev_is_book = is_book
+        if color == "black":
+            move_number += 1
+
+    return GamePlan(plies=plies, opening=classifier.opening)
+
+
+@dataclass(frozen=True)
+class AssemblerState:
+    """
+    What MoveAssembler carries from one ply to the next.
+    """
+
+    prev_eval: Optional[float] = None
+    last_after: Optional[PositionEval] = None
+
+
+class MoveAssembler:
+    """
+    Turns planned plies and their engine evaluations into EvaluatedMoves.
+    Plies must be fed in game order.
+    """
+
+    def __init__(
+        self,
+        player_elo: int,
+        opening_max_full_moves: int,
+        alt_margin_cp: int,
+        state: AssemblerState = AssemblerState(),
+    ):
+        self._player_elo = player_elo
+        self._opening_max_full_moves = opening_max_full_moves
+        self._alt_margin_cp = alt_margin_cp
+        self._prev_eval = state.prev_eval
+        self._last_after = state.last_after
+
+    @property
+    def state(self) -> AssemblerState:
+        return AssemblerState(
+            prev_eval=self._prev_eval,
+            last_after=self._last_after,
+        )
+
+    def add(
+        self,
+        ply: PlyPlan,
+        before: Optional[PositionEval],
+        after: Optional[PositionEval],
+    ) -> EvaluatedMove:
+        """
+        before is only read for plies with needs_before_search; the
+        others reuse the previous ply's after evaluation.
+        """
+        board_before = ply.board_before
+        board = ply.board_after
+
+        # ---------------- OPENING BOOK ----------------
+        if ply.is_book:
+            return EvaluatedMove(
+                move_number=ply.move_number,
+                color=ply.color,
+                uci=ply.move.uci(),
+                san=ply.san,
+                eval_before=self._prev_eval,
+                eval_after=self._prev_eval,
+                eval_loss=0.0,
+                quality=MoveQuality.BOOK,
+                is_check=board.is_check(),
+                is_checkmate=board.is_checkmate(),
+                is_capture=ply.is_capture,
+                clock=None,
+            )
+
+        # ---------------- ENGINE EVAL ----------------
+        if ply.needs_before_search:
+            self._prev_eval = before.score
+        else:
+            before = self._last_after
+
+        prev_eval = self._prev_eval
+        eval_after = after.score
+
+        best_move = before.best_move
+        alternative_good_moves = count_alternative_moves(
+            before,
+            ply.move,
+            board_before.turn,
+            self._alt_margin_cp,
+        )
+        was_forced_move = board_before.legal_moves.count() == 1
+
+        eval_loss = (
+            max(0.0, prev_eval - eval_after)
+            if ply.color == "white"
+            else max(0.0, eval_after - prev_eval)
+        )
+
+        quality = classify_move(eval_loss)
+
+        before_material = material_count(board_before)
+        after_material = material_count(board)
+        material_delta = after_material - before_material
+        piece_sacrificed = material_delta < 0 and not ply.is_capture
+
+        # The PV starts with the opponent's best reply, so the
+        # root score already is the eval after that reply.
+        reply_eval = after.score
+
+        ctx = BrilliantContext(
+            eval_before=int(prev_eval * 100),
+            eval_after=int(eval_after * 100),
+            eval_after_reply=int(reply_eval * 100),
+            material_delta=material_delta,
+            piece_sacrificed=piece_sacrificed,
+            was_piece_hanging_before=is_piece_hanging(
+                board_before, ply.move.from_square
+            ),
+            was_forced_move=was_forced_move,
+            alternative_good_moves=alternative_good_moves,
+            move_gives_immediate_mate=board.is_checkmate(),
+            move_is_capture=ply.is_capture,
+            player_elo=self._player_elo,
+        )
+
+        if (
+            quality == MoveQuality.BEST
+            and not is_opening_phase(
+                ply.move_number,
+                self._opening_max_full_moves,
+            )
+            and calculate_brilliant_move(ctx)
+        ):
+            quality = MoveQuality.BRILLIANT
+
+        self._prev_eval = eval_after
+        self._last_after = after
+
+        return EvaluatedMove(
+            move_number=ply.move_number,
+            color=ply.color,
+            uci=ply.move.uci(),
+            san=ply.san,
+            eval_before=prev_eval,
+            eval_after=eval_after,
+            eval_loss=eval_loss,
+            quality=quality,
+            is_check=board.is_check(),
+            is_checkmate=board.is_checkmate(),
+            is_capture=ply.is_capture,
+            clock=None,
+            best_move_uci=best_move.uci() if best_move else None,
+            best_move_san=(
+                board_before.san(best_move)
+                if best_move else None
+            ),
+            depth=after.depth,
+            stop_reason=after.stop_reason,
+        )
+
+
+@dataclass(frozen=True)
+class AnalysisSnapshot:
+    """
+    A fully analysed game prefix, with everything needed to continue it:
+    planner and assembler state plus running summary tallies and key
+    moments, so extending it costs O(new plies).
+
+    Persistent: an extension links to the snapshot it extends and holds
+    only its own plies, so the prefix is never copied (and cached
+    snapshots of one game share it). moves and key_moments are put
+    together when read.
+    """
+
+    base: Optional["AnalysisSnapshot"] = None
+    new_moves: Tuple[EvaluatedMove, ...] = ()
+    new_key_moments: Tuple[KeyMoment, ...] = ()
+    plies: int = 0
+    opening: Optional[OpeningInfo] = None
+    last_is_book: bool = True
+    assembler: AssemblerState = AssemblerState()
+    tallies: Dict[str, PlayerTally] = field(
+        default_factory=lambda: tally_moves(())
+    )
+    quality_tier: QualityTier = QualityTier.FULL
+
+    @property
+    def moves(self) -> Tuple[EvaluatedMove, ...]:
+        return tuple(
+            move
+            for snapshot in self._chain()
+            for move in snapshot.new_moves
+        )
+
+    @property
+    def key_moments(self) -> Tuple[KeyMoment, ...]:
+        return tuple(
+            moment
+            for snapshot in self._chain()
+            for moment in snapshot.new_key_moments
+        )
+
+    def extend(
+        self,
+        plan: GamePlan,
+        new_moves: List[EvaluatedMove],
+        assembler: AssemblerState,
+        quality_tier: QualityTier = QualityTier.FULL,
+    ) -> "AnalysisSnapshot":
+        """
+        Snapshot with the new plies appended; its quality tier is that
+        of the new plies (only FULL snapshots are kept as prefixes).
+        """
+        return AnalysisSnapshot(
+            base=self if self.plies else None,
+            new_moves=tuple(new_moves),
+            new_key_moments=tuple(detect_key_moments(new_moves)),
+            plies=self.plies + len(new_moves),
+            opening=plan.opening,
+            last_is_book=(
+                plan.plies[-1].is_book if plan.plies else self.last_is_book
+            ),
+            assembler=assembler,
+            tallies=tally_moves(new_moves, self.tallies),
+            quality_tier=quality_tier,
+        )
+
+    def _chain(self) -> List["AnalysisSnapshot"]:
+        """
+        This snapshot and its bases, oldest first.
+        """
+        chain: List[AnalysisSnapshot] = []
+        snapshot: Optional[AnalysisSnapshot] = self
+        while snapshot is not None:
+            chain.append(snapshot)
+            snapshot = snapshot.base
+        chain.reverse()
+        return chain
@@ -1,18 +1,85 @@
 import chess
 import random
 
+from app.domain.position_features import PositionFeatures
+
+
+HANGING_PIECE = "hanging_piece"
+GREEDY_CAPTURE = "greedy_capture"
+SIMPLE_FORK = "simple_fork"
+
+THEMES = (HANGING_PIECE, GREEDY_CAPTURE, SIMPLE_FORK)
+
+
+def theme_masks(
+    board: chess.Board,
+    moves: list[chess.Move],
+    themes: tuple[str, ...] = THEMES,
+) -> dict[str, int]:
+    """
+    Which of `moves` fit each theme, as a bitmask over move indices
+    (bit i set: moves[i] fits), evaluated for the whole batch at once.
+
+    Everything is bitboard arithmetic on one PositionFeatures and the
+    attack tables, with the squares each move changes patched in: no
+    push / pop per move.
+    """
+    features = PositionFeatures(board)
+    us = board.turn
+    them = not us
+
+    ours = board.occupied_co[us]
+    theirs = board.occupied_co[them]
+    movers = ours & ~board.pawns
+    knights = board.knights & ours
+    heavy = (board.queens | board.rooks) & theirs
+
+    masks = dict.fromkeys(themes, 0)
+
+    for i, move in enumerate(moves):
+        bit = 1 << i
+        from_bb = chess.BB_SQUARES[move.from_square]
+        occupied, captured = features.occupancy_after(move)
+
+        if GREEDY_CAPTURE in masks and captured and from_bb & movers:
+            masks[GREEDY_CAPTURE] |= bit
+
+        if HANGING_PIECE in masks:
+            # After castling the rook still guards the king's square
+            # from its old one, so before-move piece sets suffice
+            attackers = board.attackers_mask(
+                them, move.to_square, occupied
+            ) & ~captured
+            if attackers:
+                defenders = board.attackers_mask(
+                    us, move.to_square, occupied
+                ) & ~from_bb
+                if chess.popcount(attackers) > chess.popcount(defenders):
+                    masks[HANGING_PIECE] |= bit
+
+        if SIMPLE_FORK in masks:
+            targets = heavy & ~captured
+            if chess.popcount(targets) < 2:
+                continue
+
+            forkers = knights & ~from_bb
+            piece_type = move.promotion or board.piece_type_at(
+                move.from_square
+            )
+            if piece_type == chess.KNIGHT:
+                forkers |= chess.BB_SQUARES[move.to_square]
+
+            if any(
+                chess.popcount(chess.BB_KNIGHT_ATTACKS[sq] & targets) >= 2
+                for sq in chess.scan_forward(forkers)
+            ):
+                masks[SIMPLE_FORK] |= bit
+
+    return masks
+
 
 def is_hanging_piece(board: chess.Board, move: chess.Move) -> bool:
-    board.push(move)
-    try:
-        piece = board.piece_at(move.to_square)
-        if piece is None:
-            return False
-        attackers = board.attackers(not piece.color, move.to_square)
-        defenders = board.attackers(piece.color, move.to_square)
-        return len(attackers) > len(defenders)
-    finally:
-        board.pop()
+    return bool(theme_masks(board, [move], (HANGING_PIECE,))[HANGING_PIECE])
 
 
 def is_greedy_capture(board: chess.Board, move: chess.Move) -> bool:
@@ -21,20 +88,7 @@ def is_greedy_capture(board: chess.Board, move: chess.Move) -> bool:
 
 def misses_simple_fork(board: chess.Board, move: chess.Move) -> bool:
     # crude but effective: knight forks missed
-    board.push(move)
-    try:
-        for sq in board.pieces(chess.KNIGHT, not board.turn):
-            attacks = board.attacks(sq)
-            high_value = 0
-            for a in attacks:
-                p = board.piece_at(a)
-                if p and p.color == board.turn and p.piece_type in (chess.QUEEN, chess.ROOK):
-                    high_value += 1
-            if high_value >= 2:
-                return True
-        return False
-    finally:
-        board.pop()
+    return bool(theme_masks(board, [move], (SIMPLE_FORK,))[SIMPLE_FORK])
 
 
 def thematic_blunder_filter(
@@ -50,19 +104,22 @@ def thematic_blunder_filter(
     themes = []
 
     if elo <= 800:
-        themes.append(is_hanging_piece)
+        themes.append(HANGING_PIECE)
 
     if elo <= 1000:
-        themes.append(is_greedy_capture)
+        themes.append(GREEDY_CAPTURE)
 
     if elo <= 1200:
-        themes.append(misses_simple_fork)
+        themes.append(SIMPLE_FORK)
 
     random.shuffle(themes)
 
+    moves = list(moves)
+    masks = theme_masks(board, moves, tuple(themes))
+
     for theme in themes:
-        themed_moves = [m for m in moves if theme(board, m)]
-        if themed_moves:
-            return random.choice(themed_moves)
+        mask = masks[theme]
+        if mask:
+            return moves[random.choice(list(chess.scan_forward(mask)))]
 
     return None
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import chess
+
+
+@dataclass(frozen=True)
+class ConvergenceCriteria:
+    """
+    When an iterative-deepening search may stop before its depth limit.
+    """
+
+    min_depth: int
+    tolerance_cp: int
+    stable_iterations: int
+
+
+class ConvergenceTracker:
+    """
+    Follows the principal line of a search one iteration at a time.
+
+    An iteration is stable when its best move equals the previous
+    iteration's and its score moved by at most tolerance_cp. The search
+    has converged after stable_iterations stable iterations in a row,
+    at or beyond min_depth.
+    """
+
+    def __init__(self, criteria: ConvergenceCriteria):
+        self._criteria = criteria
+        self._stable = 0
+
+        self._depth: Optional[int] = None
+        self._score_cp: Optional[int] = None
+        self._best_move: Optional[chess.Move] = None
+
+    def update(
+        self,
+        depth: int,
+        score_cp: int,
+        best_move: chess.Move,
+    ) -> bool:
+        """
+        Feed one completed PV report, True once converged.
+        """
+        tolerance = self._criteria.tolerance_cp
+
+        if self._depth is not None and depth > self._depth:
+            if (
+                best_move == self._best_move
+                and abs(score_cp - self._score_cp) <= tolerance
+            ):
+                self._stable += 1
+            else:
+                self._stable = 0
+
+        self._depth = depth
+        self._score_cp = score_cp
+        self._best_move = best_move
+
+        return (
+            depth >= self._criteria.min_depth
+            and self._stable >= self._criteria.stable_iterations
+        )
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.domain.enums import QualityTier
+
+
+@dataclass(frozen=True)
+class TierLimits:
+    """
+    How a quality tier cuts the search limits a request asked for.
+    """
+
+    depth_factor: float
+    max_multipv: Optional[int]
+
+
+TIER_LIMITS: Dict[QualityTier, TierLimits] = {
+    QualityTier.FULL: TierLimits(depth_factor=1.0, max_multipv=None),
+    QualityTier.REDUCED: TierLimits(depth_factor=0.75, max_multipv=3),
+    QualityTier.MINIMAL: TierLimits(depth_factor=0.5, max_multipv=2),
+}
+
+# Degraded depths are not cut below this (shallower depths are kept)
+MIN_DEGRADED_DEPTH = 6
+
+
+@dataclass(frozen=True)
+class DegradationPolicy:
+    """
+    Quality tier by engine pool utilisation: engines in use plus
+    waiting acquires, over the pool size (1.0 = every engine busy).
+    """
+
+    reduced_at: float
+    minimal_at: float
+
+    def tier(self, utilisation: float) -> QualityTier:
+        if utilisation >= self.minimal_at:
+            return QualityTier.MINIMAL
+        if utilisation >= self.reduced_at:
+            return QualityTier.REDUCED
+        return QualityTier.FULL
+
+
+def degrade_depth(depth: int, tier: QualityTier) -> int:
+    scaled = round(depth * TIER_LIMITS[tier].depth_factor)
+    return max(scaled, min(depth, MIN_DEGRADED_DEPTH))
+
+
+def degrade_multipv(multipv: int, tier: QualityTier) -> int:
+    max_multipv = TIER_LIMITS[tier].max_multipv
+    return multipv if max_multipv is None else min(multipv, max_multipv)
@@ -9,3 +9,29 @@ class MoveQuality(str, Enum):
     INACCURACY = "INACCURACY"
     MISTAKE = "MISTAKE"
     BLUNDER = "BLUNDER"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class JobPriority(str, Enum):
+    INTERACTIVE = "INTERACTIVE"   # user is waiting on the result
+    BULK = "BULK"                 # background re-analysis
+
+
+class SearchStopReason(str, Enum):
+    DEPTH = "DEPTH"            # requested depth reached
+    CONVERGED = "CONVERGED"    # score and best move stable for K iterations
+    TIME = "TIME"              # time limit hit before the requested depth
+    CACHE = "CACHE"            # served from the evaluation cache / store
+
+
+class QualityTier(str, Enum):
+    FULL = "FULL"          # requested depth and MultiPV
+    REDUCED = "REDUCED"    # pool saturated: shallower, fewer lines
+    MINIMAL = "MINIMAL"    # requests queueing: cheapest useful search
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import chess
+
+from app.domain.enums import SearchStopReason
+
+
+@dataclass(frozen=True)
+class EngineLine:
+    """
+    One principal variation of a (MultiPV) search.
+    Score is in centipawns from White's perspective.
+    """
+
+    score_cp: int
+    pv: Tuple[chess.Move, ...] = ()
+
+
+@dataclass(frozen=True)
+class PositionEval:
+    """
+    Result of a single engine search on one position.
+    Lines are ordered best first (at most multipv of them).
+    """
+
+    depth: int
+    lines: Tuple[EngineLine, ...]
+    multipv: int = 1
+    stop_reason: SearchStopReason = SearchStopReason.DEPTH
+    target_depth: Optional[int] = None      # requested, if converged
+
+    @property
+    def covered_depth(self) -> int:
+        """
+        Deepest request this result answers: the requested depth of
+        a search stopped for convergence (searching on would not have
+        changed it), otherwise the depth reached.
+        """
+        return max(self.depth, self.target_depth or 0)
+
+    @property
+    def score(self) -> float:
+        """
+        Best line score in pawns (White's perspective).
+        """
+        if not self.lines:
+            return 0.0
+        return self.lines[0].score_cp / 100
+
+    @property
+    def pv(self) -> Tuple[chess.Move, ...]:
+        return self.lines[0].pv if self.lines else ()
+
+    @property
+    def best_move(self) -> Optional[chess.Move]:
+        pv = self.pv
+        return pv[0] if pv else None
+
+
+def count_alternative_moves(
+    evaluation: PositionEval,
+    played: chess.Move,
+    turn: chess.Color,
+    margin_cp: int,
+) -> int:
+    """
+    Number of moves other than the played one that score within
+    margin_cp of the best line, seen from the side to move.
+    """
+    if not evaluation.lines:
+        return 0
+
+    sign = 1 if turn == chess.WHITE else -1
+    best = evaluation.lines[0].score_cp * sign
+
+    return sum(
+        1
+        for line in evaluation.lines
+        if line.pv
+        and line.pv[0] != played
+        and best - line.score_cp * sign <= margin_cp
+    )
@@ -3,14 +3,13 @@
 import chess
 import random
 
-PIECE_VALUES = {
-    chess.PAWN: 1,
-    chess.KNIGHT: 3,
-    chess.BISHOP: 3,
-    chess.ROOK: 5,
-    chess.QUEEN: 9,
-    chess.KING: 100,
-}
+from app.domain.position_features import (
+    BB_CENTER,
+    BB_KINGSIDE,
+    BB_QUEENSIDE,
+    PIECE_VALUES,
+    PositionFeatures,
+)
 
 # ============================================================
 # PUBLIC ENTRY
@@ -21,18 +20,21 @@ def select_human_like_move(
     elo: int,
 ) -> chess.Move:
 
+    # Attack maps computed once, shared by every heuristic below
+    features = PositionFeatures(board)
+
     # Tunnel vision selection
     spatial = random.random() < 0.7
     conceptual = random.choice(["attack", "defend"])
 
-    visible = apply_spatial_tunnel(board, candidates, elo) if spatial else candidates
-    visible = apply_conceptual_tunnel(board, visible, conceptual, elo)
+    visible = apply_spatial_tunnel(features, candidates, elo) if spatial else candidates
+    visible = apply_conceptual_tunnel(features, visible, conceptual, elo)
 
-    visible = maybe_ignore_mate_threat(board, visible, elo)
+    visible = maybe_ignore_mate_threat(features, visible, elo)
 
     scored = []
     for move, _ in visible:
-        score = priority_score(board, move, elo)
+        score = priority_score(features, move, elo)
         scored.append((score, move))
 
     scored.sort(key=lambda x: x[0], reverse=True)
@@ -47,13 +49,13 @@ def select_human_like_move(
 # ============================================================
 # SPATIAL TUNNEL VISION
 # ============================================================
-def apply_spatial_tunnel(board, candidates, elo):
-    focus = pick_focus_region(board)
+def apply_spatial_tunnel(features, candidates, elo):
+    focus = features.focus_region
 
     filtered = [
         (m, e)
         for m, e in candidates
-        if m.to_square in focus
+        if chess.BB_SQUARES[m.to_square] & focus
     ]
 
     if filtered and elo < 1200:
@@ -63,44 +65,36 @@ def apply_spatial_tunnel(board, candidates, elo):
 
 
 def pick_focus_region(board):
-    own_squares = [
-        sq for sq, p in board.piece_map().items()
-        if p.color == board.turn
-    ]
-
-    avg_file = sum(chess.square_file(sq) for sq in own_squares) / len(own_squares)
-
-    if avg_file <= 2:
-        return queenside()
-    if avg_file >= 5:
-        return kingside()
-    return center()
+    return chess.SquareSet(PositionFeatures(board).focus_region)
 
 
 def kingside():
-    return {sq for sq in chess.SQUARES if chess.square_file(sq) >= 5}
+    return chess.SquareSet(BB_KINGSIDE)
 
 
 def queenside():
-    return {sq for sq in chess.SQUARES if chess.square_file(sq) <= 2}
+    return chess.SquareSet(BB_QUEENSIDE)
 
 
 def center():
-    return {chess.D4, chess.E4, chess.D5, chess.E5}
+    return chess.SquareSet(BB_CENTER)
 
 
 # ============================================================
 # CONCEPTUAL TUNNEL VISION
 # ============================================================
-def apply_conceptual_tunnel(board, candidates, mode, elo):
+def apply_conceptual_tunnel(features, candidates, mode, elo):
     if elo > 1600:
         return candidates
 
     filtered = []
     for move, eval_score in candidates:
-        if mode == "attack" and is_attacking_move(board, move):
+        move_features = features.move(move)
+        if mode == "attack" and (
+            move_features.is_capture or move_features.creates_threat
+        ):
             filtered.append((move, eval_score))
-        elif mode == "defend" and is_defensive_move(board, move):
+        elif mode == "defend" and move_features.is_defensive:
             filtered.append((move, eval_score))
 
     return filtered or candidates
@@ -109,8 +103,8 @@ def apply_conceptual_tunnel(board, candidates, mode, elo):
 # ============================================================
 # MATE AWARENESS DECAY
 # ============================================================
-def maybe_ignore_mate_threat(board, candidates, elo):
-    if not opponent_has_mate_in_1(board):
+def maybe_ignore_mate_threat(features, candidates, elo):
+    if not features.mate_in_1:
         return candidates
 
     defend_prob = (
@@ -124,27 +118,28 @@ def maybe_ignore_mate_threat(board, candidates, elo):
     if random.random() > defend_prob:
         return candidates
 
-    safe = [(m, e) for m, e in candidates if prevents_mate(board, m)]
+    safe = [(m, e) for m, e in candidates if features.prevents_mate(m)]
     return safe or candidates
 
 
 # ============================================================
 # PRIORITY SCORING (UPDATED)
 # ============================================================
-def priority_score(board, move, elo):
+def priority_score(features, move, elo):
+    move_features = features.move(move)
     score = 0.0
 
     # 1️⃣ Threats (highest)
-    if creates_threat(board, move):
+    if move_features.creates_threat:
         score += 4
 
     # 2️⃣ Defense
-    if is_defensive_move(board, move):
+    if move_features.is_defensive:
         score += defense_weight(elo)
 
     # 3️⃣ Captures (LOW priority, reversed by ELO)
-    if board.is_capture(move):
-        score += capture_bias(board, move, elo)
+    if move_features.is_capture:
+        score += capture_bias(features.board, move, elo)
 
     return score
 
@@ -187,33 +182,13 @@ def defense_weight(elo):
 # ============================================================
 # HELPERS
 # ============================================================
+# Single-move forms of the features above (one PositionFeatures each)
 def creates_threat(board, move):
-    after = board.copy()
-    after.push(move)
-
-    attacker = after.piece_at(move.to_square)
-    if not attacker:
-        return False
-
-    for sq in after.attacks(move.to_square):
-        target = after.piece_at(sq)
-        if target and target.color != attacker.color:
-            return PIECE_VALUES[target.piece_type] > PIECE_VALUES[attacker.piece_type]
-
-    return False
+    return PositionFeatures(board).move(move).creates_threat
 
 
 def is_defensive_move(board, move):
-    after = board.copy()
-    after.push(move)
-
-    for sq, piece in board.piece_map().items():
-        if piece.color != board.turn:
-            continue
-        if board.is_attacked_by(not board.turn, sq) and not after.is_attacked_by(not board.turn, sq):
-            return True
-
-    return False
+    return PositionFeatures(board).move(move).is_defensive
 
 
 def is_attacking_move(board, move):
@@ -221,16 +196,8 @@ def is_attacking_move(board, move):
 
 
 def opponent_has_mate_in_1(board):
-    for move in board.legal_moves:
-        board.push(move)
-        if board.is_checkmate():
-            board.pop()
-            return True
-        board.pop()
-    return False
+    return PositionFeatures(board).mate_in_1
 
 
 def prevents_mate(board, move):
-    after = board.copy()
-    after.push(move)
-    return not opponent_has_mate_in_1(after)
+    return PositionFeatures(board).prevents_mate(move)
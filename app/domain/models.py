@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-from app.domain.enums import MoveQuality
+from app.domain.enums import MoveQuality, SearchStopReason
 
 
 
@@ -37,3 +37,7 @@ class EvaluatedMove:
         # ✅ NEW (additive)
     best_move_uci: Optional[str] = None
     best_move_san: Optional[str] = None
+
+    # Depth the search behind eval_after reached (None for BOOK moves)
+    depth: Optional[int] = None
+    stop_reason: Optional[SearchStopReason] = None
@@ -1,4 +1,7 @@
+from typing import FrozenSet, Iterable
+
 import chess
+import chess.polyglot
 
 # VERY SMALL, FAST, EXTENDABLE
 # These are POSITION FENs, not moves
@@ -29,13 +32,55 @@ OPENING_FENS = {
 }
 
 
-def normalize_fen(board: chess.Board) -> str:
+class OpeningBook:
     """
-    Remove move counters from FEN.
+    Book positions keyed by Polyglot Zobrist hash.
+
+    A position is "book" however it was reached (transpositions), and
+    a lookup is one integer hash plus a set probe, no FEN strings.
     """
-    fen = board.fen()
-    return " ".join(fen.split()[:3])
+
+    def __init__(self, keys: Iterable[int]):
+        self._keys: FrozenSet[int] = frozenset(keys)
+
+    @classmethod
+    def from_fens(cls, fens: Iterable[str]) -> "OpeningBook":
+        """
+        fens may omit en passant and move counters (as OPENING_FENS do).
+        """
+        return cls(
+            chess.polyglot.zobrist_hash(chess.Board(_complete_fen(fen)))
+            for fen in fens
+        )
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, board: chess.Board) -> bool:
+        return self.contains_key(chess.polyglot.zobrist_hash(board))
+
+    def contains_key(self, key: int) -> bool:
+        return key in self._keys
+
+
+def _complete_fen(fen: str) -> str:
+    fields = fen.split()
+    defaults = ["w", "-", "-", "0", "1"]
+    return " ".join(fields + defaults[len(fields) - 1:])
+
+
+# Seed book, replaced at startup when OPENING_BOOK_PATH is configured
+_book = OpeningBook.from_fens(OPENING_FENS)
+
+
+def set_opening_book(book: OpeningBook) -> None:
+    global _book
+    _book = book
+
+
+def get_opening_book() -> OpeningBook:
+    return _book
 
 
 def is_book_position(board: chess.Board) -> bool:
-    return normalize_fen(board) in OPENING_FENS
+    return board in _book
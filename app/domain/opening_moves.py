@@ -0,0 +1,130 @@
+import random
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import chess
+import chess.polyglot
+
+
+# Upper Elo bounds of the search depth bands (PlayService.depth_for_elo)
+ELO_BAND_LIMITS = (800, 1100, 1500, 1800)
+
+# First Elo of each opening table band, also the Elo it is sampled at.
+# No band straddles an Elo where the bot's play changes: search depth
+# (800, 1100, 1500, 1800), humanization (600, 1000, 1200, 1400, 1500,
+# above 1600, 1800, 2000) and blunder themes (up to 800, 1000 and 1200
+# inclusive, hence the one-Elo bands). Native strength limiting is not
+# a fixed Elo; PlayService skips the table across that switch.
+TABLE_BAND_STARTS = (
+    400, 600, 800, 801, 1000, 1001, 1100,
+    1200, 1201, 1400, 1500, 1601, 1800, 2000,
+)
+
+# Table band of unlimited play (no Elo given)
+FULL_STRENGTH_BAND = len(TABLE_BAND_STARTS)
+
+
+def elo_band(elo: Optional[int]) -> int:
+    """
+    Depth band: 0 below 800 up to 4 from 1800, 5 for no Elo.
+    """
+    if elo is None:
+        return len(ELO_BAND_LIMITS) + 1
+
+    return bisect_right(ELO_BAND_LIMITS, elo)
+
+
+def table_band(elo: Optional[int]) -> int:
+    """
+    Opening table band of `elo`, FULL_STRENGTH_BAND for no Elo.
+    """
+    if elo is None:
+        return FULL_STRENGTH_BAND
+
+    return max(0, bisect_right(TABLE_BAND_STARTS, elo) - 1)
+
+
+def band_elo(band: int) -> Optional[int]:
+    """
+    Elo a table band is sampled at (None: full strength).
+    """
+    if band == FULL_STRENGTH_BAND:
+        return None
+
+    return TABLE_BAND_STARTS[band]
+
+
+@dataclass(frozen=True)
+class TableMove:
+    move: chess.Move
+    weight: int          # relative frequency among the position's moves
+    score_cp: int        # after the move, White's point of view
+
+
+class OpeningMoveTable:
+    """
+    Precomputed bot moves for early positions: per Elo band, the
+    moves the bot plays there, weighted by how often it plays them.
+
+    Keyed by Polyglot Zobrist hash like the opening book, so
+    transpositions share an entry and a lookup is one hash and one
+    dict probe. Sampling it replaces the engine search entirely.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, int, TableMove]] = ()):
+        self._moves: Dict[Tuple[int, int], List[TableMove]] = {}
+
+        for key, band, move in entries:
+            self.add(key, band, move)
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    def add(self, key: int, band: int, move: TableMove) -> None:
+        self._moves.setdefault((key, band), []).append(move)
+
+    def entries(self) -> Iterator[Tuple[int, int, TableMove]]:
+        """
+        (key, band, move) in key, then band order.
+        """
+        for key, band in sorted(self._moves):
+            for move in self._moves[(key, band)]:
+                yield key, band, move
+
+    def sample(
+        self,
+        board: chess.Board,
+        band: int,
+        rng: Optional[random.Random] = None,
+    ) -> Optional[TableMove]:
+        """
+        A weighted random move for `board` in `band`, None if the
+        position is not in the table.
+        """
+        key = chess.polyglot.zobrist_hash(board)
+
+        # Legality check guards against the rare hash collision
+        moves = [
+            m
+            for m in self._moves.get((key, band), ())
+            if m.weight > 0 and board.is_legal(m.move)
+        ]
+        if not moves:
+            return None
+
+        choices = (rng or random).choices
+        return choices(moves, weights=[m.weight for m in moves])[0]
+
+
+# Empty until loaded at startup from PLAY_OPENING_TABLE_PATH
+_table = OpeningMoveTable()
+
+
+def set_opening_move_table(table: OpeningMoveTable) -> None:
+    global _table
+    _table = table
+
+
+def get_opening_move_table() -> OpeningMoveTable:
+    return _table
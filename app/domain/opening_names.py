@@ -1,6 +1,10 @@
 import chess
+import chess.polyglot
+import csv
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 @dataclass(frozen=True)
 class OpeningInfo:
@@ -8,65 +12,131 @@ class OpeningInfo:
     name: str
 
 
-# NORMALIZED FEN (first 4 fields only)
-OPENING_BY_FEN: dict[str, OpeningInfo] = {
-    # --- KING'S PAWN ---
-    "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq": OpeningInfo(
-        eco="B00",
-        name="King's Pawn Opening",
-    ),
-
-    "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq": OpeningInfo(
-        eco="C20",
-        name="King's Pawn Game",
-    ),
-
-    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq": OpeningInfo(
-        eco="B20",
-        name="Sicilian Defense",
-    ),
-
-    "rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq": OpeningInfo(
-        eco="C40",
-        name="King's Knight Opening",
-    ),
-
-    # --- QUEEN'S PAWN ---
-    "rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq": OpeningInfo(
-        eco="D00",
-        name="Queen's Pawn Opening",
-    ),
-
-    "rnbqkbnr/pppppppp/8/8/3P4/5N2/PPP1PPPP/RNBQKB1R b KQkq": OpeningInfo(
-        eco="D02",
-        name="Queen's Pawn Game",
-    ),
-        # --- RUY LOPEZ ---
-    # Position after: 1.e4 e5 2.Nf3 Nc6 3.Bb5
-    "r1bqkbnr/pppp1ppp/2n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq": OpeningInfo(
-        eco="C60",
-        name="Ruy Lopez",
-    ),
-
-    # (optional) Morphy Defense after 3...a6
-    "r1bqkbnr/1ppp1ppp/p1n5/1B2p3/4P3/5N2/PPPP1PPP/RNBQK2R w KQkq": OpeningInfo(
-        eco="C60",
-        name="Ruy Lopez, Morphy Defense",
-    ),
-
-    # Add more over time
-}
-
-
-def normalize_fen(board: chess.Board) -> str:
+# Seed ECO lines (lichess chess-openings TSV format: eco, name, pgn).
+# Point ECO_DATA_PATH at the full a.tsv .. e.tsv files for A00-E99.
+DEFAULT_ECO_SOURCE = Path(__file__).parent / "data" / "openings.tsv"
+
+
+def iter_eco_lines(path: Path) -> Iterator[Tuple[OpeningInfo, List[str]]]:
+    """
+    (opening, SAN moves) for every row of an ECO TSV file.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f, delimiter="\t"):
+            yield (
+                OpeningInfo(eco=row["eco"], name=row["name"]),
+                [
+                    token
+                    for token in row["pgn"].split()
+                    if not token[0].isdigit()     # move numbers
+                ],
+            )
+
+
+class EcoIndex:
+    """
+    Every position on a known ECO line, keyed by Zobrist hash.
+
+    Positions that end a named line map to that opening, the others
+    to None, so a game can be followed ply by ply (transpositions
+    included) and dropped as soon as it leaves every known line.
+    """
+
+    def __init__(self) -> None:
+        self._positions: Dict[int, Optional[OpeningInfo]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add_line(self, opening: OpeningInfo, sans: Sequence[str]) -> None:
+        board = chess.Board()
+        self._positions.setdefault(chess.polyglot.zobrist_hash(board), None)
+
+        for san in sans:
+            board.push_san(san)
+            self._positions.setdefault(
+                chess.polyglot.zobrist_hash(board),
+                None,
+            )
+
+        # Several rows can name one position, keep the first
+        key = chess.polyglot.zobrist_hash(board)
+        if self._positions[key] is None:
+            self._positions[key] = opening
+
+    def contains(self, key: int) -> bool:
+        return key in self._positions
+
+    def get(self, key: int) -> Optional[OpeningInfo]:
+        return self._positions.get(key)
+
+
+class OpeningClassifier:
     """
-    Normalize FEN by stripping move counters.
+    Deepest named opening reached by a game, fed one position at a time.
+    Stops probing once the game leaves every known line.
     """
-    return " ".join(board.fen().split()[:3])
+
+    def __init__(self, index: EcoIndex):
+        self._index = index
+        self.opening: Optional[OpeningInfo] = None
+        self.active = True
+
+    def push(self, board: chess.Board) -> None:
+        if not self.active:
+            return
+
+        key = chess.polyglot.zobrist_hash(board)
+        if not self._index.contains(key):
+            self.active = False
+            return
+
+        opening = self._index.get(key)
+        if opening is not None:
+            self.opening = opening
+
+
+# -------------------------------------------------
+# Lazily loaded process-wide index
+# -------------------------------------------------
+
+_sources: List[Path] = [DEFAULT_ECO_SOURCE]
+_index: Optional[EcoIndex] = None
+_index_lock = threading.Lock()
+
+
+def set_eco_source(path: str) -> None:
+    """
+    Use an ECO TSV file, or every *.tsv in a directory, instead of the
+    seed lines. Takes effect on the next (lazy) load.
+    """
+    global _sources, _index
+
+    source = Path(path)
+    with _index_lock:
+        _sources = (
+            sorted(source.glob("*.tsv")) if source.is_dir() else [source]
+        )
+        _index = None
+
+
+def get_eco_index() -> EcoIndex:
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = EcoIndex()
+                for source in _sources:
+                    for opening, sans in iter_eco_lines(source):
+                        index.add_line(opening, sans)
+                _index = index
+
+    return _index
 
 
 def detect_opening(board: chess.Board) -> Optional[OpeningInfo]:
     """
-    Returns opening info if the position matches a known opening.
+    Returns opening info if the position ends a known opening line.
     """
-    return OPENING_BY_FEN.get(normalize_fen(board))
+    return get_eco_index().get(chess.polyglot.zobrist_hash(board))
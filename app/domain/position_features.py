@@ -0,0 +1,275 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Optional, Tuple
+
+import chess
+
+
+PIECE_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 100,
+}
+
+BB_QUEENSIDE = chess.BB_FILE_A | chess.BB_FILE_B | chess.BB_FILE_C
+BB_KINGSIDE = chess.BB_FILE_F | chess.BB_FILE_G | chess.BB_FILE_H
+BB_CENTER = chess.BB_D4 | chess.BB_E4 | chess.BB_D5 | chess.BB_E5
+
+
+def piece_attacks(
+    piece_type: chess.PieceType,
+    color: chess.Color,
+    square: chess.Square,
+    occupied: chess.Bitboard,
+) -> chess.Bitboard:
+    """
+    Squares a piece on `square` attacks with the given occupancy.
+    """
+    if piece_type == chess.PAWN:
+        return chess.BB_PAWN_ATTACKS[color][square]
+    if piece_type == chess.KNIGHT:
+        return chess.BB_KNIGHT_ATTACKS[square]
+    if piece_type == chess.KING:
+        return chess.BB_KING_ATTACKS[square]
+
+    attacks = 0
+    if piece_type in (chess.BISHOP, chess.QUEEN):
+        attacks |= chess.BB_DIAG_ATTACKS[square][
+            chess.BB_DIAG_MASKS[square] & occupied
+        ]
+    if piece_type in (chess.ROOK, chess.QUEEN):
+        attacks |= (
+            chess.BB_RANK_ATTACKS[square][
+                chess.BB_RANK_MASKS[square] & occupied
+            ]
+            | chess.BB_FILE_ATTACKS[square][
+                chess.BB_FILE_MASKS[square] & occupied
+            ]
+        )
+    return attacks
+
+
+def has_mate_in_1(board: chess.Board) -> bool:
+    """
+    Whether the side to move can mate in one.
+
+    Only moves that may give check are tried: the piece lands on a
+    square attacking the enemy king, leaves a line through it (a
+    discovered check), or the move is special (castling, en passant,
+    promotion). Everything else is ruled out without push / pop.
+    """
+    king = board.king(not board.turn)
+    if king is None:
+        return False
+
+    occupied = board.occupied
+    color = board.turn
+    # Squares each piece type gives check from (attacks are symmetric,
+    # pawns seen from the king's side)
+    check_squares = {
+        piece_type: piece_attacks(piece_type, not color, king, occupied)
+        for piece_type in chess.PIECE_TYPES
+    }
+
+    for move in board.generate_legal_moves():
+        piece_type = move.promotion or board.piece_type_at(move.from_square)
+        if not (
+            check_squares[piece_type] & chess.BB_SQUARES[move.to_square]
+            or chess.BB_RAYS[king][move.from_square]
+            or move.promotion
+            or board.is_castling(move)
+            or board.is_en_passant(move)
+        ):
+            continue
+
+        board.push(move)
+        try:
+            if board.is_checkmate():
+                return True
+        finally:
+            board.pop()
+
+    return False
+
+
+@dataclass(frozen=True)
+class MoveFeatures:
+    is_capture: bool
+    creates_threat: bool     # moved piece attacks a more valuable one
+    is_defensive: bool       # an attacked own piece is no longer attacked
+
+
+class PositionFeatures:
+    """
+    Attack and defence maps of one position, computed once (on first
+    use) with bitboards and shared by the heuristics of every
+    candidate move.
+
+    Per-move features are derived from these maps plus the few
+    squares the move changes, without copying the board, and cached,
+    so a heuristic asking twice about one move costs nothing more.
+    """
+
+    def __init__(self, board: chess.Board):
+        self.board = board
+        self.turn = board.turn
+
+        self._mate_in_1: Optional[bool] = None
+        self._moves: Dict[chess.Move, MoveFeatures] = {}
+        self._prevents_mate: Dict[chess.Move, bool] = {}
+        self._scratch: Optional[chess.Board] = None
+
+    # -------------------------------------------------
+    # Position
+    # -------------------------------------------------
+
+    @cached_property
+    def attacked_by(self) -> Tuple[chess.Bitboard, chess.Bitboard]:
+        """
+        Squares attacked by each color, indexed by color.
+        """
+        return self._attacks(chess.BLACK), self._attacks(chess.WHITE)
+
+    @cached_property
+    def threatened(self) -> chess.Bitboard:
+        """
+        Own pieces under attack.
+        """
+        return (
+            self.board.occupied_co[self.turn]
+            & self.attacked_by[not self.turn]
+        )
+
+    @cached_property
+    def hanging(self) -> chess.Bitboard:
+        """
+        Own pieces under attack and undefended.
+        """
+        return self.threatened & ~self.attacked_by[self.turn]
+
+    @property
+    def focus_region(self) -> chess.Bitboard:
+        """
+        Where the side to move's pieces stand: wing or center.
+        """
+        own = list(chess.scan_forward(self.board.occupied_co[self.turn]))
+        avg_file = sum(chess.square_file(sq) for sq in own) / len(own)
+
+        if avg_file <= 2:
+            return BB_QUEENSIDE
+        if avg_file >= 5:
+            return BB_KINGSIDE
+        return BB_CENTER
+
+    @property
+    def mate_in_1(self) -> bool:
+        """
+        The side to move can mate in one.
+        """
+        if self._mate_in_1 is None:
+            self._mate_in_1 = has_mate_in_1(self.board)
+        return self._mate_in_1
+
+    # -------------------------------------------------
+    # Candidate moves
+    # -------------------------------------------------
+
+    def move(self, move: chess.Move) -> MoveFeatures:
+        features = self._moves.get(move)
+        if features is None:
+            features = self._move_features(move)
+            self._moves[move] = features
+        return features
+
+    def prevents_mate(self, move: chess.Move) -> bool:
+        """
+        After `move` the opponent has no mate in one.
+        """
+        prevents = self._prevents_mate.get(move)
+        if prevents is None:
+            if self._scratch is None:
+                self._scratch = self.board.copy(stack=False)
+
+            self._scratch.push(move)
+            try:
+                prevents = not has_mate_in_1(self._scratch)
+            finally:
+                self._scratch.pop()
+            self._prevents_mate[move] = prevents
+        return prevents
+
+    def occupancy_after(
+        self,
+        move: chess.Move,
+    ) -> Tuple[chess.Bitboard, chess.Bitboard]:
+        """
+        Occupied squares after `move`, and the enemy piece it removes.
+        """
+        board = self.board
+        from_bb = chess.BB_SQUARES[move.from_square]
+        to_bb = chess.BB_SQUARES[move.to_square]
+
+        occupied = board.occupied & ~from_bb | to_bb
+        captured = board.occupied_co[not self.turn] & to_bb
+
+        if board.is_en_passant(move):
+            captured = chess.BB_SQUARES[
+                chess.square(
+                    chess.square_file(move.to_square),
+                    chess.square_rank(move.from_square),
+                )
+            ]
+            occupied &= ~captured
+        elif board.is_castling(move):
+            # The rook jumps over the king (standard castling)
+            rank = chess.square_rank(move.from_square)
+            kingside = move.to_square > move.from_square
+            rook_from = chess.square(7 if kingside else 0, rank)
+            rook_to = chess.square(5 if kingside else 3, rank)
+            occupied &= ~chess.BB_SQUARES[rook_from]
+            occupied |= chess.BB_SQUARES[rook_to]
+
+        return occupied, captured
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+
+    def _attacks(self, color: chess.Color) -> chess.Bitboard:
+        board = self.board
+        attacks = 0
+        for square in chess.scan_forward(board.occupied_co[color]):
+            attacks |= board.attacks_mask(square)
+        return attacks
+
+    def _move_features(self, move: chess.Move) -> MoveFeatures:
+        board = self.board
+        them = not self.turn
+        occupied, captured = self.occupancy_after(move)
+        theirs = board.occupied_co[them] & ~captured
+
+        # Threat: the first enemy piece the moved piece hits (in square
+        # order) is worth more than it
+        piece_type = move.promotion or board.piece_type_at(move.from_square)
+        targets = (
+            piece_attacks(piece_type, self.turn, move.to_square, occupied)
+            & theirs
+        )
+        creates_threat = bool(targets) and (
+            PIECE_VALUES[board.piece_type_at(chess.lsb(targets))]
+            > PIECE_VALUES[piece_type]
+        )
+
+        is_defensive = any(
+            not board.attackers_mask(them, square, occupied) & theirs
+            for square in chess.scan_forward(self.threatened)
+        )
+
+        return MoveFeatures(
+            is_capture=board.is_capture(move),
+            creates_threat=creates_threat,
+            is_defensive=is_defensive,
+        )
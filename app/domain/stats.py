@@ -1,4 +1,6 @@
-from typing import Iterable
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Optional
+
 from app.domain.models import EvaluatedMove
 from app.domain.enums import MoveQuality
 
@@ -52,6 +54,16 @@ def acpl(moves: Iterable[EvaluatedMove], color: str) -> float:
 # Accuracy (Secondary signal)
 # -------------------------------------------------
 
+ACCURACY_WEIGHTS = {
+    MoveQuality.BRILLIANT: 1.0,
+    MoveQuality.BEST: 1.0,
+    MoveQuality.GOOD: 0.9,
+    MoveQuality.INACCURACY: 0.7,
+    MoveQuality.MISTAKE: 0.4,
+    MoveQuality.BLUNDER: 0.0,
+}
+
+
 def accuracy_percentage(moves: Iterable[EvaluatedMove], color: str) -> float:
     """
     Accuracy percentage based on move quality.
@@ -60,21 +72,12 @@ def accuracy_percentage(moves: Iterable[EvaluatedMove], color: str) -> float:
     Brilliancies do NOT push accuracy beyond 100.
     """
 
-    weights = {
-        MoveQuality.BRILLIANT: 1.0,
-        MoveQuality.BEST: 1.0,
-        MoveQuality.GOOD: 0.9,
-        MoveQuality.INACCURACY: 0.7,
-        MoveQuality.MISTAKE: 0.4,
-        MoveQuality.BLUNDER: 0.0,
-    }
-
     player_moves = _player_moves(moves, color)
 
     if not player_moves:
         return 0.0
 
-    score = sum(weights[m.quality] for m in player_moves)
+    score = sum(ACCURACY_WEIGHTS[m.quality] for m in player_moves)
     accuracy = (score / len(player_moves)) * 100
 
     return round(min(100.0, accuracy), 2)
@@ -105,3 +108,81 @@ def count_by_quality(moves: Iterable[EvaluatedMove], color: str) -> dict:
             counts["inaccuracies"] += 1
 
     return counts
+
+
+# -------------------------------------------------
+# Running tallies (incremental summaries)
+# -------------------------------------------------
+
+@dataclass(frozen=True)
+class PlayerTally:
+    """
+    Running sums behind acpl / accuracy_percentage / count_by_quality.
+    Adding a move is O(1), so a growing game is summarized incrementally.
+    """
+
+    moves: int = 0
+    loss_cp_sum: float = 0.0
+    loss_count: int = 0
+    accuracy_score: float = 0.0
+
+    blunders: int = 0
+    mistakes: int = 0
+    inaccuracies: int = 0
+
+    def add(self, m: EvaluatedMove) -> "PlayerTally":
+        if m.quality == MoveQuality.BOOK:
+            return self
+
+        has_loss = m.eval_loss is not None and m.eval_loss > 0
+
+        return replace(
+            self,
+            moves=self.moves + 1,
+            loss_cp_sum=(
+                self.loss_cp_sum + m.eval_loss * 100
+                if has_loss else self.loss_cp_sum
+            ),
+            loss_count=self.loss_count + (1 if has_loss else 0),
+            accuracy_score=self.accuracy_score + ACCURACY_WEIGHTS[m.quality],
+            blunders=self.blunders + (m.quality == MoveQuality.BLUNDER),
+            mistakes=self.mistakes + (m.quality == MoveQuality.MISTAKE),
+            inaccuracies=(
+                self.inaccuracies + (m.quality == MoveQuality.INACCURACY)
+            ),
+        )
+
+    @property
+    def acpl(self) -> float:
+        if not self.loss_count:
+            return 0.0
+        return round(self.loss_cp_sum / self.loss_count, 2)
+
+    @property
+    def accuracy(self) -> float:
+        if not self.moves:
+            return 0.0
+        accuracy = (self.accuracy_score / self.moves) * 100
+        return round(min(100.0, accuracy), 2)
+
+    def counts(self) -> dict:
+        return {
+            "blunders": self.blunders,
+            "mistakes": self.mistakes,
+            "inaccuracies": self.inaccuracies,
+        }
+
+
+def tally_moves(
+    moves: Iterable[EvaluatedMove],
+    tallies: Optional[Dict[str, PlayerTally]] = None,
+) -> Dict[str, PlayerTally]:
+    """
+    Extend per-color tallies ("white" / "black") with the given moves.
+    """
+    result = dict(tallies or {"white": PlayerTally(), "black": PlayerTally()})
+
+    for m in moves:
+        result[m.color] = result[m.color].add(m)
+
+    return result
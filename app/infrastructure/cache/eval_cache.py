@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.domain.evaluation import PositionEval
+
+
+class EvalCache:
+    """
+    Process-wide LRU cache of engine evaluations.
+
+    Keyed by Zobrist hash (pieces, side to move, castling rights and
+    en passant). An entry satisfies any request that is not deeper and
+    not wider than the search that produced it (a converged search
+    counts as deep as requested).
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[int, PositionEval]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        key: int,
+        depth: int,
+        multipv: int = 1,
+    ) -> Optional[PositionEval]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if (
+                entry is None
+                or entry.covered_depth < depth
+                or entry.multipv < multipv
+            ):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: int, evaluation: PositionEval) -> None:
+        with self._lock:
+            existing = self._entries.get(key)
+
+            # Never replace a result that already dominates this one
+            if (
+                existing is not None
+                and existing.covered_depth >= evaluation.covered_depth
+                and existing.multipv >= evaluation.multipv
+            ):
+                self._entries.move_to_end(key)
+                return
+
+            self._entries[key] = evaluation
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
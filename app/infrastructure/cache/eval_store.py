@@ -0,0 +1,275 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import chess
+
+from app.domain.evaluation import EngineLine, PositionEval
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evals (
+    key        INTEGER PRIMARY KEY,
+    depth      INTEGER NOT NULL,      -- deepest request it answers
+    multipv    INTEGER NOT NULL,
+    lines      TEXT    NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL    NOT NULL,
+    reached    INTEGER                -- if less (converged search)
+);
+CREATE INDEX IF NOT EXISTS evals_hotness ON evals (hits, updated_at);
+"""
+
+
+def _to_sql_key(key: int) -> int:
+    """
+    Zobrist hashes are unsigned 64-bit, SQLite integers are signed.
+    """
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+def _from_sql_key(key: int) -> int:
+    return key + (1 << 64) if key < 0 else key
+
+
+def _encode_lines(evaluation: PositionEval) -> str:
+    return json.dumps(
+        [
+            [line.score_cp, " ".join(m.uci() for m in line.pv)]
+            for line in evaluation.lines
+        ]
+    )
+
+
+def _decode(
+    depth: int,
+    multipv: int,
+    lines: str,
+    reached: Optional[int] = None,
+) -> PositionEval:
+    return PositionEval(
+        depth=reached if reached is not None else depth,
+        target_depth=depth if reached is not None else None,
+        multipv=multipv,
+        lines=tuple(
+            EngineLine(
+                score_cp=cp,
+                pv=tuple(chess.Move.from_uci(u) for u in pv.split()),
+            )
+            for cp, pv in json.loads(lines)
+        ),
+    )
+
+
+class SqliteEvalStore:
+    """
+    File-backed evaluation store shared by all API workers.
+
+    SQLite in WAL mode: readers never block the single writer, so every
+    worker process can open the same file. Deeper evaluations replace
+    shallower ones; the coldest rows are compacted away once the store
+    grows past max_entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        compact_every: int = 1000,
+    ):
+        self._path = path
+        self._max_entries = max_entries
+        self._compact_every = compact_every
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes_since_compaction = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+
+        conn = self._connection()
+        # Only effective on a fresh file, allows shrinking after compaction
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(_SCHEMA)
+
+        # Files created before converged results were stored
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(evals)")}
+        if "reached" not in columns:
+            conn.execute("ALTER TABLE evals ADD COLUMN reached INTEGER")
+
+    # -------------------------------------------------
+    # Connection handling
+    # -------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self._path,
+                timeout=5.0,
+                isolation_level=None,      # autocommit
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def get(
+        self,
+        key: int,
+        depth: int,
+        multipv: int = 1,
+    ) -> Optional[PositionEval]:
+        conn = self._connection()
+        sql_key = _to_sql_key(key)
+
+        row = conn.execute(
+            "SELECT depth, multipv, lines, reached FROM evals WHERE key = ?",
+            (sql_key,),
+        ).fetchone()
+
+        if row is None or row[0] < depth or row[1] < multipv:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            conn.execute(
+                "UPDATE evals SET hits = hits + 1 WHERE key = ?",
+                (sql_key,),
+            )
+        except sqlite3.OperationalError:
+            # Hit counts only drive compaction / preload, never fail a read
+            pass
+
+        return _decode(*row)
+
+    def put(self, key: int, evaluation: PositionEval) -> None:
+        conn = self._connection()
+
+        conn.execute(
+            """
+            INSERT INTO evals
+                (key, depth, multipv, lines, hits, updated_at, reached)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                depth = excluded.depth,
+                multipv = excluded.multipv,
+                lines = excluded.lines,
+                updated_at = excluded.updated_at,
+                reached = excluded.reached
+            WHERE NOT (
+                evals.depth >= excluded.depth
+                AND evals.multipv >= excluded.multipv
+            )
+            """,
+            (
+                _to_sql_key(key),
+                evaluation.covered_depth,
+                evaluation.multipv,
+                _encode_lines(evaluation),
+                time.time(),
+                (
+                    evaluation.depth
+                    if evaluation.covered_depth > evaluation.depth
+                    else None
+                ),
+            ),
+        )
+        self.writes += 1
+
+        with self._lock:
+            self._writes_since_compaction += 1
+            due = self._writes_since_compaction >= self._compact_every
+            if due:
+                self._writes_since_compaction = 0
+
+        if due:
+            self.compact()
+
+    def hottest(self, limit: int) -> List[Tuple[int, PositionEval]]:
+        """
+        Most frequently hit entries, used to preload the memory cache.
+        """
+        if limit <= 0:
+            return []
+
+        rows = self._connection().execute(
+            """
+            SELECT key, depth, multipv, lines, reached FROM evals
+            ORDER BY hits DESC, updated_at DESC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+
+        return [
+            (_from_sql_key(key), _decode(depth, multipv, lines, reached))
+            for key, depth, multipv, lines, reached in rows
+        ]
+
+    def compact(self) -> int:
+        """
+        Drop the coldest rows once the store exceeds its size cap.
+        Shrinks to 90% of the cap so compaction does not run on every write.
+        """
+        conn = self._connection()
+        count = conn.execute("SELECT COUNT(*) FROM evals").fetchone()[0]
+
+        if count <= self._max_entries:
+            return 0
+
+        excess = count - int(self._max_entries * 0.9)
+        conn.execute(
+            """
+            DELETE FROM evals WHERE key IN (
+                SELECT key FROM evals
+                ORDER BY hits ASC, updated_at ASC
+                LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA incremental_vacuum")
+
+        self.compactions += 1
+        return excess
+
+    def stats(self) -> dict:
+        count = self._connection().execute(
+            "SELECT COUNT(*) FROM evals"
+        ).fetchone()[0]
+        lookups = self.hits + self.misses
+
+        return {
+            "path": self._path,
+            "entries": count,
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "compactions": self.compactions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
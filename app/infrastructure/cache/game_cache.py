@@ -0,0 +1,87 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from app.domain.analysis_pipeline import AnalysisSnapshot
+
+
+class GameAnalysisCache:
+    """
+    LRU cache of analysed games, looked up by their longest known prefix.
+
+    A key hashes the start position, analysis depth, player Elo and the
+    move list, so re-submitting a game with a few more moves resumes
+    from the last snapshot instead of re-analysing every ply.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, AnalysisSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.plies_reused = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def prefix_keys(
+        start_fen: str,
+        moves_uci: Sequence[str],
+        depth: Optional[int],
+        player_elo: int,
+    ) -> List[str]:
+        """
+        keys[i] identifies the game after its first i plies.
+        Built with one running hash, so all keys cost O(moves).
+        """
+        h = hashlib.sha1(f"{start_fen}|{depth}|{player_elo}".encode())
+        keys = [h.hexdigest()]
+
+        for uci in moves_uci:
+            h.update(b" " + uci.encode())
+            keys.append(h.hexdigest())
+
+        return keys
+
+    def longest_prefix(
+        self,
+        keys: Sequence[str],
+    ) -> Tuple[int, Optional[AnalysisSnapshot]]:
+        with self._lock:
+            for plies in range(len(keys) - 1, 0, -1):
+                snapshot = self._entries.get(keys[plies])
+                if snapshot is not None:
+                    self._entries.move_to_end(keys[plies])
+                    self.hits += 1
+                    self.plies_reused += plies
+                    return plies, snapshot
+
+            self.misses += 1
+            return 0, None
+
+    def put(self, key: str, snapshot: AnalysisSnapshot) -> None:
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "plies_reused": self.plies_reused,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,100 @@
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterator, Optional
+
+import chess
+import chess.polyglot
+
+from app.domain.opening_book import OpeningBook
+from app.domain.opening_names import iter_eco_lines
+
+
+# Polyglot entry: key u64, move u16, weight u16, learn u32 (big-endian)
+_POLYGLOT_ENTRY = struct.Struct(">QHHI")
+_KEY = struct.Struct(">Q")
+
+
+class PolyglotBook(OpeningBook):
+    """
+    Polyglot .bin book probed in place.
+
+    The file stays memory-mapped and a lookup binary-searches its
+    16-byte entries (sorted by key), decoding about log2(entries)
+    keys: nothing is loaded up front, however large the book.
+    """
+
+    def __init__(self, path: str):
+        self._data: Optional[mmap.mmap] = None
+        self._entries = 0
+        self._distinct: Optional[int] = None
+
+        with open(path, "rb") as f:
+            size = Path(path).stat().st_size
+            if size >= _POLYGLOT_ENTRY.size:
+                # The mapping outlives the file object
+                self._data = mmap.mmap(
+                    f.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ,
+                )
+                self._entries = size // _POLYGLOT_ENTRY.size
+
+    def __len__(self) -> int:
+        """
+        Distinct positions, counted by one scan on first use.
+        """
+        if self._distinct is None:
+            self._distinct = sum(1 for _ in self._iter_distinct())
+        return self._distinct
+
+    def contains_key(self, key: int) -> bool:
+        lo, hi = 0, self._entries
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self._key_at(mid)
+            if probe == key:
+                return True
+            if probe < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return False
+
+    def _key_at(self, index: int) -> int:
+        (key,) = _KEY.unpack_from(self._data, index * _POLYGLOT_ENTRY.size)
+        return key
+
+    def _iter_distinct(self) -> Iterator[int]:
+        previous: Optional[int] = None
+        for index in range(self._entries):
+            key = self._key_at(index)
+            if key != previous:
+                yield key
+                previous = key
+
+
+def iter_eco_keys(path: str) -> Iterator[int]:
+    """
+    Keys of every position along every line of an ECO TSV file
+    (columns eco, name, pgn; e.g. the lichess chess-openings data).
+    """
+    for _, sans in iter_eco_lines(Path(path)):
+        board = chess.Board()
+        yield chess.polyglot.zobrist_hash(board)
+
+        for san in sans:
+            board.push_san(san)
+            yield chess.polyglot.zobrist_hash(board)
+
+
+def load_opening_book(path: str) -> OpeningBook:
+    """
+    Polyglot book for .bin files (probed in place), ECO TSV data
+    otherwise (hashed into a set).
+    """
+    if Path(path).suffix.lower() == ".bin":
+        return PolyglotBook(path)
+
+    return OpeningBook(iter_eco_keys(path))
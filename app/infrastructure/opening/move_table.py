@@ -0,0 +1,69 @@
+import struct
+from pathlib import Path
+
+import chess
+
+from app.domain.opening_moves import OpeningMoveTable, TableMove
+
+
+# Version 2: bands of opening_moves.TABLE_BAND_STARTS
+_MAGIC = b"OMT2"
+
+# Entry: key u64, band u8, move u16, weight u16, score i16 (big-endian)
+_ENTRY = struct.Struct(">QBHHh")
+
+_SCORE_LIMIT = 32767
+
+
+def _encode_move(move: chess.Move) -> int:
+    # from (6 bits) | to (6 bits) | promotion piece type (3 bits)
+    return (
+        move.from_square
+        | move.to_square << 6
+        | (move.promotion or 0) << 12
+    )
+
+
+def _decode_move(value: int) -> chess.Move:
+    return chess.Move(
+        value & 0x3F,
+        (value >> 6) & 0x3F,
+        promotion=(value >> 12) or None,
+    )
+
+
+def write_opening_move_table(path: str, table: OpeningMoveTable) -> None:
+    """
+    Fixed-size entries sorted by key and band after a 4-byte magic,
+    15 bytes per move, so even large tables stay a few hundred KB.
+    """
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        for key, band, move in table.entries():
+            f.write(
+                _ENTRY.pack(
+                    key,
+                    band,
+                    _encode_move(move.move),
+                    min(move.weight, 0xFFFF),
+                    max(-_SCORE_LIMIT, min(_SCORE_LIMIT, move.score_cp)),
+                )
+            )
+
+
+def load_opening_move_table(path: str) -> OpeningMoveTable:
+    data = Path(path).read_bytes()
+    if data[: len(_MAGIC)] != _MAGIC:
+        raise ValueError(
+            f"Not an opening move table (or an old one, rebuild it): {path}"
+        )
+
+    body = data[len(_MAGIC):]
+    usable = len(body) - len(body) % _ENTRY.size
+
+    return OpeningMoveTable(
+        (key, band, TableMove(_decode_move(move), weight, score_cp))
+        for key, band, move, weight, score_cp in _ENTRY.iter_unpack(
+            body[:usable]
+        )
+    )
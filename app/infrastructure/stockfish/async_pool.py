@@ -0,0 +1,742 @@
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+import chess
+import chess.engine
+
+from app.core.config import settings
+
+
+T = TypeVar("T")
+
+# Seconds between attempts to respawn a failed engine
+RESPAWN_BACKOFF = 1.0
+
+# Smallest per-engine hash when the budget is split (MB)
+MIN_HASH_MB = 16
+
+# Recent scaling decisions reported in stats()
+SCALING_EVENTS_KEPT = 20
+
+
+class AcquirePriority(IntEnum):
+    """
+    Priority class of an acquire; lower values are served first.
+    """
+
+    HIGH = 0      # a user waits on a bot move
+    NORMAL = 1    # a user waits on an analysis
+    LOW = 2       # batch and background re-analysis
+
+
+@dataclass(eq=False)
+class _Waiter:
+    priority: AcquirePriority
+    since: float
+    future: "asyncio.Future[AsyncStockfishEngine]" = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class AsyncStockfishEngine:
+    """
+    Stockfish process driven through python-chess's asyncio UCI protocol.
+    Same surface as the threaded pool's engines: analyze / play / set_elo.
+
+    Every command runs under a wall-clock timeout. A timed-out or
+    crashed engine is killed and flagged broken, the pool then
+    replaces it instead of handing it out again.
+    """
+
+    def __init__(
+        self,
+        transport: asyncio.SubprocessTransport,
+        protocol: chess.engine.UciProtocol,
+        search_timeout: Optional[float] = None,
+        hash_mb: int = 0,
+    ):
+        self._transport = transport
+        self._protocol = protocol
+        self._search_timeout = search_timeout
+        self.broken = False
+
+        self.hash_mb = hash_mb
+        self.last_used = time.monotonic()
+
+    @classmethod
+    async def spawn(
+        cls,
+        path: str,
+        threads: int,
+        hash_mb: int,
+        search_timeout: Optional[float] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> "AsyncStockfishEngine":
+        transport, protocol = await chess.engine.popen_uci(path)
+        engine = cls(transport, protocol, search_timeout, hash_mb)
+        try:
+            await engine.guard(
+                protocol.configure(
+                    {"Threads": threads, "Hash": hash_mb, **(options or {})}
+                )
+            )
+        except Exception:
+            engine.kill()
+            raise
+        return engine
+
+    @property
+    def alive(self) -> bool:
+        return not self.broken and self._transport.get_returncode() is None
+
+    async def guard(self, awaitable: Awaitable[T]) -> T:
+        """
+        Await an engine command under the search timeout, marking the
+        engine broken (and killing a hung process) on failure.
+        """
+        try:
+            return await asyncio.wait_for(awaitable, self._search_timeout)
+        except asyncio.TimeoutError:
+            self.broken = True
+            self.kill()
+            raise RuntimeError("Engine search timed out")
+        except chess.engine.EngineTerminatedError:
+            self.broken = True
+            self.kill()
+            raise
+
+    async def ping(self, timeout: float) -> bool:
+        """
+        UCI isready round trip, False if the engine did not answer.
+        """
+        if not self.alive:
+            return False
+
+        try:
+            await asyncio.wait_for(self._protocol.ping(), timeout)
+            return True
+        except (asyncio.TimeoutError, chess.engine.EngineTerminatedError):
+            self.broken = True
+            self.kill()
+            return False
+
+    async def analyze(
+        self,
+        board: chess.Board,
+        limit: chess.engine.Limit,
+        multipv: Optional[int] = None,
+    ):
+        return await self.guard(
+            self._protocol.analyse(board, limit, multipv=multipv)
+        )
+
+    async def analysis(
+        self,
+        board: chess.Board,
+        limit: chess.engine.Limit,
+        multipv: Optional[int] = None,
+    ) -> chess.engine.AnalysisResult:
+        """
+        Running search whose info lines can be consumed as they arrive.
+        Wrap the consumer in guard() to bound it by the search timeout.
+        """
+        return await self.guard(
+            self._protocol.analysis(board, limit, multipv=multipv)
+        )
+
+    async def play(
+        self,
+        board: chess.Board,
+        limit: chess.engine.Limit,
+        **kwargs,
+    ) -> chess.engine.PlayResult:
+        return await self.guard(self._protocol.play(board, limit, **kwargs))
+
+    async def set_elo(self, elo: Optional[int]) -> None:
+        if elo is None:
+            options = {"UCI_LimitStrength": False}
+        else:
+            options = {"UCI_LimitStrength": True, "UCI_Elo": elo}
+
+        await self.guard(self._protocol.configure(options))
+
+    async def set_hash(self, hash_mb: int) -> None:
+        await self.guard(self._protocol.configure({"Hash": hash_mb}))
+        self.hash_mb = hash_mb
+
+    def kill(self) -> None:
+        try:
+            self._transport.kill()
+        except ProcessLookupError:
+            pass
+        self._transport.close()
+
+    async def quit(self) -> None:
+        if not self.alive:
+            self.kill()
+            return
+
+        try:
+            await asyncio.wait_for(self._protocol.quit(), timeout=2.0)
+        except (asyncio.TimeoutError, chess.engine.EngineError):
+            self.kill()
+
+
+class CircuitBreaker:
+    """
+    Stops respawning a binary that keeps crashing.
+
+    Opens after `threshold` failures within `window` seconds; after
+    `cooldown` seconds one attempt is let through (half-open) and a
+    success closes it again.
+    """
+
+    def __init__(self, threshold: int, window: float, cooldown: float):
+        self._threshold = threshold
+        self._window = window
+        self._cooldown = cooldown
+
+        self._failures: Deque[float] = deque()
+        self._opened_at: Optional[float] = None
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._cooldown:
+            return "half_open"
+        return "open"
+
+    def retry_in(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self._opened_at + self._cooldown - time.monotonic())
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+
+        if self._opened_at is not None:
+            # Failed half-open attempt: stay open for another cooldown
+            self._opened_at = now
+            return
+
+        self._failures.append(now)
+        while self._failures and now - self._failures[0] > self._window:
+            self._failures.popleft()
+
+        if len(self._failures) >= self._threshold:
+            self._opened_at = now
+            self._failures.clear()
+            self.trips += 1
+
+    def record_success(self) -> None:
+        self._opened_at = None
+
+
+class AsyncStockfishEnginePool:
+    """
+    Asyncio-native engine pool.
+
+    Waiting for an engine is an awaitable, not a blocked thread, so one
+    event loop can drive every pooled engine.
+
+    Self-healing: engines are pinged when handed out and when returned,
+    dead or hung ones are dropped and respawned in the background, so
+    capacity survives engine failures. A circuit breaker stops respawn
+    attempts while the binary keeps crashing.
+
+    Autoscaling (optional): grows from `size` towards a limit derived
+    from the CPUs and memory available to this process while acquire
+    waits exceed STOCKFISH_SCALE_UP_WAIT, and retires engines idle for
+    STOCKFISH_SCALE_DOWN_IDLE. The hash budget is split evenly over the
+    target number of engines.
+
+    Priorities: waiters are served by AcquirePriority class, oldest
+    first within a class. Every STOCKFISH_PRIORITY_AGING seconds of
+    waiting lifts a waiter one class, so low-priority work still gets
+    a fair share under sustained high-priority load. Long-running
+    holders poll should_yield() between searches and hand their
+    engine over when a higher class is waiting.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.STOCKFISH_PATH,
+        size: int = settings.STOCKFISH_POOL_SIZE,
+        threads: int = settings.STOCKFISH_THREADS,
+        hash_mb: int = settings.STOCKFISH_HASH_MB,
+        search_timeout: Optional[float] = settings.STOCKFISH_SEARCH_TIMEOUT,
+        ping_timeout: float = settings.STOCKFISH_PING_TIMEOUT,
+        priority_aging: float = settings.STOCKFISH_PRIORITY_AGING,
+        autoscale: bool = settings.STOCKFISH_AUTOSCALE,
+        max_size: Optional[int] = settings.STOCKFISH_POOL_MAX_SIZE,
+        hash_budget_mb: Optional[int] = settings.STOCKFISH_HASH_BUDGET_MB,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        self._path = path
+        self._options = options
+        self._min_size = size
+        self._size = size
+        self._threads = threads
+        self._search_timeout = search_timeout
+        self._ping_timeout = ping_timeout
+        self._priority_aging = priority_aging
+
+        self._hash_budget_mb = hash_budget_mb or hash_mb * size
+        self._autoscale = autoscale
+        self._max_size = size
+        if autoscale:
+            host_limit = host_engine_limit(threads, self._hash_budget_mb)
+            self._max_size = max(size, max_size or host_limit)
+
+        self._engines: List[AsyncStockfishEngine] = []
+        self._idle: Deque[AsyncStockfishEngine] = deque()
+        self._waiters: List[_Waiter] = []
+        self._waiting = 0
+        self._bound: Set[AsyncStockfishEngine] = set()
+
+        self._breaker = CircuitBreaker(
+            threshold=settings.STOCKFISH_BREAKER_THRESHOLD,
+            window=settings.STOCKFISH_BREAKER_WINDOW,
+            cooldown=settings.STOCKFISH_BREAKER_COOLDOWN,
+        )
+        self._respawns: Set[asyncio.Task] = set()
+
+        self.restarts = 0
+        self.failures = 0
+        self.spawn_failures = 0
+
+        # Autoscaling state
+        self._scaler: Optional[asyncio.Task] = None
+        self._waits: List[float] = []           # since the last tick
+        self._waiter_since: List[float] = []    # start of current waits
+        self._last_wait = 0.0
+        self.scale_ups = 0
+        self.scale_downs = 0
+        self.scaling_events: Deque[dict] = deque(maxlen=SCALING_EVENTS_KEPT)
+
+    @property
+    def size(self) -> int:
+        """
+        Target number of engines (grows and shrinks when autoscaling).
+        """
+        return self._size
+
+    @property
+    def shared_size(self) -> int:
+        """
+        Target size less the engines bound to long-lived holders.
+        """
+        return max(0, self._size - len(self._bound))
+
+    @property
+    def utilisation(self) -> float:
+        """
+        Engines in use plus waiting acquires, over the target size
+        (1.0 = every engine busy, above 1.0 = acquires are queueing).
+        Bound engines are left out: they are not load on the others.
+        """
+        in_use = len(self._engines) - len(self._idle) - len(self._bound)
+        return (in_use + self._waiting) / max(1, self.shared_size)
+
+    @property
+    def hash_per_engine(self) -> int:
+        return max(MIN_HASH_MB, self._hash_budget_mb // max(1, self._size))
+
+    async def create(self) -> None:
+        self._engines = list(
+            await asyncio.gather(
+                *(self._spawn() for _ in range(self._size))
+            )
+        )
+        for engine in self._engines:
+            self._hand_off(engine)
+
+        if self._autoscale:
+            self._scaler = asyncio.create_task(self._autoscale_loop())
+
+    async def acquire(
+        self,
+        timeout: Optional[float] = settings.STOCKFISH_ACQUIRE_TIMEOUT,
+        priority: AcquirePriority = AcquirePriority.NORMAL,
+    ) -> AsyncStockfishEngine:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+
+        started = loop.time()
+        self._waiting += 1
+        self._waiter_since.append(started)
+        try:
+            while True:
+                if not self._engines and self._breaker.state == "open":
+                    raise RuntimeError(
+                        "Engine pool unavailable (engines keep crashing)"
+                    )
+
+                remaining = (
+                    max(0.0, deadline - loop.time())
+                    if deadline is not None
+                    else None
+                )
+                engine = await self._wait_for_engine(priority, remaining)
+
+                if await engine.ping(self._ping_timeout):
+                    break
+                self._replace(engine)
+
+        except asyncio.TimeoutError:
+            raise RuntimeError("No engine available, try again later")
+        finally:
+            self._waiting -= 1
+            self._waiter_since.remove(started)
+
+        self._waits.append(loop.time() - started)
+
+        if engine.hash_mb != self.hash_per_engine:
+            try:
+                await engine.set_hash(self.hash_per_engine)
+            except BaseException:
+                await self.release(engine)
+                raise
+
+        return engine
+
+    def try_acquire(self) -> Optional[AsyncStockfishEngine]:
+        """
+        Engine if one is idle right now, otherwise None.
+        (No ping: callers use it for opportunistic extra capacity.)
+        """
+        while self._idle:
+            engine = self._idle.popleft()
+            if engine.alive:
+                return engine
+            self._replace(engine)
+        return None
+
+    def bind(self, engine: AsyncStockfishEngine) -> None:
+        """
+        Mark an acquired engine as held long-term (a play session)
+        until it is released, so it does not count as load.
+        """
+        self._bound.add(engine)
+
+    async def release(self, engine: AsyncStockfishEngine) -> None:
+        engine.last_used = time.monotonic()
+        self._bound.discard(engine)
+
+        # Shielded: a holder cancelled mid-release must not leak the engine
+        await asyncio.shield(self._check_in(engine))
+
+    async def _check_in(self, engine: AsyncStockfishEngine) -> None:
+        if await engine.ping(self._ping_timeout):
+            self._hand_off(engine)
+        else:
+            self._replace(engine)
+
+    def should_yield(self, priority: AcquirePriority) -> bool:
+        """
+        True if a waiter of a higher class than `priority` is queued,
+        i.e. a holder at `priority` should release between searches.
+        """
+        return any(
+            w.priority < priority and not w.future.done()
+            for w in self._waiters
+        )
+
+    @asynccontextmanager
+    async def engine(
+        self,
+        timeout: Optional[float] = settings.STOCKFISH_ACQUIRE_TIMEOUT,
+        priority: AcquirePriority = AcquirePriority.NORMAL,
+    ) -> AsyncIterator[AsyncStockfishEngine]:
+        engine = await self.acquire(timeout, priority)
+        try:
+            yield engine
+        finally:
+            await self.release(engine)
+
+    async def shutdown(self) -> None:
+        if self._scaler is not None:
+            self._scaler.cancel()
+            await asyncio.gather(self._scaler, return_exceptions=True)
+
+        for task in self._respawns:
+            task.cancel()
+        await asyncio.gather(*self._respawns, return_exceptions=True)
+
+        await asyncio.gather(
+            *(engine.quit() for engine in self._engines),
+            return_exceptions=True,
+        )
+        self._engines.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._engines),
+            "target_size": self._size,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            "bound": len(self._bound),
+            "utilisation": round(self.utilisation, 2),
+            "waiting_by_priority": {
+                p.name.lower(): sum(
+                    1 for w in self._waiters
+                    if w.priority == p and not w.future.done()
+                )
+                for p in AcquirePriority
+            },
+            "respawning": len(self._respawns),
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "spawn_failures": self.spawn_failures,
+            "circuit": self._breaker.state,
+            "circuit_trips": self._breaker.trips,
+            "autoscale": self._autoscale,
+            "min_size": self._min_size,
+            "max_size": self._max_size,
+            "hash_per_engine_mb": self.hash_per_engine,
+            "last_acquire_wait": round(self._last_wait, 4),
+            "scale_ups": self.scale_ups,
+            "scale_downs": self.scale_downs,
+            "scaling_events": list(self.scaling_events),
+        }
+
+    # -------------------------------------------------
+    # Priority hand-off
+    # -------------------------------------------------
+
+    async def _wait_for_engine(
+        self,
+        priority: AcquirePriority,
+        timeout: Optional[float],
+    ) -> AsyncStockfishEngine:
+        # Engines only sit idle while nobody waits, so no queue jumping
+        if self._idle:
+            return self._idle.popleft()
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, loop.time())
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(waiter.future),
+                timeout,
+            )
+        except BaseException:
+            self._withdraw(waiter)
+            raise
+
+    def _withdraw(self, waiter: _Waiter) -> None:
+        """
+        Drop a timed-out or cancelled waiter, passing on an engine
+        that was handed to it in the meantime.
+        """
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+        if waiter.future.done() and not waiter.future.cancelled():
+            self._hand_off(waiter.future.result())
+        else:
+            waiter.future.cancel()
+
+    def _hand_off(self, engine: AsyncStockfishEngine) -> None:
+        """
+        Give a free engine to the first waiter by aged priority, or
+        park it as idle.
+        """
+        self._waiters = [w for w in self._waiters if not w.future.done()]
+        if not self._waiters:
+            self._idle.append(engine)
+            return
+
+        now = asyncio.get_running_loop().time()
+        waiter = min(
+            self._waiters,
+            key=lambda w: (self._aged_priority(w, now), w.since),
+        )
+        self._waiters.remove(waiter)
+        waiter.future.set_result(engine)
+
+    def _aged_priority(self, waiter: _Waiter, now: float) -> float:
+        if self._priority_aging <= 0:
+            return float(waiter.priority)
+        return waiter.priority - (now - waiter.since) / self._priority_aging
+
+    # -------------------------------------------------
+    # Health management
+    # -------------------------------------------------
+
+    async def _spawn(self) -> AsyncStockfishEngine:
+        return await AsyncStockfishEngine.spawn(
+            self._path,
+            self._threads,
+            self.hash_per_engine,
+            self._search_timeout,
+            self._options,
+        )
+
+    def _replace(self, engine: AsyncStockfishEngine) -> None:
+        """
+        Drop a failed engine and respawn a replacement in the background.
+        """
+        self.failures += 1
+        self._breaker.record_failure()
+
+        if engine in self._engines:
+            self._engines.remove(engine)
+        engine.kill()
+
+        task = asyncio.create_task(self._respawn())
+        self._respawns.add(task)
+        task.add_done_callback(self._respawns.discard)
+
+    async def _respawn(self) -> None:
+        while True:
+            await asyncio.sleep(self._breaker.retry_in())
+
+            try:
+                engine = await self._spawn()
+            except Exception:
+                self.spawn_failures += 1
+                self._breaker.record_failure()
+                await asyncio.sleep(RESPAWN_BACKOFF)
+                continue
+
+            self._breaker.record_success()
+            self.restarts += 1
+            self._engines.append(engine)
+            self._hand_off(engine)
+            return
+
+    # -------------------------------------------------
+    # Autoscaling
+    # -------------------------------------------------
+
+    async def _autoscale_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.STOCKFISH_SCALE_INTERVAL)
+            try:
+                await self._autoscale_tick()
+            except Exception:
+                # A failed spawn is retried on the next tick
+                self.spawn_failures += 1
+
+    async def _autoscale_tick(self) -> None:
+        """
+        One scaling decision from the waits seen since the last tick.
+        """
+        now = asyncio.get_running_loop().time()
+        waits = self._waits + [now - t for t in self._waiter_since]
+        self._waits = []
+        self._last_wait = max(waits, default=0.0)
+
+        if (
+            self._last_wait >= settings.STOCKFISH_SCALE_UP_WAIT
+            and self._size < self._max_size
+            and self._breaker.state == "closed"
+        ):
+            await self._scale_up(
+                min(max(1, self._waiting), self._max_size - self._size)
+            )
+        elif not self._waiting and self._size > self._min_size:
+            await self._scale_down()
+
+    async def _scale_up(self, count: int) -> None:
+        self._size += count
+        self._record_scaling("up", f"acquire wait {self._last_wait:.3f}s")
+
+        engines = await asyncio.gather(
+            *(self._spawn() for _ in range(count)),
+            return_exceptions=True,
+        )
+        for engine in engines:
+            if isinstance(engine, BaseException):
+                self._size -= 1
+                self.spawn_failures += 1
+                continue
+            self._engines.append(engine)
+            self._hand_off(engine)
+        self.scale_ups += 1
+
+    async def _scale_down(self) -> None:
+        """
+        Retire the engine idle the longest, if idle past the cooldown.
+        """
+        idlest = min(self._idle, key=lambda e: e.last_used, default=None)
+        cold = (
+            idlest is not None
+            and time.monotonic() - idlest.last_used
+            >= settings.STOCKFISH_SCALE_DOWN_IDLE
+        )
+        if not cold:
+            return
+
+        self._idle.remove(idlest)
+        self._size -= 1
+        self._engines.remove(idlest)
+        self.scale_downs += 1
+        self._record_scaling("down", "idle past cooldown")
+        await idlest.quit()
+
+    def _record_scaling(self, action: str, reason: str) -> None:
+        self.scaling_events.append(
+            {
+                "at": time.time(),
+                "action": action,
+                "size": self._size,
+                "hash_per_engine_mb": self.hash_per_engine,
+                "reason": reason,
+            }
+        )
+
+
+def _available_memory_mb() -> Optional[int]:
+    """
+    MemAvailable from /proc/meminfo (Linux), None elsewhere.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def host_engine_limit(threads: int, hash_budget_mb: int) -> int:
+    """
+    Max engines this host can run: one per `threads` CPUs this process
+    may use, and no more than fit in the available memory next to the
+    (shared) hash budget.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:      # not available on macOS / Windows
+        cpus = os.cpu_count() or 1
+
+    limit = max(1, cpus // max(1, threads))
+
+    available = _available_memory_mb()
+    if available is not None:
+        usable = available * settings.STOCKFISH_RAM_FRACTION - hash_budget_mb
+        limit = min(limit, max(1, int(usable // settings.STOCKFISH_ENGINE_MB)))
+
+    return limit
@@ -0,0 +1,68 @@
+import asyncio
+from enum import Enum
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.infrastructure.stockfish.async_pool import AsyncStockfishEnginePool
+
+
+class Workload(str, Enum):
+    ANALYSIS = "analysis"    # deep searches, big hash, maybe several threads
+    PLAY = "play"            # instant shallow bot moves, small hash
+
+
+class EnginePools:
+    """
+    One engine pool per workload, so a burst of one workload never
+    queues requests of the other. A workload without its own pool
+    falls back to the analysis pool.
+    """
+
+    def __init__(self, pools: Dict[Workload, AsyncStockfishEnginePool]):
+        self._pools = pools
+
+    @classmethod
+    def from_settings(cls) -> "EnginePools":
+        pools = {
+            Workload.ANALYSIS: AsyncStockfishEnginePool(
+                options=_eval_file_option(settings.STOCKFISH_EVAL_FILE),
+            ),
+        }
+
+        if settings.PLAY_POOL_SIZE > 0:
+            pools[Workload.PLAY] = AsyncStockfishEnginePool(
+                size=settings.PLAY_POOL_SIZE,
+                threads=settings.PLAY_POOL_THREADS,
+                hash_mb=settings.PLAY_POOL_HASH_MB,
+                autoscale=settings.PLAY_POOL_AUTOSCALE,
+                max_size=settings.PLAY_POOL_MAX_SIZE,
+                hash_budget_mb=None,
+                options=_eval_file_option(settings.PLAY_POOL_EVAL_FILE),
+            )
+
+        return cls(pools)
+
+    def get(self, workload: Workload) -> AsyncStockfishEnginePool:
+        return self._pools.get(workload) or self._pools[Workload.ANALYSIS]
+
+    async def create(self) -> None:
+        await asyncio.gather(*(pool.create() for pool in self._pools.values()))
+
+    async def shutdown(self) -> None:
+        await asyncio.gather(
+            *(pool.shutdown() for pool in self._pools.values()),
+            return_exceptions=True,
+        )
+
+    def stats(self) -> dict:
+        return {
+            workload.value: pool.stats()
+            for workload, pool in self._pools.items()
+        }
+
+
+def _eval_file_option(eval_file: Optional[str]) -> Optional[dict]:
+    """
+    NNUE network for the pool's engines (Stockfish "EvalFile" option).
+    """
+    return {"EvalFile": eval_file} if eval_file else None
@@ -1,11 +1,29 @@
+from collections import Counter
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.analysis import router as analysis_router
 from app.api.v1.play import router as play_router
 from app.api.v1.parse import router as parse_router
-
-from app.infrastructure.stockfish.pool import StockfishEnginePool
+from app.api.v1.metrics import router as metrics_router
+
+from app.core.config import settings
+from app.domain.opening_book import set_opening_book
+from app.domain.opening_moves import set_opening_move_table
+from app.domain.opening_names import set_eco_source
+from app.infrastructure.cache.eval_cache import EvalCache
+from app.infrastructure.cache.eval_store import SqliteEvalStore
+from app.infrastructure.cache.game_cache import GameAnalysisCache
+from app.infrastructure.opening.book_loader import load_opening_book
+from app.infrastructure.opening.move_table import load_opening_move_table
+from app.infrastructure.stockfish.pools import EnginePools, Workload
+from app.services.admission_service import AdmissionController
+from app.services.search_service import SearchService
+from app.services.analysis_service import AnalysisService
+from app.services.job_service import AnalysisJobScheduler
+from app.services.play_service import PlayService
+from app.services.play_session_service import PlaySessionManager
 
 
 # -------------------------------------------------
@@ -36,27 +54,109 @@ app.add_middleware(
 # -------------------------------------------------
 
 @app.on_event("startup")
-def startup() -> None:
+async def startup() -> None:
     """
     Application startup:
-    - create Stockfish engine pool
+    - load the opening book, select ECO data (if configured)
+    - load precomputed opening moves for play (if configured)
+    - create Stockfish engine pools (analysis / play)
+    - put admission control in front of each pool
+    - create shared evaluation cache (+ optional on-disk store)
+    - create analysed-game cache for incremental re-analysis
+    - start background analysis job scheduler
+    - start play session manager (idle sessions release engines)
+    - count requests abandoned by disconnecting clients
     - store in app.state
     """
-    pool = StockfishEnginePool()
-    pool.create()                      # 🔑 CRITICAL
-    app.state.engine_pool = pool
+    if settings.OPENING_BOOK_PATH:
+        set_opening_book(load_opening_book(settings.OPENING_BOOK_PATH))
+
+    if settings.ECO_DATA_PATH:
+        set_eco_source(settings.ECO_DATA_PATH)    # loaded on first use
+
+    if settings.PLAY_OPENING_TABLE_PATH:
+        set_opening_move_table(
+            load_opening_move_table(settings.PLAY_OPENING_TABLE_PATH)
+        )
+
+    pools = EnginePools.from_settings()
+    await pools.create()               # 🔑 CRITICAL
+    app.state.engine_pools = pools
+
+    app.state.admission = {
+        workload: AdmissionController(
+            pools.get(workload),
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            ply_seconds=settings.ADMISSION_PLY_SECONDS,
+            fair=settings.ADMISSION_FAIR_QUEUING,
+            engines_per_request=(
+                settings.ANALYSIS_PARALLEL_ENGINES
+                if workload == Workload.ANALYSIS
+                else 1
+            ),
+        )
+        for workload in Workload
+    }
+
+    eval_store = (
+        SqliteEvalStore(
+            settings.EVAL_STORE_PATH,
+            max_entries=settings.EVAL_STORE_MAX_ENTRIES,
+        )
+        if settings.EVAL_STORE_PATH
+        else None
+    )
+
+    search_service = SearchService(
+        EvalCache(settings.EVAL_CACHE_MAX_ENTRIES),
+        eval_store,
+    )
+    search_service.preload(settings.EVAL_STORE_PRELOAD)
+    app.state.search_service = search_service
+
+    app.state.game_cache = GameAnalysisCache(settings.GAME_CACHE_MAX_ENTRIES)
+
+    job_scheduler = AnalysisJobScheduler(
+        AnalysisService(pools, search_service),
+        workers=settings.STOCKFISH_POOL_SIZE,
+        result_ttl=settings.ANALYSIS_JOB_RESULT_TTL,
+        max_retained=settings.ANALYSIS_JOB_MAX_RETAINED,
+        admission=app.state.admission[Workload.ANALYSIS],
+    )
+    await job_scheduler.start()
+    app.state.job_scheduler = job_scheduler
+
+    play_sessions = PlaySessionManager(
+        pools,
+        PlayService(pools, search_service),
+        idle_timeout=settings.PLAY_SESSION_IDLE_TIMEOUT,
+        max_sessions=settings.PLAY_SESSION_MAX,
+        acquire_timeout=settings.PLAY_SESSION_ACQUIRE_TIMEOUT,
+    )
+    await play_sessions.start()
+    app.state.play_sessions = play_sessions
+
+    app.state.cancellations = Counter()
 
     print("🚀 Application startup (engine pool ready)")
 
 
 @app.on_event("shutdown")
-def shutdown() -> None:
+async def shutdown() -> None:
     """
     Application shutdown:
+    - cancel background analysis jobs
+    - close play sessions
     - gracefully stop all engines
+    - close the evaluation store
     """
-    pool: StockfishEnginePool = app.state.engine_pool
-    pool.shutdown()
+    await app.state.job_scheduler.stop()
+    await app.state.play_sessions.stop()
+
+    pools: EnginePools = app.state.engine_pools
+    await pools.shutdown()
+
+    app.state.search_service.close()
 
     print("🛑 Application shutdown (engine pool closed)")
 
@@ -68,3 +168,4 @@ def shutdown() -> None:
 app.include_router(analysis_router, prefix="/api/v1")
 app.include_router(play_router, prefix="/api/v1")
 app.include_router(parse_router, prefix="/api/v1")
+app.include_router(metrics_router, prefix="/api/v1")
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 from app.schemas.summary import GameSummarySchema
@@ -34,6 +34,18 @@ class MoveAnalysisSchema(BaseModel):
         None, example="d4"
     )
 
+    depth: Optional[int] = Field(
+        None,
+        example=18,
+        description="Search depth reached for eval_after (null for BOOK)",
+    )
+
+    stop_reason: Optional[str] = Field(
+        None,
+        example="CONVERGED",
+        description="Why the search behind eval_after stopped",
+    )
+
 
 class OpeningSchema(BaseModel):
     eco: str = Field(..., example="B20")
@@ -45,3 +57,33 @@ class AnalysisResponseSchema(BaseModel):
     moves: List[MoveAnalysisSchema]
     summary: GameSummarySchema
     key_moments: List[KeyMomentSchema]
+
+    quality_tier: str = Field(
+        "FULL",
+        example="FULL",
+        description=(
+            "Search quality the new plies were served at: REDUCED or "
+            "MINIMAL when depth / MultiPV were cut under load (re-request "
+            "later for FULL)"
+        ),
+    )
+
+
+class AnalysisStreamSummarySchema(BaseModel):
+    """
+    Final event of a streamed analysis, sent after the last move event.
+    """
+    opening: Optional[OpeningSchema]
+    summary: GameSummarySchema
+    key_moments: List[KeyMomentSchema]
+    quality_tier: str = Field("FULL", example="FULL")
+
+
+class BatchGameResultSchema(BaseModel):
+    """
+    One NDJSON line of a batch analysis: either result or error is set.
+    """
+    game_index: int = Field(..., example=0)
+    headers: Dict[str, str]
+    result: Optional[AnalysisResponseSchema] = None
+    error: Optional[str] = None
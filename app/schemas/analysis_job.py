@@ -0,0 +1,26 @@
+from typing import Optional
+from pydantic import Field, BaseModel
+
+from app.domain.enums import JobPriority, JobStatus
+from app.schemas.analysis import AnalysisResponseSchema
+from app.schemas.analysis_request import AnalysisRequestSchema
+
+
+class AnalysisJobRequestSchema(AnalysisRequestSchema):
+    priority: JobPriority = Field(
+        default=JobPriority.INTERACTIVE,
+        description="INTERACTIVE jobs overtake queued BULK jobs",
+    )
+
+
+class AnalysisJobSchema(BaseModel):
+    job_id: str
+    status: JobStatus
+    priority: JobPriority
+
+    plies_done: int = Field(..., example=12)
+    plies_total: int = Field(..., example=80)
+
+    # Set once status is DONE / FAILED
+    result: Optional[AnalysisResponseSchema] = None
+    error: Optional[str] = None
@@ -31,3 +31,15 @@ class AnalysisRequestSchema(BaseModel):
         ge=100,
         le=3000,
     )
+
+    deadline_ms: Optional[int] = Field(
+        default=None,
+        description=(
+            "Time budget: every move is evaluated shallowly first, then "
+            "the most important ones are deepened until the deadline. "
+            "Counted from the request's arrival, for jobs from when the "
+            "job starts"
+        ),
+        example=2000,
+        gt=0,
+    )
@@ -1,4 +1,6 @@
 from typing import Optional
+
+import chess
 from pydantic import BaseModel, Field
 
 
@@ -42,4 +44,75 @@ class PlayResponseSchema(BaseModel):
     is_check: bool
     is_checkmate: bool
 
-    engine_effective_elo: int
+    engine_effective_elo: Optional[int] = None
+
+    quality_tier: str = Field(
+        "FULL",
+        example="FULL",
+        description="REDUCED / MINIMAL when the search was cut under load",
+    )
+
+
+class PlaySessionCreateSchema(BaseModel):
+    fen: str = Field(
+        default=chess.STARTING_FEN,
+        description="Start position in FEN",
+    )
+    depth: Optional[int] = Field(
+        default=None,
+        description="Stockfish search depth override",
+        example=12,
+    )
+    elo: Optional[int] = Field(
+        default=None,
+        ge=400,
+        le=3000,
+        description="Limit engine strength to target ELO",
+        example=1200,
+    )
+
+
+class PlaySessionSchema(BaseModel):
+    session_id: str
+    fen: str
+    depth: int
+    elo: Optional[int] = None
+    idle_timeout: float = Field(
+        ...,
+        description="Seconds without a move after which the session ends",
+    )
+
+
+class PlaySessionMoveRequestSchema(BaseModel):
+    uci: Optional[str] = Field(
+        default=None,
+        description="The user's move; omit to let the engine move first",
+        example="e2e4",
+    )
+
+
+class PlaySessionMoveSchema(BaseModel):
+    session_id: str
+    user_move_uci: Optional[str] = None
+
+    # null when the user's move ended the game
+    engine_move_uci: Optional[str] = Field(None, example="e7e5")
+    engine_move_san: Optional[str] = Field(None, example="e5")
+
+    fen_after: str
+    eval: Optional[float] = Field(
+        None,
+        description="Evaluation in pawns, as in /play/move",
+        example=0.32,
+    )
+
+    is_check: bool
+    is_checkmate: bool
+    game_over: bool
+
+    engine_effective_elo: Optional[int] = None
+
+    ponder_hit: bool = Field(
+        ...,
+        description="The engine had pondered on the user's move",
+    )
@@ -0,0 +1,397 @@
+import asyncio
+import math
+import itertools
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, List, Optional
+
+from app.infrastructure.stockfish.async_pool import AsyncStockfishEnginePool
+
+
+# Weight of the newest request in the per-ply engine time average
+PLY_SECONDS_ALPHA = 0.2
+
+# Shortest Retry-After sent with a rejection (seconds)
+MIN_RETRY_AFTER = 1
+
+
+class AdmissionRejected(RuntimeError):
+    """
+    The request would not get an engine in time; retry after
+    `retry_after` seconds (sent as HTTP 429 + Retry-After).
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(MIN_RETRY_AFTER, math.ceil(retry_after))
+
+
+@dataclass(eq=False)
+class AdmissionTicket:
+    client: str
+    cost: int                                # plies to search
+    service_time: Optional[float] = None     # fixed (deadline) requests
+    bounded: bool = True                     # takes a queue place
+    admitted_at: Optional[float] = None
+    future: "asyncio.Future[None]" = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class _ClientQueue:
+    """
+    One client's waiting tickets with running totals of their cost,
+    so estimating the work queued ahead does not walk every ticket.
+    """
+
+    def __init__(self):
+        self.tickets: Deque[AdmissionTicket] = deque()
+        self.plies = 0              # tickets costed per ply
+        self.seconds = 0.0          # tickets with a fixed service_time
+        self.places = 0             # bounded tickets
+
+    def __len__(self) -> int:
+        return len(self.tickets)
+
+    def append(self, ticket: AdmissionTicket) -> None:
+        self.tickets.append(ticket)
+        self._count(ticket, 1)
+
+    def popleft(self) -> AdmissionTicket:
+        ticket = self.tickets.popleft()
+        self._count(ticket, -1)
+        return ticket
+
+    def remove(self, ticket: AdmissionTicket) -> None:
+        self.tickets.remove(ticket)
+        self._count(ticket, -1)
+
+    def time(self, ply_seconds: float, first: Optional[int] = None) -> float:
+        """
+        Service time of the first `first` tickets (default: all).
+        """
+        if first is None or first >= len(self.tickets):
+            return self.plies * ply_seconds + self.seconds
+
+        return sum(
+            _service_time(t, ply_seconds)
+            for t in itertools.islice(self.tickets, first)
+        )
+
+    def _count(self, ticket: AdmissionTicket, sign: int) -> None:
+        if ticket.service_time is not None:
+            self.seconds += sign * ticket.service_time
+        else:
+            self.plies += sign * ticket.cost
+        if ticket.bounded:
+            self.places += sign
+        if not self.tickets:
+            self.seconds = 0.0      # no float drift across refills
+
+
+def _service_time(ticket: AdmissionTicket, ply_seconds: float) -> float:
+    if ticket.service_time is not None:
+        return ticket.service_time
+    return ticket.cost * ply_seconds
+
+
+class AdmissionController:
+    """
+    Admission control in front of one engine pool.
+
+    At most `slots` requests run at once (pool engines not bound to a
+    play session, divided by the engines one request uses), the rest
+    wait in a bounded queue. A request is turned away up front, with a
+    retry hint, when the queue is full or when its expected wait
+    (recent engine time per ply times the plies queued and running
+    ahead of it) exceeds max_wait, instead of queueing until the
+    client has given up.
+
+    With fair queuing, queued requests are served round-robin by
+    client, and when the queue is full a client with fewer queued
+    requests takes the newest place of the client with the most.
+
+    Work accepted earlier (batch games, background jobs) enters
+    unbounded: it waits its turn in the same queues but takes no queue
+    place, and is never rejected or evicted.
+    """
+
+    def __init__(
+        self,
+        pool: AsyncStockfishEnginePool,
+        max_queue: int,
+        ply_seconds: float,
+        fair: bool = False,
+        engines_per_request: int = 1,
+    ):
+        self._pool = pool
+        self._max_queue = max_queue
+        self._ply_seconds = ply_seconds
+        self._fair = fair
+        self._engines_per_request = max(1, engines_per_request)
+
+        self._queues: "OrderedDict[str, _ClientQueue]" = OrderedDict()
+        self._queued = 0
+        self._unbounded = 0       # of _queued
+        self._active: List[AdmissionTicket] = []
+
+        self.admitted = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    @property
+    def slots(self) -> int:
+        return max(1, self._pool.shared_size // self._engines_per_request)
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        client: str,
+        cost: int,
+        max_wait: float,
+        service_time: Optional[float] = None,
+        bounded: bool = True,
+    ) -> AsyncIterator[AdmissionTicket]:
+        ticket = await self.enter(
+            client,
+            cost,
+            max_wait,
+            service_time,
+            bounded,
+        )
+        try:
+            yield ticket
+        finally:
+            self.leave(ticket)
+
+    async def enter(
+        self,
+        client: str,
+        cost: int,
+        max_wait: float,
+        service_time: Optional[float] = None,
+        bounded: bool = True,
+    ) -> AdmissionTicket:
+        """
+        Wait for a slot for `cost` plies of search (or a fixed
+        `service_time`). Raises AdmissionRejected if the slot is not
+        expected, or does not come, within max_wait seconds.
+        Pair with leave().
+
+        bounded=False is for work already accepted (see check): it
+        waits as long as it takes, outside the queue bound, and is
+        never evicted.
+        """
+        if not self._fair:
+            client = ""       # one shared FIFO queue
+
+        ticket = AdmissionTicket(client, cost, service_time, bounded)
+
+        if not self._queued and len(self._active) < self.slots:
+            self._activate(ticket)
+            return ticket
+
+        if bounded:
+            wait = self.expected_wait(client)
+            if wait > max_wait:
+                self._reject()
+                raise AdmissionRejected(
+                    f"Expected engine wait {wait:.1f}s is too long",
+                    wait,
+                )
+
+            if self._full() and not self._evict_for(client):
+                self._reject()
+                raise AdmissionRejected("Engine queue is full", wait)
+
+        self._queues.setdefault(client, _ClientQueue()).append(ticket)
+        self._queued += 1
+        if not bounded:
+            self._unbounded += 1
+
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(ticket.future),
+                max_wait if bounded else None,
+            )
+        except asyncio.TimeoutError:
+            self._withdraw(ticket)
+            self._reject()
+            raise AdmissionRejected(
+                "Engine queue did not move in time",
+                self.expected_wait(client),
+            )
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+
+        return ticket
+
+    def check(self, client: str, max_wait: float) -> None:
+        """
+        Raise AdmissionRejected if a request of `client` arriving now
+        would be turned away, without queueing it. For work that is
+        accepted now and enters later (batches, background jobs).
+        """
+        if not self._fair:
+            client = ""
+
+        if not self._queued and len(self._active) < self.slots:
+            return
+
+        wait = self.expected_wait(client)
+        if wait > max_wait:
+            self._reject()
+            raise AdmissionRejected(
+                f"Expected engine wait {wait:.1f}s is too long",
+                wait,
+            )
+
+        if self._full():
+            self._reject()
+            raise AdmissionRejected("Engine queue is full", wait)
+
+    def leave(self, ticket: AdmissionTicket) -> None:
+        if ticket not in self._active:
+            return
+
+        self._active.remove(ticket)
+
+        elapsed = self._now() - ticket.admitted_at
+        if ticket.service_time is None and ticket.cost > 0:
+            self._ply_seconds += PLY_SECONDS_ALPHA * (
+                elapsed / ticket.cost - self._ply_seconds
+            )
+
+        self._dispatch()
+
+    def expected_wait(self, client: str = "") -> float:
+        """
+        Seconds until a new request of `client` would get a slot.
+        """
+        if not self._queued and len(self._active) < self.slots:
+            return 0.0
+
+        now = self._now()
+        running = sum(
+            max(0.0, self._own_time(t) - (now - t.admitted_at))
+            for t in self._active
+        )
+        return (running + self._time_ahead(client)) / self.slots
+
+    def stats(self) -> dict:
+        return {
+            "slots": self.slots,
+            "active": len(self._active),
+            "queued": self._queued,
+            "queued_unbounded": self._unbounded,
+            "max_queue": self._max_queue,
+            "clients_queued": len(self._queues),
+            "fair_queuing": self._fair,
+            "ply_seconds": round(self._ply_seconds, 4),
+            "expected_wait": round(self.expected_wait(), 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+
+    def _full(self) -> bool:
+        return self._queued - self._unbounded >= self._max_queue
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _own_time(self, ticket: AdmissionTicket) -> float:
+        return _service_time(ticket, self._ply_seconds)
+
+    def _time_ahead(self, client: str) -> float:
+        """
+        Queued work served before a new request of `client`: all of it
+        in FIFO order, with round-robin up to as many requests per
+        client as `client` itself will have queued.
+
+        Queues no longer than that count by their running totals, so
+        in FIFO order (a single queue) this is constant time.
+        """
+        own = self._queues.get(client)
+        first = (len(own) if own is not None else 0) + 1
+        return sum(
+            queue.time(self._ply_seconds, first)
+            for queue in self._queues.values()
+        )
+
+    def _activate(self, ticket: AdmissionTicket) -> None:
+        ticket.admitted_at = self._now()
+        self._active.append(ticket)
+        self.admitted += 1
+
+    def _dispatch(self) -> None:
+        while self._queues and len(self._active) < self.slots:
+            client, queue = self._queues.popitem(last=False)
+            ticket = queue.popleft()
+            self._unqueue(ticket)
+            if queue:
+                self._queues[client] = queue    # to the back: round-robin
+
+            self._activate(ticket)
+            ticket.future.set_result(None)
+
+    def _withdraw(self, ticket: AdmissionTicket) -> None:
+        """
+        Drop a timed-out or cancelled waiter, giving back a slot that
+        was handed to it in the meantime.
+        """
+        queue = self._queues.get(ticket.client)
+        if queue is not None and ticket in queue.tickets:
+            queue.remove(ticket)
+            self._unqueue(ticket)
+            if not queue:
+                del self._queues[ticket.client]
+
+        if ticket.future.done() and not ticket.future.cancelled():
+            self.leave(ticket)
+        else:
+            ticket.future.cancel()
+
+    def _evict_for(self, client: str) -> bool:
+        """
+        Fair queuing: free a place by turning away the newest request
+        of the client with the most queued, if that is not `client`.
+        Only requests holding a queue place count (and are evicted).
+        """
+        if not self._fair:
+            return False
+
+        def places(c: str) -> int:
+            queue = self._queues.get(c)
+            return queue.places if queue is not None else 0
+
+        longest = max(self._queues, key=places)
+        if longest == client or places(longest) <= places(client) + 1:
+            return False
+
+        queue = self._queues[longest]
+        ticket = next(t for t in reversed(queue.tickets) if t.bounded)
+        queue.remove(ticket)
+        self._unqueue(ticket)
+        self.evicted += 1
+        ticket.future.set_exception(
+            AdmissionRejected(
+                "Evicted from the engine queue for fair sharing",
+                self.expected_wait(longest),
+            )
+        )
+        return True
+
+    def _unqueue(self, ticket: AdmissionTicket) -> None:
+        self._queued -= 1
+        if not ticket.bounded:
+            self._unbounded -= 1
+
+    def _reject(self) -> None:
+        self.rejected += 1
@@ -1,225 +1,576 @@
+import asyncio
 import io
-from typing import List, Tuple, Optional
+from contextlib import nullcontext
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    List,
+    Tuple,
+    Optional,
+)
 
 import chess
 import chess.pgn
-import chess.engine
 
-from app.domain.enums import MoveQuality
+from app.domain.convergence import ConvergenceCriteria
+from app.domain.degradation import (
+    DegradationPolicy,
+    degrade_depth,
+    degrade_multipv,
+)
+from app.domain.enums import QualityTier
 from app.domain.models import EvaluatedMove
-from app.domain.analysis import classify_move
-from app.domain.material import material_count, is_piece_hanging
-from app.domain.brilliance import BrilliantContext, calculate_brilliant_move
-from app.domain.analysis_heuristics import is_interesting_move
+from app.domain.evaluation import PositionEval
 from app.domain.opening import is_opening_phase
-from app.domain.opening_book import is_book_position, normalize_fen
-from app.domain.opening_names import detect_opening, OpeningInfo
-
-from app.infrastructure.stockfish.pool import StockfishEnginePool
+from app.domain.opening_names import OpeningInfo
+from app.domain.analysis_pipeline import (
+    AnalysisSnapshot,
+    GamePlan,
+    MoveAssembler,
+    plan_game,
+)
+
+from app.infrastructure.cache.game_cache import GameAnalysisCache
+from app.infrastructure.stockfish.async_pool import AcquirePriority
+from app.infrastructure.stockfish.pools import EnginePools, Workload
+from app.services.search_service import SearchService
 from app.core.config import settings
 
 
-class AnalysisService:
-    def __init__(self, engine_pool: StockfishEnginePool):
-        self._engine_pool = engine_pool
+# (position, depth, multipv) searched once; plies reference jobs by index
+SearchJob = Tuple[chess.Board, int, int]
+PlyJobs = Tuple[Optional[int], Optional[int]]
+
+# Shortest search sent to the engine (a UCI movetime of 1 ms)
+MIN_SEARCH_TIME = 0.001
+
+# Admission hook: entered with the number of plies to search
+Admit = Callable[[int], AsyncContextManager]
+
 
-    def analyze_pgn(
+class AnalysisService:
+    def __init__(
+        self,
+        engine_pools: EnginePools,
+        search_service: Optional[SearchService] = None,
+        game_cache: Optional[GameAnalysisCache] = None,
+    ):
+        self._engine_pool = engine_pools.get(Workload.ANALYSIS)
+        self._search_service = search_service or SearchService()
+        self._game_cache = game_cache
+
+        self._degradation = (
+            DegradationPolicy(
+                reduced_at=settings.QUALITY_REDUCED_AT,
+                minimal_at=settings.QUALITY_MINIMAL_AT,
+            )
+            if settings.QUALITY_DEGRADATION_ENABLED
+            else None
+        )
+
+    async def analyze_pgn(
         self,
         pgn_text: str,
         depth: Optional[int] = None,
         player_elo: int = 1200,
+        deadline_ms: Optional[int] = None,
     ) -> Tuple[List[EvaluatedMove], Optional[OpeningInfo]]:
 
-        game = chess.pgn.read_game(io.StringIO(pgn_text))
-        if game is None:
-            raise ValueError("Invalid PGN")
+        snapshot = await self.analyze_pgn_snapshot(
+            pgn_text,
+            depth,
+            player_elo,
+            deadline_ms,
+        )
 
-        board = game.board()
-        engine = self._engine_pool.acquire()
+        return list(snapshot.moves), snapshot.opening
 
-        try:
-            moves: List[EvaluatedMove] = []
-            opening_info: Optional[OpeningInfo] = None
+    async def analyze_pgn_snapshot(
+        self,
+        pgn_text: str,
+        depth: Optional[int] = None,
+        player_elo: int = 1200,
+        deadline_ms: Optional[int] = None,
+        admit: Optional[Admit] = None,
+    ) -> AnalysisSnapshot:
+        """
+        Analyze a game, resuming from the longest previously analysed
+        prefix (same start position, depth and Elo) when one is cached.
+        Only the new plies are searched and assembled.
+
+        With deadline_ms the new plies are analysed within that budget
+        (see _evaluate_anytime). Under load the search limits are cut
+        (see quality_tier). Such partial-depth results are not cached
+        as a snapshot.
+
+        admit (see AdmissionController) is entered with the number of
+        plies to search before any engine work; cache hits skip it.
+        """
+        deadline = (
+            asyncio.get_running_loop().time() + deadline_ms / 1000
+            if deadline_ms is not None
+            else None
+        )
+        game = self._read_game(pgn_text)
+
+        keys: List[str] = []
+        prefix = AnalysisSnapshot()
+
+        if self._game_cache is not None:
+            keys = self._game_cache.prefix_keys(
+                game.board().fen(),
+                [m.uci() for m in game.mainline_moves()],
+                depth,
+                player_elo,
+            )
+            _, cached = self._game_cache.longest_prefix(keys)
+            prefix = cached or prefix
+
+            if prefix.plies == len(keys) - 1:
+                return prefix
+
+        plan = plan_game(
+            game,
+            settings.OPENING_BOOK_MAX_FULL_MOVES,
+            start_ply=prefix.plies,
+            prev_is_book=prefix.last_is_book,
+        )
+
+        assembler = self._assembler(player_elo, prefix)
+        tier = self.quality_tier()
+
+        async with admit(plan.search_plies) if admit else nullcontext():
+            new_moves = [
+                m
+                async for m in self.iter_moves(
+                    plan,
+                    depth,
+                    player_elo,
+                    assembler,
+                    deadline,
+                    tier=tier,
+                )
+            ]
+        snapshot = prefix.extend(plan, new_moves, assembler.state, tier)
 
-            move_number = 1
-            prev_eval: Optional[float] = None
+        if (
+            self._game_cache is not None
+            and deadline is None
+            and tier == QualityTier.FULL
+        ):
+            self._game_cache.put(keys[-1], snapshot)
 
-            for move in game.mainline_moves():
-                color = "white" if board.turn == chess.WHITE else "black"
-                board_before = board.copy(stack=False)
+        return snapshot
 
-                san = board.san(move)
-                is_capture = board.is_capture(move)
+    async def analyze_game(
+        self,
+        game: chess.pgn.Game,
+        depth: Optional[int] = None,
+        player_elo: int = 1200,
+        priority: AcquirePriority = AcquirePriority.NORMAL,
+        admit: Optional[Admit] = None,
+    ) -> Tuple[List[EvaluatedMove], Optional[OpeningInfo]]:
 
-                # ---------------- OPENING BOOK ----------------
-                if (
-                    is_opening_phase(
-                        move_number,
-                        settings.OPENING_BOOK_MAX_FULL_MOVES,
-                    )
-                    and is_book_position(board_before)
-                ):
-                    board.push(move)
-
-                    if opening_info is None:
-                        detected = detect_opening(board)
-                        if detected:
-                            opening_info = detected
-
-                    moves.append(
-                        EvaluatedMove(
-                            move_number=move_number,
-                            color=color,
-                            uci=move.uci(),
-                            san=san,
-                            eval_before=prev_eval,
-                            eval_after=prev_eval,
-                            eval_loss=0.0,
-                            quality=MoveQuality.BOOK,
-                            is_check=board.is_check(),
-                            is_checkmate=board.is_checkmate(),
-                            is_capture=is_capture,
-                            clock=None,
-                        )
-                    )
+        plan = plan_game(game, settings.OPENING_BOOK_MAX_FULL_MOVES)
+
+        async with admit(plan.search_plies) if admit else nullcontext():
+            return await self._analyze_plan(
+                plan,
+                depth,
+                player_elo,
+                priority,
+            )
+
+    def plan_pgn(self, pgn_text: str) -> GamePlan:
+        """
+        Parse the first game of the PGN and plan its plies (no engine).
+        """
+        return plan_game(
+            self._read_game(pgn_text),
+            settings.OPENING_BOOK_MAX_FULL_MOVES,
+        )
+
+    def _read_game(self, pgn_text: str) -> chess.pgn.Game:
+        game = chess.pgn.read_game(io.StringIO(pgn_text))
+        if game is None:
+            raise ValueError("Invalid PGN")
 
-                    if color == "black":
-                        move_number += 1
-                    continue
+        return game
 
-                # ---------------- ENGINE EVAL ----------------
-                best_move = None
+    # ---------------- PIPELINE ----------------
 
-                if prev_eval is None:
-                    info = engine.analyze(
-                        board,
-                        chess.engine.Limit(
-                            depth=depth or settings.STOCKFISH_BASE_DEPTH
-                        )
-                    )
+    async def _analyze_plan(
+        self,
+        plan: GamePlan,
+        depth: Optional[int],
+        player_elo: int,
+        priority: AcquirePriority = AcquirePriority.NORMAL,
+    ) -> Tuple[List[EvaluatedMove], Optional[OpeningInfo]]:
 
-                    score = info["score"].white().score(mate_score=10000)
-                    prev_eval = score / 100 if score is not None else 0.0
+        moves = [
+            m
+            async for m in self.iter_moves(
+                plan,
+                depth,
+                player_elo,
+                priority=priority,
+            )
+        ]
 
-                    pv = info.get("pv")
-                    if pv:
-                        best_move = pv[0]
+        return moves, plan.opening
 
+    async def iter_moves(
+        self,
+        plan: GamePlan,
+        depth: Optional[int],
+        player_elo: int,
+        assembler: Optional[MoveAssembler] = None,
+        deadline: Optional[float] = None,
+        priority: AcquirePriority = AcquirePriority.NORMAL,
+        tier: QualityTier = QualityTier.FULL,
+    ) -> AsyncIterator[EvaluatedMove]:
+        """
+        Evaluate all planned positions and assemble moves in game order.
+        deadline is an event loop time (see _evaluate_anytime).
+        priority is the pool priority class of the engine acquires,
+        tier the quality the search limits are cut to.
+        """
+        jobs, ply_jobs = self._schedule(plan, depth, tier)
+
+        assembler = assembler or self._assembler(player_elo)
+
+        evaluations = (
+            self._evaluate(jobs, priority)
+            if deadline is None
+            else self._evaluate_anytime(jobs, ply_jobs, deadline, priority)
+        )
+        results: List[PositionEval] = []
 
-                before_material = material_count(board_before)
-                was_hanging = is_piece_hanging(
-                    board_before, move.from_square
+        try:
+            for ply, (before_job, after_job) in zip(plan.plies, ply_jobs):
+                while after_job is not None and len(results) <= after_job:
+                    results.append(await anext(evaluations))
+
+                yield assembler.add(
+                    ply,
+                    results[before_job] if before_job is not None else None,
+                    results[after_job] if after_job is not None else None,
                 )
+        finally:
+            await evaluations.aclose()
 
-                board.push(move)
+    def _schedule(
+        self,
+        plan: GamePlan,
+        depth: Optional[int],
+        tier: QualityTier = QualityTier.FULL,
+    ) -> Tuple[List[SearchJob], List[PlyJobs]]:
+        """
+        One search per position: the search after a move doubles as the
+        "before" search of the next move, so only plies that need their
+        own before search get a before job.
+        """
+        jobs: List[SearchJob] = []
+        ply_jobs: List[PlyJobs] = []
+
+        base_depth = degrade_depth(
+            depth or settings.STOCKFISH_BASE_DEPTH,
+            tier,
+        )
+        opening_depth = degrade_depth(settings.STOCKFISH_OPENING_DEPTH, tier)
+        multipv = degrade_multipv(settings.ANALYSIS_MULTIPV, tier)
+
+        for ply in plan.plies:
+            if ply.is_book:
+                ply_jobs.append((None, None))
+                continue
+
+            if ply.needs_before_search:
+                jobs.append((ply.board_before, base_depth, multipv))
+                before_job = len(jobs) - 1
+            else:
+                before_job = None
+
+            eval_depth = (
+                opening_depth
+                if is_opening_phase(
+                    ply.move_number,
+                    settings.OPENING_MAX_FULL_MOVES,
+                )
+                else base_depth
+            )
+            jobs.append((ply.board_after, eval_depth, multipv))
+
+            ply_jobs.append((before_job, len(jobs) - 1))
 
-                if opening_info is None:
-                    detected = detect_opening(board)
-                    if detected:
-                        opening_info = detected
+        return jobs, ply_jobs
 
-                eval_depth = (
-                    settings.STOCKFISH_OPENING_DEPTH
-                    if is_opening_phase(
-                        move_number,
-                        settings.OPENING_MAX_FULL_MOVES,
+    def _evaluate(
+        self,
+        jobs: List[SearchJob],
+        priority: AcquirePriority,
+    ) -> AsyncIterator[PositionEval]:
+        if settings.ANALYSIS_PARALLEL_ENGINES > 1 and len(jobs) > 1:
+            return self._evaluate_parallel(
+                jobs,
+                min(settings.ANALYSIS_PARALLEL_ENGINES, len(jobs)),
+                priority,
+            )
+        return self._evaluate_sequential(jobs, priority)
+
+    async def _evaluate_sequential(
+        self,
+        jobs: List[SearchJob],
+        priority: AcquirePriority,
+    ) -> AsyncIterator[PositionEval]:
+        """
+        Search the jobs in order on one engine, handing it over between
+        searches whenever a higher priority class is waiting for it.
+        """
+        if not jobs:
+            return
+
+        engine = await self._engine_pool.acquire(priority=priority)
+        try:
+            for board, depth, multipv in jobs:
+                if self._engine_pool.should_yield(priority):
+                    await self._engine_pool.release(engine)
+                    engine = None
+                    engine = await self._engine_pool.acquire(
+                        timeout=None,
+                        priority=priority,
                     )
-                    else depth or settings.STOCKFISH_BASE_DEPTH
-                )
 
-                eval_after = self._eval_depth(
-                    engine,
-                    board,
-                    eval_depth,
-                )
+                yield await self._search(engine, board, depth, multipv)
+        finally:
+            if engine is not None:
+                await self._engine_pool.release(engine)
+
+    async def _evaluate_parallel(
+        self,
+        jobs: List[SearchJob],
+        workers: int,
+        priority: AcquirePriority,
+    ) -> AsyncIterator[PositionEval]:
+        """
+        Fan the searches out over several pooled engines and yield the
+        results in job order.
+
+        The first engine is acquired like a sequential analysis would.
+        Helpers take extra engines as they become free and are cancelled
+        (releasing their engine) once every job has been handed out.
+        A helper gives its engine up for good when a higher priority
+        class waits; the first worker re-queues for one instead.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in jobs]
+        state = {"next": 0}
+
+        async def work(engine, keep: bool) -> None:
+            try:
+                while state["next"] < len(jobs):
+                    if self._engine_pool.should_yield(priority):
+                        await self._engine_pool.release(engine)
+                        engine = None
+                        if not keep:
+                            return
+                        engine = await self._engine_pool.acquire(
+                            timeout=None,
+                            priority=priority,
+                        )
+                        # Helpers may have taken the rest meanwhile
+                        if state["next"] >= len(jobs):
+                            return
+
+                    index = state["next"]
+                    state["next"] += 1
+
+                    board, depth, multipv = jobs[index]
+                    try:
+                        futures[index].set_result(
+                            await self._search(engine, board, depth, multipv)
+                        )
+                    except Exception as e:
+                        futures[index].set_exception(e)
+                        return
+            finally:
+                if engine is not None:
+                    await self._engine_pool.release(engine)
+
+        async def helper() -> None:
+            engine = await self._engine_pool.acquire(
+                timeout=None,
+                priority=priority,
+            )
+            await work(engine, keep=False)
+
+        first = await self._engine_pool.acquire(priority=priority)
+        tasks = [asyncio.create_task(work(first, keep=True))]
+        tasks += [
+            asyncio.create_task(helper())
+            for _ in range(workers - 1)
+        ]
 
-                if is_interesting_move(
-                    prev_eval, eval_after, is_capture, board
-                ):
-                    eval_after = self._eval_time(
+        try:
+            for future in futures:
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled():
+                    future.exception()   # mark retrieved
+
+    async def _evaluate_anytime(
+        self,
+        jobs: List[SearchJob],
+        ply_jobs: List[PlyJobs],
+        deadline: float,
+        priority: AcquirePriority,
+    ) -> AsyncIterator[PositionEval]:
+        """
+        Evaluate every job by the deadline, whatever the game length.
+
+        1. Shallow pass over all positions, each capped to its share of
+           ANALYSIS_DEADLINE_SHALLOW_SHARE of the budget.
+        2. Deepen positions towards their scheduled depth, largest eval
+           swing first, each search capped by the time left.
+
+        Every search is time-limited, so the last one ends at the
+        deadline (less ANALYSIS_DEADLINE_SAFETY_MS). Runs on one engine,
+        which is not yielded: the caller is waiting on the deadline.
+        """
+        if not jobs:
+            return
+
+        loop = asyncio.get_running_loop()
+        safety = settings.ANALYSIS_DEADLINE_SAFETY_MS / 1000
+
+        def remaining() -> float:
+            return deadline - safety - loop.time()
+
+        async with self._engine_pool.engine(
+            timeout=max(0.0, remaining()),
+            priority=priority,
+        ) as engine:
+            results: List[PositionEval] = []
+
+            # ---------------- SHALLOW PASS ----------------
+            shallow_share = settings.ANALYSIS_DEADLINE_SHALLOW_SHARE
+            shallow_until = loop.time() + max(0.0, remaining()) * shallow_share
+            for index, (board, depth, multipv) in enumerate(jobs):
+                share = (shallow_until - loop.time()) / (len(jobs) - index)
+                results.append(
+                    await self._search(
                         engine,
                         board,
-                        settings.STOCKFISH_DEEP_TIME,
+                        min(depth, settings.ANALYSIS_DEADLINE_SHALLOW_DEPTH),
+                        multipv,
+                        time_limit=max(MIN_SEARCH_TIME, share),
                     )
-
-                eval_loss = (
-                    max(0.0, prev_eval - eval_after)
-                    if color == "white"
-                    else max(0.0, eval_after - prev_eval)
                 )
 
-                quality = classify_move(eval_loss)
-
-                after_material = material_count(board)
-                material_delta = after_material - before_material
-                piece_sacrificed = material_delta < 0 and not is_capture
-
-                reply_eval = self._eval_time(engine, board, 0.05)
-
-                ctx = BrilliantContext(
-                    eval_before=int(prev_eval * 100),
-                    eval_after=int(eval_after * 100),
-                    eval_after_reply=int(reply_eval * 100),
-                    material_delta=material_delta,
-                    piece_sacrificed=piece_sacrificed,
-                    was_piece_hanging_before=was_hanging,
-                    was_forced_move=False,
-                    alternative_good_moves=2,
-                    move_gives_immediate_mate=board.is_checkmate(),
-                    move_is_capture=is_capture,
-                    player_elo=player_elo,
-                )
+            # ---------------- DEEPENING ----------------
+            swings = self._eval_swings(results, ply_jobs)
+            for index in sorted(range(len(jobs)), key=lambda i: -swings[i]):
+                board, depth, multipv = jobs[index]
+                if results[index].depth >= depth:
+                    continue
 
-                if (
-                    quality == MoveQuality.BEST
-                    and not is_opening_phase(
-                        move_number,
-                        settings.OPENING_MAX_FULL_MOVES,
-                    )
-                    and calculate_brilliant_move(ctx)
-                ):
-                    quality = MoveQuality.BRILLIANT
-
-                moves.append(
-                    EvaluatedMove(
-                        move_number=move_number,
-                        color=color,
-                        uci=move.uci(),
-                        san=san,
-                        eval_before=prev_eval,
-                        eval_after=eval_after,
-                        eval_loss=eval_loss,
-                        quality=quality,
-                        is_check=board.is_check(),
-                        is_checkmate=board.is_checkmate(),
-                        is_capture=is_capture,
-                        clock=None,
-                                # ✅ NEW
-                        best_move_uci=best_move.uci() if best_move else None,
-                        best_move_san=(
-                            board_before.san(best_move)
-                            if best_move else None
-                        ),
-                    )
-                )
+                budget = remaining()
+                if budget < MIN_SEARCH_TIME:
+                    break
 
-                prev_eval = eval_after
-                if color == "black":
-                    move_number += 1
+                deeper = await self._search(
+                    engine,
+                    board,
+                    depth,
+                    multipv,
+                    time_limit=budget,
+                )
+                if deeper.depth > results[index].depth:
+                    results[index] = deeper
 
-            return moves, opening_info
+        for evaluation in results:
+            yield evaluation
 
-        finally:
-            self._engine_pool.release(engine)
+    def _eval_swings(
+        self,
+        results: List[PositionEval],
+        ply_jobs: List[PlyJobs],
+    ) -> List[float]:
+        """
+        Per job, the largest eval swing (pawns) of a ply it belongs to.
+        """
+        swings = [0.0] * len(results)
+        prev_after: Optional[int] = None
+
+        for before_job, after_job in ply_jobs:
+            if after_job is None:
+                prev_after = None
+                continue
+
+            before = before_job if before_job is not None else prev_after
+            if before is not None:
+                swing = abs(results[after_job].score - results[before].score)
+                swings[before] = max(swings[before], swing)
+                swings[after_job] = max(swings[after_job], swing)
+
+            prev_after = after_job
+
+        return swings
+
+    def _assembler(
+        self,
+        player_elo: int,
+        prefix: AnalysisSnapshot = AnalysisSnapshot(),
+    ) -> MoveAssembler:
+        return MoveAssembler(
+            player_elo=player_elo,
+            opening_max_full_moves=settings.OPENING_MAX_FULL_MOVES,
+            alt_margin_cp=settings.ANALYSIS_ALT_MARGIN_CP,
+            state=prefix.assembler,
+        )
 
     # ---------------- ENGINE HELPERS ----------------
 
-    def _eval_depth(self, engine, board, depth: int) -> float:
-        info = engine.analyze(board, chess.engine.Limit(depth=depth))
-        score = info["score"].white().score(mate_score=10000)
-        return score / 100 if score is not None else 0.0
+    def quality_tier(self) -> QualityTier:
+        """
+        Quality an interactive analysis gets at the analysis pool's
+        current utilisation (background jobs always run FULL).
+        """
+        if self._degradation is None:
+            return QualityTier.FULL
 
-    def _eval_time(self, engine, board, time_s: float) -> float:
-        info = engine.analyze(board, chess.engine.Limit(time=time_s))
-        score = info["score"].white().score(mate_score=10000)
-        return score / 100 if score is not None else 0.0
+        return self._degradation.tier(self._engine_pool.utilisation)
+
+    async def _search(
+        self,
+        engine,
+        board,
+        depth: int,
+        multipv: int,
+        time_limit: Optional[float] = None,
+    ) -> PositionEval:
+        return await self._search_service.search(
+            engine,
+            board,
+            depth,
+            multipv=multipv,
+            time_limit=time_limit,
+            convergence=self._convergence(),
+        )
+
+    def _convergence(self) -> Optional[ConvergenceCriteria]:
+        if not settings.ANALYSIS_CONVERGENCE_ENABLED:
+            return None
+
+        return ConvergenceCriteria(
+            min_depth=settings.ANALYSIS_CONVERGENCE_MIN_DEPTH,
+            tolerance_cp=settings.ANALYSIS_CONVERGENCE_TOLERANCE_CP,
+            stable_iterations=settings.ANALYSIS_CONVERGENCE_ITERATIONS,
+        )
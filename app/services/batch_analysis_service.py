@@ -0,0 +1,145 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, TextIO, Tuple
+
+import chess.pgn
+
+from app.domain.models import EvaluatedMove
+from app.domain.opening_names import OpeningInfo
+from app.infrastructure.stockfish.async_pool import AcquirePriority
+from app.services.analysis_service import Admit, AnalysisService
+
+
+@dataclass(frozen=True)
+class BatchGameResult:
+    game_index: int
+    headers: Dict[str, str]
+    moves: Optional[List[EvaluatedMove]] = None
+    opening: Optional[OpeningInfo] = None
+    error: Optional[str] = None
+
+
+class BatchAnalysisService:
+    """
+    Analyzes every game of a multi-game PGN stream.
+
+    Games are read lazily and at most max_concurrent of them are parsed
+    or being analyzed at any time, so memory stays flat however long
+    the file is. Results are yielded in completion order.
+
+    Batch games acquire engines at low priority, so they never hold
+    up interactive analysis or play sharing the pool. With admit, each
+    game also enters admission control with its ply count.
+    """
+
+    def __init__(
+        self,
+        analysis_service: AnalysisService,
+        max_concurrent: int,
+        admit: Optional[Admit] = None,
+    ):
+        self._analysis_service = analysis_service
+        self._max_concurrent = max(1, max_concurrent)
+        self._admit = admit
+
+    async def iter_results(
+        self,
+        pgn_stream: TextIO,
+        depth: Optional[int] = None,
+        player_elo: int = 1200,
+    ) -> AsyncIterator[BatchGameResult]:
+        pending: Dict[asyncio.Task, Tuple[int, Dict[str, str]]] = {}
+
+        try:
+            async for game_index, game in self._iter_games(pgn_stream):
+                headers = dict(game.headers)
+
+                if game.errors:
+                    yield BatchGameResult(
+                        game_index=game_index,
+                        headers=headers,
+                        error=str(game.errors[0]),
+                    )
+                    continue
+
+                task = asyncio.create_task(
+                    self._analysis_service.analyze_game(
+                        game,
+                        depth,
+                        player_elo,
+                        AcquirePriority.LOW,
+                        self._admit,
+                    )
+                )
+                pending[task] = (game_index, headers)
+
+                if len(pending) >= self._max_concurrent:
+                    for result in await self._drain(pending):
+                        yield result
+
+            while pending:
+                for result in await self._drain(pending):
+                    yield result
+
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # -------------------------------------------------
+    # Helpers
+    # -------------------------------------------------
+
+    async def _iter_games(
+        self,
+        pgn_stream: TextIO,
+    ) -> AsyncIterator[Tuple[int, chess.pgn.Game]]:
+        """
+        Games parsed in a worker thread: a long game (or a slow spooled
+        file) does not block the event loop.
+        """
+        game_index = 0
+        while True:
+            game = await asyncio.to_thread(chess.pgn.read_game, pgn_stream)
+            if game is None:
+                return
+            yield game_index, game
+            game_index += 1
+
+    async def _drain(
+        self,
+        pending: Dict[asyncio.Task, Tuple[int, Dict[str, str]]],
+    ) -> List[BatchGameResult]:
+        done, _ = await asyncio.wait(
+            pending,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+
+        results: List[BatchGameResult] = []
+        for task in done:
+            game_index, headers = pending.pop(task)
+
+            try:
+                moves, opening = task.result()
+            except Exception as e:
+                # One failed game is one error line, never the end of
+                # the whole stream
+                results.append(
+                    BatchGameResult(
+                        game_index=game_index,
+                        headers=headers,
+                        error=str(e) or type(e).__name__,
+                    )
+                )
+                continue
+
+            results.append(
+                BatchGameResult(
+                    game_index=game_index,
+                    headers=headers,
+                    moves=moves,
+                    opening=opening,
+                )
+            )
+
+        return results
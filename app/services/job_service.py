@@ -0,0 +1,284 @@
+import asyncio
+import itertools
+import math
+import time
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.domain.enums import JobPriority, JobStatus
+from app.domain.models import EvaluatedMove
+from app.domain.opening_names import OpeningInfo
+from app.domain.analysis_pipeline import GamePlan
+from app.infrastructure.stockfish.async_pool import AcquirePriority
+from app.services.admission_service import AdmissionController
+from app.services.analysis_service import AnalysisService
+
+
+# Lower rank is served first
+PRIORITY_RANK = {
+    JobPriority.INTERACTIVE: 0,
+    JobPriority.BULK: 1,
+}
+
+# Engine pool priority class of each job priority
+ACQUIRE_PRIORITY = {
+    JobPriority.INTERACTIVE: AcquirePriority.NORMAL,
+    JobPriority.BULK: AcquirePriority.LOW,
+}
+
+FINISHED = (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class AnalysisJob:
+    """
+    Mutable state of one queued / running analysis.
+    """
+
+    id: str
+    priority: JobPriority
+    plan: GamePlan
+    depth: Optional[int]
+    player_elo: int
+    deadline_ms: Optional[int] = None    # budget from when it starts
+    client: str = ""
+
+    status: JobStatus = JobStatus.QUEUED
+    plies_done: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    moves: List[EvaluatedMove] = field(default_factory=list)
+    opening: Optional[OpeningInfo] = None
+    error: Optional[str] = None
+
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def plies_total(self) -> int:
+        return len(self.plan.plies)
+
+
+class AnalysisJobScheduler:
+    """
+    Background scheduler for long analyses.
+
+    One worker per pooled engine pulls jobs from a priority queue, so
+    interactive jobs overtake queued bulk re-analysis. Finished jobs
+    are kept for result_ttl seconds (and at most max_retained of them),
+    pruned whenever jobs are submitted, looked up or counted.
+
+    With admission, a job waits for a slot of the analysis pool's
+    admission control (as long as it takes) before it searches, so
+    jobs and requests share the same slots.
+    """
+
+    def __init__(
+        self,
+        analysis_service: AnalysisService,
+        workers: int,
+        result_ttl: float,
+        max_retained: int,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self._analysis_service = analysis_service
+        self._admission = admission
+        self._workers = max(1, workers)
+        self._result_ttl = result_ttl
+        self._max_retained = max_retained
+
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        # Live queued jobs: cancelled ones stay in _queue until popped
+        self._queued = 0
+        self._seq = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    # -------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------
+
+    async def start(self) -> None:
+        self._worker_tasks = [
+            asyncio.create_task(self._worker())
+            for _ in range(self._workers)
+        ]
+
+    async def stop(self) -> None:
+        for job in self._jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+        for task in self._worker_tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def submit(
+        self,
+        pgn_text: str,
+        depth: Optional[int] = None,
+        player_elo: int = 1200,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        deadline_ms: Optional[int] = None,
+        client: str = "",
+    ) -> AnalysisJob:
+        """
+        Validate and enqueue. Raises ValueError for invalid PGN.
+        """
+        self._prune()
+
+        job = AnalysisJob(
+            id=uuid.uuid4().hex,
+            priority=priority,
+            plan=self._analysis_service.plan_pgn(pgn_text),
+            depth=depth,
+            player_elo=player_elo,
+            deadline_ms=deadline_ms,
+            client=client,
+        )
+        self._jobs[job.id] = job
+        self._queued += 1
+        self._queue.put_nowait(
+            (PRIORITY_RANK[priority], next(self._seq), job.id)
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[AnalysisJob]:
+        """
+        Cancel a queued or running job. A running job stops its current
+        search and returns its engine to the pool.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+
+        if job.task is not None:
+            job.task.cancel()
+            await asyncio.wait([job.task])
+            if job.status not in FINISHED:
+                # Cancelled before _run got to start
+                self._finish(job, JobStatus.CANCELLED)
+        else:
+            self._queued -= 1
+            self._finish(job, JobStatus.CANCELLED)
+
+        return job
+
+    def stats(self) -> dict:
+        self._prune()
+        by_status = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            by_status[job.status.value] += 1
+
+        return {
+            "workers": self._workers,
+            "queue_depth": self._queued,
+            "jobs": by_status,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+
+            if job is None or job.status != JobStatus.QUEUED:
+                continue
+
+            self._queued -= 1
+            job.task = asyncio.create_task(self._run(job))
+            # wait() does not propagate the job's own cancellation
+            await asyncio.wait([job.task])
+
+    async def _run(self, job: AnalysisJob) -> None:
+        job.status = JobStatus.RUNNING
+        job.opening = job.plan.opening
+
+        admission = (
+            self._admission.admit(
+                job.client,
+                job.plan.search_plies,
+                max_wait=math.inf,
+                bounded=False,
+                service_time=(
+                    job.deadline_ms / 1000
+                    if job.deadline_ms is not None
+                    else None
+                ),
+            )
+            if self._admission is not None
+            else nullcontext()
+        )
+
+        try:
+            async with admission:
+                deadline = (
+                    asyncio.get_running_loop().time()
+                    + job.deadline_ms / 1000
+                    if job.deadline_ms is not None
+                    else None
+                )
+                async for move in self._analysis_service.iter_moves(
+                    job.plan,
+                    job.depth,
+                    job.player_elo,
+                    deadline=deadline,
+                    priority=ACQUIRE_PRIORITY[job.priority],
+                ):
+                    job.moves.append(move)
+                    job.plies_done += 1
+
+        except asyncio.CancelledError:
+            self._finish(job, JobStatus.CANCELLED)
+            raise
+
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            self._finish(job, JobStatus.FAILED)
+            return
+
+        self._finish(job, JobStatus.DONE)
+
+    def _finish(self, job: AnalysisJob, status: JobStatus) -> None:
+        job.status = status
+        job.finished_at = time.monotonic()
+
+        if status == JobStatus.DONE:
+            self.completed += 1
+        elif status == JobStatus.FAILED:
+            self.failed += 1
+        else:
+            self.cancelled += 1
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in FINISHED),
+            key=lambda j: j.finished_at,
+        )
+
+        overflow = len(finished) - self._max_retained
+        for index, job in enumerate(finished):
+            if index < overflow or now - job.finished_at > self._result_ttl:
+                del self._jobs[job.id]
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Sequence
 
 from app.domain.models import EvaluatedMove
 from app.domain.key_moves import detect_key_moments, KeyMoment
@@ -14,7 +14,12 @@ class KeyMoveService:
         moves: List[EvaluatedMove],
         max_items: int = 5,
     ) -> List[KeyMoment]:
-        moments = detect_key_moments(moves)
+        return self.top_key_moments(detect_key_moments(moves), max_items)
 
+    def top_key_moments(
+        self,
+        moments: Sequence[KeyMoment],
+        max_items: int = 5,
+    ) -> List[KeyMoment]:
         # Keep most important ones first
-        return moments[:max_items]
+        return list(moments[:max_items])
@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import chess
+import chess.polyglot
+
+from app.core.config import settings
+from app.domain.opening_moves import (
+    FULL_STRENGTH_BAND,
+    OpeningMoveTable,
+    TableMove,
+    band_elo,
+)
+from app.domain.opening_names import DEFAULT_ECO_SOURCE, iter_eco_lines
+from app.infrastructure.cache.eval_cache import EvalCache
+from app.infrastructure.opening.move_table import write_opening_move_table
+from app.infrastructure.stockfish.pools import EnginePools, Workload
+from app.services.play_service import PlayService
+from app.services.search_service import SearchService
+
+
+DEFAULT_SAMPLES = 32
+DEFAULT_MAX_PLIES = 16
+
+
+def opening_boards(
+    sources: Iterable[Path],
+    max_plies: int = DEFAULT_MAX_PLIES,
+) -> List[chess.Board]:
+    """
+    Distinct positions (either side to move) along the ECO lines of
+    the given TSV files or directories, up to max_plies deep.
+    """
+    boards: Dict[int, chess.Board] = {}
+
+    for source in sources:
+        paths = sorted(source.glob("*.tsv")) if source.is_dir() else [source]
+
+        for path in paths:
+            for _, sans in iter_eco_lines(path):
+                board = chess.Board()
+                boards.setdefault(chess.polyglot.zobrist_hash(board), board)
+
+                for san in sans[:max_plies]:
+                    board = board.copy(stack=False)
+                    board.push_san(san)
+                    boards.setdefault(
+                        chess.polyglot.zobrist_hash(board),
+                        board,
+                    )
+
+    return [b for b in boards.values() if not b.is_game_over()]
+
+
+class OpeningTableBuilder:
+    """
+    Offline builder of the per-Elo-band opening move table.
+
+    Asks the play engine for its move `samples` times per position
+    and band, exactly as play_move would (humanized MultiPV search
+    below native Elo, strength-limited engine above), and stores how
+    often each move came up. Bands are built in parallel, one play
+    engine each.
+    """
+
+    def __init__(
+        self,
+        engine_pools: EnginePools,
+        play_service: PlayService,
+        samples: int = DEFAULT_SAMPLES,
+    ):
+        self._engine_pool = engine_pools.get(Workload.PLAY)
+        self._play_service = play_service
+        self._samples = max(1, samples)
+
+    async def build(self, boards: Sequence[chess.Board]) -> OpeningMoveTable:
+        bands = await asyncio.gather(
+            *(
+                self._build_band(band, band_elo(band), boards)
+                for band in range(FULL_STRENGTH_BAND + 1)
+            )
+        )
+        return OpeningMoveTable(
+            entry for entries in bands for entry in entries
+        )
+
+    async def _build_band(
+        self,
+        band: int,
+        elo: Optional[int],
+        boards: Sequence[chess.Board],
+    ) -> List[Tuple[int, int, TableMove]]:
+        entries: List[Tuple[int, int, TableMove]] = []
+        depth = self._play_service.depth_for_elo(elo)
+
+        # Full strength at a fixed depth plays one move: sample once
+        samples = self._samples if elo is not None else 1
+
+        async with self._engine_pool.engine(timeout=None) as engine:
+            strength_limited = await self._play_service.configure_strength(
+                engine,
+                elo,
+            )
+            try:
+                for board in boards:
+                    key = chess.polyglot.zobrist_hash(board)
+                    for move in await self._distribution(
+                        engine,
+                        board,
+                        depth,
+                        elo,
+                        samples,
+                        strength_limited,
+                    ):
+                        entries.append((key, band, move))
+            finally:
+                if strength_limited and engine.alive:
+                    await engine.set_elo(None)
+
+        return entries
+
+    async def _distribution(
+        self,
+        engine,
+        board: chess.Board,
+        depth: int,
+        elo: Optional[int],
+        samples: int,
+        strength_limited: bool,
+    ) -> List[TableMove]:
+        counts: Counter = Counter()
+        scores: Dict[chess.Move, Optional[int]] = {}
+
+        for _ in range(samples):
+            choice = await self._play_service.choose_move(
+                engine,
+                board,
+                depth,
+                elo,
+            )
+            counts[choice.move] += 1
+
+            if choice.move not in scores:
+                after = board.copy(stack=False)
+                after.push(choice.move)
+                scores[choice.move], _ = await self._play_service.score_move(
+                    engine,
+                    after,
+                    choice,
+                    depth,
+                    strength_limited,
+                )
+
+        return [
+            TableMove(move, weight, scores[move] or 0)
+            for move, weight in counts.most_common()
+        ]
+
+
+async def build_opening_table(
+    path: str,
+    sources: Sequence[Path],
+    max_plies: int = DEFAULT_MAX_PLIES,
+    samples: int = DEFAULT_SAMPLES,
+) -> OpeningMoveTable:
+    boards = opening_boards(sources, max_plies)
+
+    pools = EnginePools.from_settings()
+    await pools.create()
+    try:
+        builder = OpeningTableBuilder(
+            pools,
+            PlayService(
+                pools,
+                SearchService(EvalCache(settings.EVAL_CACHE_MAX_ENTRIES)),
+            ),
+            samples,
+        )
+        table = await builder.build(boards)
+    finally:
+        await pools.shutdown()
+
+    write_opening_move_table(path, table)
+    return table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Precompute per-Elo-band opening moves for play "
+            "(load with PLAY_OPENING_TABLE_PATH)."
+        ),
+    )
+    parser.add_argument("output", help="table file to write")
+    parser.add_argument(
+        "--eco",
+        action="append",
+        type=Path,
+        help="ECO .tsv file or directory (default: ECO_DATA_PATH or seed)",
+    )
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES)
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    args = parser.parse_args()
+
+    sources = args.eco or [
+        Path(settings.ECO_DATA_PATH)
+        if settings.ECO_DATA_PATH
+        else DEFAULT_ECO_SOURCE
+    ]
+    table = asyncio.run(
+        build_opening_table(
+            args.output,
+            sources,
+            max_plies=args.max_plies,
+            samples=args.samples,
+        )
+    )
+    print(f"{len(table)} position/band entries written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,44 @@
 import chess
 import chess.engine
-from typing import Optional, List, Tuple
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Tuple
 
-from app.infrastructure.stockfish.pool import StockfishEnginePool
+from app.infrastructure.stockfish.async_pool import AcquirePriority
+from app.infrastructure.stockfish.pools import EnginePools, Workload
 from app.core.config import settings
+from app.domain.degradation import (
+    DegradationPolicy,
+    degrade_depth,
+    degrade_multipv,
+)
+from app.domain.enums import QualityTier
+from app.domain.evaluation import EngineLine
 from app.domain.humanization import select_human_like_move
+from app.domain.opening_moves import (
+    band_elo,
+    elo_band,
+    get_opening_move_table,
+    table_band,
+)
+from app.services.search_service import SearchService, engine_line
+
+
+# Candidate moves searched for humanized (sub-native Elo) play
+HUMANIZATION_MULTIPV = 5
+
+# Search depth per Elo band below 1800 (deeper bands: STOCKFISH_DEPTH)
+BAND_DEPTHS = (4, 6, 8, 10)
+
+
+@dataclass(frozen=True)
+class MoveChoice:
+    """
+    The engine's move and the search line that chose it (White's
+    point of view), or None when no trustworthy line came with it.
+    """
+
+    move: chess.Move
+    line: Optional[EngineLine] = None
 
 
 class PlayService:
@@ -13,56 +47,54 @@ class PlayService:
     Stateless, request-scoped configuration.
     """
 
-    def __init__(self, engine_pool: StockfishEnginePool):
-        self._engine_pool = engine_pool
+    def __init__(
+        self,
+        engine_pools: EnginePools,
+        search_service: Optional[SearchService] = None,
+    ):
+        # Own pool: bot moves never queue behind analyses. When play
+        # shares the analysis pool it is served ahead of them instead.
+        self._engine_pool = engine_pools.get(Workload.PLAY)
+        self._search_service = search_service or SearchService()
+
+        self._degradation = (
+            DegradationPolicy(
+                reduced_at=settings.QUALITY_REDUCED_AT,
+                minimal_at=settings.QUALITY_MINIMAL_AT,
+            )
+            if settings.QUALITY_DEGRADATION_ENABLED
+            else None
+        )
 
     # -------------------------------------------------
     # Depth scaling by ELO
     # -------------------------------------------------
 
-    def _depth_for_elo(self, elo: Optional[int]) -> int:
-        if elo is None:
-            return settings.STOCKFISH_DEPTH
-
-        if elo < 800:
-            return 4
-        if elo < 1100:
-            return 6
-        if elo < 1500:
-            return 8
-        if elo < 1800:
-            return 10
+    def depth_for_elo(self, elo: Optional[int]) -> int:
+        band = elo_band(elo)
+        if band < len(BAND_DEPTHS):
+            return BAND_DEPTHS[band]
         return settings.STOCKFISH_DEPTH
 
     # -------------------------------------------------
     # Helpers
     # -------------------------------------------------
 
-    def _normalize_multipv(self, result) -> List[dict]:
-        """
-        Normalize python-chess multipv output to a list.
-        """
-        if isinstance(result, list):
-            return result
-        if isinstance(result, dict):
-            return [result]
-        return []
-
     def _eval_cp_from_side_to_move(
         self,
-        score: chess.engine.PovScore,
+        line_score_cp: int,
         board: chess.Board,
-    ) -> Optional[int]:
+    ) -> int:
         """
         Always evaluate from side to move.
         """
-        return score.pov(board.turn).score(mate_score=10000)
+        return line_score_cp if board.turn == chess.WHITE else -line_score_cp
 
     # -------------------------------------------------
     # Public API
     # -------------------------------------------------
 
-    def play_move(
+    async def play_move(
         self,
         fen: str,
         depth: Optional[int] = None,
@@ -73,81 +105,257 @@ class PlayService:
         if board.is_game_over():
             raise ValueError("Game is already over")
 
-        engine = self._engine_pool.acquire()
+        # Precomputed opening move: no engine needed at all (the table
+        # was built at the default depths, not at an override)
+        choice = self.table_move(board, elo) if depth is None else None
+        if choice is not None:
+            san = board.san(choice.move)
+            board.push(choice.move)
+            result = self._move_result(
+                board,
+                choice.move,
+                san,
+                choice.line.score_cp,
+                elo,
+            )
+            result["quality_tier"] = QualityTier.FULL.value
+            return result
+
+        # Decided before acquiring: our own engine is not load
+        tier = (
+            self._degradation.tier(self._engine_pool.utilisation)
+            if self._degradation is not None
+            else QualityTier.FULL
+        )
+
+        engine = await self._engine_pool.acquire(
+            priority=AcquirePriority.HIGH,
+        )
+        strength_limited = False
 
         try:
-            effective_depth = depth or self._depth_for_elo(elo)
-            limit = chess.engine.Limit(depth=effective_depth)
-
-            # -----------------------------------------
-            # Engine strength config
-            # -----------------------------------------
-            if elo is not None and elo >= settings.STOCKFISH_MIN_ELO_NATIVE:
-                engine.set_elo(elo)
-                effective_elo = elo
-                use_humanization = False
-            else:
-                engine.set_elo(None)
-                effective_elo = elo
-                use_humanization = elo is not None
-
-            # -----------------------------------------
-            # Decide move
-            # -----------------------------------------
-            if use_humanization:
-                raw = engine.analyze(board, limit, multipv=5)
-                infos = self._normalize_multipv(raw)
-
-                candidates: List[Tuple[chess.Move, int]] = []
-
-                for info in infos:
-                    pv = info.get("pv")
-                    score = info.get("score")
-                    if not pv or score is None:
-                        continue
-
-                    cp = self._eval_cp_from_side_to_move(score, board)
-                    if cp is None:
-                        continue
-
-                    candidates.append((pv[0], cp))
-
-                if candidates:
-                    move = select_human_like_move(board, candidates, elo)
-                else:
-                    move = engine.play(board, limit).move
-            else:
-                move = engine.play(board, limit).move
-
-            if move is None:
-                raise RuntimeError("Engine did not return a move")
-
-            # -----------------------------------------
-            # Apply move
-            # -----------------------------------------
-            san = board.san(move)
-            board.push(move)
-
-            # -----------------------------------------
-            # Evaluate resulting position
-            # -----------------------------------------
-            info = engine.analyze(
+            effective_depth = degrade_depth(
+                depth or self.depth_for_elo(elo),
+                tier,
+            )
+            strength_limited = await self.configure_strength(engine, elo)
+
+            choice = await self.choose_move(
+                engine,
+                board,
+                effective_depth,
+                elo,
+                degrade_multipv(HUMANIZATION_MULTIPV, tier),
+            )
+            result = await self.apply_move(
+                engine,
                 board,
-                chess.engine.Limit(depth=effective_depth),
+                choice,
+                effective_depth,
+                elo,
+                strength_limited,
             )
+            del result["predicted_reply"]     # stateless: nobody ponders
+            result["quality_tier"] = tier.value
+            return result
 
-            cp = self._eval_cp_from_side_to_move(info["score"], board)
-            eval_pawns = cp / 100 if cp is not None else 0.0
+        finally:
+            try:
+                # A shared engine must go back to analysis at full strength
+                if strength_limited and engine.alive:
+                    await engine.set_elo(None)
+            finally:
+                await self._engine_pool.release(engine)
 
-            return {
-                "engine_move_uci": move.uci(),
-                "engine_move_san": san,
-                "fen_after": board.fen(),
-                "eval": eval_pawns,
-                "is_check": board.is_check(),
-                "is_checkmate": board.is_checkmate(),
-                "engine_effective_elo": effective_elo,
-            }
+    # -------------------------------------------------
+    # Move steps (shared with play sessions)
+    # -------------------------------------------------
 
-        finally:
-            self._engine_pool.release(engine)
+    def native_strength(self, elo: Optional[int]) -> bool:
+        """
+        Whether `elo` is played by the engine's own strength limit
+        (otherwise at full strength, humanized below native).
+        """
+        return elo is not None and elo >= settings.STOCKFISH_MIN_ELO_NATIVE
+
+    async def configure_strength(self, engine, elo: Optional[int]) -> bool:
+        """
+        Native strength limit from STOCKFISH_MIN_ELO_NATIVE up, full
+        strength below (humanization weakens those moves instead).
+        Returns whether the engine is now strength limited.
+        """
+        if self.native_strength(elo):
+            await engine.set_elo(elo)
+            return True
+
+        await engine.set_elo(None)
+        return False
+
+    def table_move(
+        self,
+        board: chess.Board,
+        elo: Optional[int],
+    ) -> Optional[MoveChoice]:
+        """
+        A move from the precomputed opening table for elo's band, its
+        line holding the stored score. None outside the table, and when
+        the band was sampled on the other side of the native strength
+        switch (its moves were chosen differently).
+        """
+        band = table_band(elo)
+        sampled_at = band_elo(band)
+        if (
+            elo is not None
+            and sampled_at is not None
+            and self.native_strength(elo) != self.native_strength(sampled_at)
+        ):
+            return None
+
+        entry = get_opening_move_table().sample(board, band)
+        if entry is None:
+            return None
+
+        return MoveChoice(
+            entry.move,
+            EngineLine(score_cp=entry.score_cp, pv=(entry.move,)),
+        )
+
+    async def choose_move(
+        self,
+        engine,
+        board: chess.Board,
+        depth: int,
+        elo: Optional[int],
+        multipv: int = HUMANIZATION_MULTIPV,
+    ) -> MoveChoice:
+        """
+        The engine's move for `board`, engine configured by
+        configure_strength(engine, elo), with the line that chose it.
+        """
+        limit = chess.engine.Limit(depth=depth)
+
+        if elo is not None and not self.native_strength(elo):
+            evaluation = await self._search_service.search(
+                engine,
+                board,
+                depth,
+                multipv=multipv,
+            )
+
+            lines: Dict[chess.Move, EngineLine] = {}
+            candidates: List[Tuple[chess.Move, int]] = []
+
+            for line in evaluation.lines:
+                if not line.pv:
+                    continue
+
+                cp = self._eval_cp_from_side_to_move(line.score_cp, board)
+                lines[line.pv[0]] = line
+                candidates.append((line.pv[0], cp))
+
+            if candidates:
+                move = select_human_like_move(board, candidates, elo)
+                return MoveChoice(move, lines.get(move))
+
+        result = await engine.play(
+            board,
+            limit,
+            info=chess.engine.INFO_SCORE | chess.engine.INFO_PV,
+        )
+        if result.move is None:
+            raise RuntimeError("Engine did not return a move")
+
+        # A strength-limited engine may play a move other than the one
+        # its last search line starts with; that score is not this move's
+        line = engine_line(result.info)
+        if line is None or line.pv[:1] != (result.move,):
+            line = None
+
+        return MoveChoice(result.move, line)
+
+    async def apply_move(
+        self,
+        engine,
+        board: chess.Board,
+        choice: MoveChoice,
+        depth: int,
+        elo: Optional[int],
+        strength_limited: bool,
+    ) -> dict:
+        """
+        Push the engine's move on `board` and describe the result.
+        "predicted_reply" is the opponent's expected answer (or None).
+
+        The eval comes from the line that chose the move; only without
+        one is the new position searched, shallowly.
+        """
+        move = choice.move
+        san = board.san(move)
+        board.push(move)
+
+        score_cp, reply = await self.score_move(
+            engine,
+            board,
+            choice,
+            depth,
+            strength_limited,
+        )
+        return {
+            **self._move_result(board, move, san, score_cp, elo),
+            "predicted_reply": reply,
+        }
+
+    async def score_move(
+        self,
+        engine,
+        board: chess.Board,
+        choice: MoveChoice,
+        depth: int,
+        strength_limited: bool,
+    ) -> Tuple[Optional[int], Optional[chess.Move]]:
+        """
+        Score (White's point of view) and expected reply after
+        choice.move, `board` being the position after it.
+        """
+        line = choice.line
+        if line is not None:
+            reply = line.pv[1] if len(line.pv) > 1 else None
+            return line.score_cp, reply
+
+        # Strength-limited results must not enter the shared cache
+        evaluation = await self._search_service.search(
+            engine,
+            board,
+            min(depth, settings.PLAY_EVAL_FALLBACK_DEPTH),
+            use_cache=not strength_limited,
+        )
+        best = evaluation.lines[0] if evaluation.lines else None
+        return (
+            best.score_cp if best is not None else None,
+            evaluation.best_move,
+        )
+
+    def _move_result(
+        self,
+        board: chess.Board,
+        move: chess.Move,
+        san: str,
+        score_cp: Optional[int],
+        elo: Optional[int],
+    ) -> dict:
+        cp = (
+            self._eval_cp_from_side_to_move(score_cp, board)
+            if score_cp is not None
+            else None
+        )
+        eval_pawns = cp / 100 if cp is not None else 0.0
+
+        return {
+            "engine_move_uci": move.uci(),
+            "engine_move_san": san,
+            "fen_after": board.fen(),
+            "eval": eval_pawns,
+            "is_check": board.is_check(),
+            "is_checkmate": board.is_checkmate(),
+            "engine_effective_elo": elo,
+        }
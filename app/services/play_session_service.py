@@ -0,0 +1,353 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import chess
+
+from app.infrastructure.stockfish.async_pool import (
+    AcquirePriority,
+    AsyncStockfishEngine,
+)
+from app.infrastructure.stockfish.pools import EnginePools, Workload
+from app.services.play_service import MoveChoice, PlayService
+
+
+@dataclass
+class Ponder:
+    """
+    Speculative search of the engine's answer to the predicted reply,
+    running while the user thinks.
+    """
+
+    reply: chess.Move
+    task: "asyncio.Task[MoveChoice]"
+
+
+@dataclass
+class PlaySession:
+    """
+    A game against the engine with an engine bound to it.
+    """
+
+    id: str
+    board: chess.Board
+    elo: Optional[int]
+    depth: int
+    engine: AsyncStockfishEngine
+    strength_limited: bool
+    opening_table: bool = True      # no depth override: table moves fit
+
+    last_active: float = field(default_factory=time.monotonic)
+    ponder: Optional[Ponder] = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class PlaySessionManager:
+    """
+    Stateful play: each session keeps one play-pool engine, already
+    configured for its Elo, for the whole game. At most pool size - 1
+    sessions are open, so stateless moves always have an engine, and
+    bound engines do not count as load for quality tiers.
+
+    After every engine move the engine ponders: it searches its answer
+    to the user's most likely reply. If the user plays that reply
+    (ponder hit) the search is already running or finished, otherwise
+    it is stopped and the real position searched. Sessions idle for
+    idle_timeout seconds are closed and their engine released.
+    """
+
+    def __init__(
+        self,
+        engine_pools: EnginePools,
+        play_service: PlayService,
+        idle_timeout: float,
+        max_sessions: int,
+        acquire_timeout: float,
+    ):
+        self._engine_pool = engine_pools.get(Workload.PLAY)
+        self._play_service = play_service
+        self._idle_timeout = idle_timeout
+        self._max_sessions = max_sessions
+        self._acquire_timeout = acquire_timeout
+
+        self._sessions: Dict[str, PlaySession] = {}
+        self._reserved = 0        # creates waiting for their engine
+        self._reaper: Optional[asyncio.Task] = None
+
+        self.created = 0
+        self.closed = 0
+        self.expired = 0
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+    # -------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------
+
+    async def start(self) -> None:
+        self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def stop(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+
+        for session in list(self._sessions.values()):
+            await self._close(session)
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    async def create(
+        self,
+        fen: str,
+        depth: Optional[int] = None,
+        elo: Optional[int] = None,
+    ) -> PlaySession:
+        """
+        Bind an engine to a new game. Raises ValueError for an invalid
+        or finished position, RuntimeError when no engine is free.
+        """
+        board = chess.Board(fen)
+        if board.is_game_over():
+            raise ValueError("Game is already over")
+
+        # Slot reserved before awaiting, so concurrent creates can't
+        # overshoot the limit
+        if self.max_sessions < 1:
+            raise RuntimeError("Play sessions need a play pool of 2+ engines")
+        if len(self._sessions) + self._reserved >= self.max_sessions:
+            raise RuntimeError("Too many play sessions, try again later")
+
+        self._reserved += 1
+        try:
+            engine = await self._engine_pool.acquire(
+                timeout=self._acquire_timeout,
+                priority=AcquirePriority.HIGH,
+            )
+            try:
+                strength_limited = (
+                    await self._play_service.configure_strength(engine, elo)
+                )
+            except BaseException:
+                await self._engine_pool.release(engine)
+                raise
+
+            self._engine_pool.bind(engine)
+        finally:
+            self._reserved -= 1
+
+        session = PlaySession(
+            id=uuid.uuid4().hex,
+            board=board,
+            elo=elo,
+            depth=depth or self._play_service.depth_for_elo(elo),
+            engine=engine,
+            strength_limited=strength_limited,
+            opening_table=depth is None,
+        )
+        self._sessions[session.id] = session
+        self.created += 1
+        return session
+
+    @property
+    def max_sessions(self) -> int:
+        """
+        Configured limit, keeping one play engine for stateless moves.
+        """
+        return min(self._max_sessions, self._engine_pool.size - 1)
+
+    def get(self, session_id: str) -> Optional[PlaySession]:
+        return self._sessions.get(session_id)
+
+    async def move(
+        self,
+        session: PlaySession,
+        uci: Optional[str] = None,
+    ) -> dict:
+        """
+        Apply the user's move (if any), then play the engine's move.
+        Raises ValueError for an illegal move.
+        """
+        async with session.lock:
+            session.last_active = time.monotonic()
+            board = session.board
+
+            user_move = self._parse_move(board, uci) if uci else None
+
+            ponder, session.ponder = session.ponder, None
+            hit = ponder is not None and ponder.reply == user_move
+            if ponder is not None and not hit:
+                self.ponder_misses += 1
+                await self._cancel(ponder)
+
+            if user_move is not None:
+                board.push(user_move)
+
+            # (A ponder is never started for a game-ending reply)
+            if board.is_game_over():
+                return self._game_over(session, uci)
+
+            try:
+                if ponder is not None and hit:
+                    self.ponder_hits += 1
+                    choice = await ponder.task
+                else:
+                    choice = (
+                        self._play_service.table_move(board, session.elo)
+                        if session.opening_table
+                        else None
+                    ) or await self._play_service.choose_move(
+                        session.engine,
+                        board,
+                        session.depth,
+                        session.elo,
+                    )
+
+                result = await self._play_service.apply_move(
+                    session.engine,
+                    board,
+                    choice,
+                    session.depth,
+                    session.elo,
+                    session.strength_limited,
+                )
+            except Exception:
+                # The engine is suspect: give it back to the pool
+                await self._close(session)
+                raise
+
+            predicted = result.pop("predicted_reply")
+            if predicted is not None and not board.is_game_over():
+                session.ponder = self._ponder(session, predicted)
+
+            session.last_active = time.monotonic()
+            return {
+                **result,
+                "session_id": session.id,
+                "user_move_uci": uci,
+                "ponder_hit": hit,
+                "game_over": board.is_game_over(),
+            }
+
+    async def close(self, session_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return False
+
+        async with session.lock:
+            await self._close(session)
+        return True
+
+    def stats(self) -> dict:
+        pondered = self.ponder_hits + self.ponder_misses
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self._idle_timeout,
+            "created": self.created,
+            "closed": self.closed,
+            "expired": self.expired,
+            "ponder_hits": self.ponder_hits,
+            "ponder_misses": self.ponder_misses,
+            "ponder_hit_rate": (
+                round(self.ponder_hits / pondered, 4) if pondered else 0.0
+            ),
+        }
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+
+    def _parse_move(self, board: chess.Board, uci: str) -> chess.Move:
+        try:
+            move = chess.Move.from_uci(uci)
+        except ValueError:
+            raise ValueError(f"Invalid UCI move: {uci}")
+
+        if move not in board.legal_moves:
+            raise ValueError(f"Illegal move: {uci}")
+
+        return move
+
+    def _ponder(
+        self,
+        session: PlaySession,
+        reply: chess.Move,
+    ) -> Optional[Ponder]:
+        board = session.board.copy(stack=False)
+        board.push(reply)
+        if board.is_game_over():
+            return None
+
+        task = asyncio.create_task(
+            self._play_service.choose_move(
+                session.engine,
+                board,
+                session.depth,
+                session.elo,
+            )
+        )
+        return Ponder(reply, task)
+
+    async def _cancel(self, ponder: Ponder) -> None:
+        """
+        Stop a ponder search (cancelling it sends the engine "stop").
+        """
+        ponder.task.cancel()
+        await asyncio.gather(ponder.task, return_exceptions=True)
+
+    def _game_over(self, session: PlaySession, uci: Optional[str]) -> dict:
+        board = session.board
+        return {
+            "session_id": session.id,
+            "user_move_uci": uci,
+            "engine_move_uci": None,
+            "engine_move_san": None,
+            "fen_after": board.fen(),
+            "eval": None,
+            "is_check": board.is_check(),
+            "is_checkmate": board.is_checkmate(),
+            "engine_effective_elo": session.elo,
+            "ponder_hit": False,
+            "game_over": True,
+        }
+
+    async def _close(self, session: PlaySession) -> bool:
+        """
+        Release the session's engine. False if it was already closed.
+        """
+        if self._sessions.pop(session.id, None) is None:
+            return False
+
+        if session.ponder is not None:
+            await self._cancel(session.ponder)
+            session.ponder = None
+
+        engine = session.engine
+        try:
+            # Back to the pool at full strength
+            if session.strength_limited and engine.alive:
+                await engine.set_elo(None)
+        except Exception:
+            pass
+        finally:
+            await self._engine_pool.release(engine)
+            self.closed += 1
+
+        return True
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self._idle_timeout / 4))
+
+            now = time.monotonic()
+            for session in list(self._sessions.values()):
+                idle = now - session.last_active
+                if idle >= self._idle_timeout and not session.lock.locked():
+                    async with session.lock:
+                        if await self._close(session):
+                            self.expired += 1
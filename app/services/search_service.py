@@ -0,0 +1,258 @@
+import asyncio
+from collections import Counter
+from dataclasses import replace
+from typing import Optional, Tuple
+
+import chess
+import chess.engine
+import chess.polyglot
+
+from app.domain.convergence import ConvergenceCriteria, ConvergenceTracker
+from app.domain.enums import SearchStopReason
+from app.domain.evaluation import EngineLine, PositionEval
+from app.infrastructure.cache.eval_cache import EvalCache
+from app.infrastructure.cache.eval_store import SqliteEvalStore
+
+
+def engine_line(info: dict) -> Optional[EngineLine]:
+    """
+    One python-chess info dict as an EngineLine (None without a score).
+    """
+    score = info.get("score")
+    if score is None:
+        return None
+
+    cp = score.white().score(mate_score=10000)
+    return EngineLine(
+        score_cp=cp if cp is not None else 0,
+        pv=tuple(info.get("pv") or ()),
+    )
+
+
+class SearchService:
+    """
+    Single entry point for engine searches.
+    Lookup order: in-memory cache -> on-disk store -> engine.
+    """
+
+    def __init__(
+        self,
+        eval_cache: Optional[EvalCache] = None,
+        eval_store: Optional[SqliteEvalStore] = None,
+    ):
+        self._eval_cache = eval_cache
+        self._eval_store = eval_store
+        self._stop_reasons: Counter = Counter()
+        self.cancelled = 0
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    async def search(
+        self,
+        engine,
+        board: chess.Board,
+        depth: int,
+        multipv: int = 1,
+        use_cache: bool = True,
+        time_limit: Optional[float] = None,
+        convergence: Optional[ConvergenceCriteria] = None,
+    ) -> PositionEval:
+        """
+        Depth-limited search of the given position.
+
+        With time_limit (seconds) the search may stop before depth, and
+        with convergence it stops once score and best move have settled;
+        the result then records the depth actually reached and why the
+        search stopped.
+
+        use_cache=False must be passed while the engine is strength
+        limited, those results are not reusable by other requests.
+        """
+        cache = self._eval_cache if use_cache else None
+        store = self._eval_store if use_cache else None
+        key = (
+            chess.polyglot.zobrist_hash(board)
+            if cache is not None or store is not None
+            else None
+        )
+
+        if cache is not None:
+            cached = cache.get(key, depth, multipv)
+            if cached is not None:
+                return self._counted(cached, SearchStopReason.CACHE)
+
+        if store is not None:
+            stored = await asyncio.to_thread(store.get, key, depth, multipv)
+            if stored is not None:
+                if cache is not None:
+                    cache.put(key, stored)
+                return self._counted(stored, SearchStopReason.CACHE)
+
+        limit = chess.engine.Limit(depth=depth, time=time_limit)
+
+        # Cancelling a search sends the engine "stop"
+        try:
+            if convergence is not None:
+                result, stop_reason = await engine.guard(
+                    self._converging_search(
+                        engine,
+                        board,
+                        limit,
+                        multipv,
+                        convergence,
+                    )
+                )
+            else:
+                result = await engine.analyze(board, limit, multipv=multipv)
+                stop_reason = SearchStopReason.DEPTH
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        reached = (
+            self._reached_depth(result)
+            if time_limit is not None or convergence is not None
+            else depth
+        )
+        if stop_reason == SearchStopReason.DEPTH and reached < depth:
+            stop_reason = SearchStopReason.TIME
+
+        evaluation = self._counted(
+            self._to_position_eval(result, reached, multipv),
+            stop_reason,
+        )
+        if stop_reason == SearchStopReason.CONVERGED:
+            # Reused for the depth asked for, reports the depth reached
+            evaluation = replace(evaluation, target_depth=depth)
+
+        if cache is not None:
+            cache.put(key, evaluation)
+        if store is not None:
+            await asyncio.to_thread(store.put, key, evaluation)
+
+        return evaluation
+
+    def preload(self, limit: int) -> int:
+        """
+        Warm the memory cache with the hottest entries of the store.
+        """
+        if self._eval_cache is None or self._eval_store is None:
+            return 0
+
+        entries = self._eval_store.hottest(limit)
+        for key, evaluation in entries:
+            self._eval_cache.put(key, evaluation)
+
+        return len(entries)
+
+    def close(self) -> None:
+        if self._eval_store is not None:
+            self._eval_store.close()
+
+    async def stats(self) -> dict:
+        return {
+            "eval_cache": (
+                self._eval_cache.stats()
+                if self._eval_cache is not None
+                else None
+            ),
+            # Counts rows: off the event loop like the other store calls
+            "eval_store": (
+                await asyncio.to_thread(self._eval_store.stats)
+                if self._eval_store is not None
+                else None
+            ),
+            "stop_reasons": dict(self._stop_reasons),
+            "cancelled": self.cancelled,
+        }
+
+    # -------------------------------------------------
+    # Helpers
+    # -------------------------------------------------
+
+    async def _converging_search(
+        self,
+        engine,
+        board: chess.Board,
+        limit: chess.engine.Limit,
+        multipv: int,
+        convergence: ConvergenceCriteria,
+    ) -> Tuple[list, SearchStopReason]:
+        """
+        Follow the engine's iterative deepening and stop it as soon as
+        the principal line has converged.
+        """
+        tracker = ConvergenceTracker(convergence)
+        stop_reason = SearchStopReason.DEPTH
+
+        analysis = await engine.analysis(board, limit, multipv=multipv)
+        with analysis:
+            async for info in analysis:
+                # Only completed iterations of the principal line
+                if (
+                    info.get("multipv", 1) != 1
+                    or info.get("lowerbound")
+                    or info.get("upperbound")
+                    or "depth" not in info
+                    or "score" not in info
+                    or not info.get("pv")
+                ):
+                    continue
+
+                cp = info["score"].white().score(mate_score=10000)
+                if tracker.update(info["depth"], cp, info["pv"][0]):
+                    stop_reason = SearchStopReason.CONVERGED
+                    analysis.stop()
+                    break
+
+            await analysis.wait()
+
+        return analysis.multipv, stop_reason
+
+    def _counted(
+        self,
+        evaluation: PositionEval,
+        stop_reason: SearchStopReason,
+    ) -> PositionEval:
+        self._stop_reasons[stop_reason.value] += 1
+
+        if evaluation.stop_reason == stop_reason:
+            return evaluation
+        return replace(evaluation, stop_reason=stop_reason)
+
+    def _reached_depth(self, result) -> int:
+        """
+        Deepest iteration completed by every line of a stopped search.
+        """
+        if isinstance(result, dict):
+            result = [result]
+
+        depths = [info["depth"] for info in result or [] if "depth" in info]
+
+        return min(depths) if depths else 0
+
+    def _to_position_eval(
+        self,
+        result,
+        depth: int,
+        multipv: int,
+    ) -> PositionEval:
+        """
+        Normalize python-chess (multipv) output to a PositionEval.
+        """
+        if isinstance(result, dict):
+            result = [result]
+
+        lines = [
+            line
+            for line in map(engine_line, result or [])
+            if line is not None
+        ]
+
+        return PositionEval(
+            depth=depth,
+            multipv=multipv,
+            lines=tuple(lines),
+        )
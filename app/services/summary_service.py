@@ -1,11 +1,6 @@
 from app.domain.models import EvaluatedMove
-from app.domain.stats import (
-    acpl,
-    accuracy_percentage,
-    count_by_quality,
-)
+from app.domain.stats import PlayerTally, tally_moves
 from app.services.elo_service import EloService
-from app.domain.enums import MoveQuality
 
 
 class SummaryService:
@@ -18,44 +13,38 @@ class SummaryService:
         self.elo_service = EloService()
 
     # -------------------------------------------------
-    # Helpers
+    # Public API
     # -------------------------------------------------
 
-    def _player_move_count(
+    def summarize(self, moves: list[EvaluatedMove]) -> dict:
+        tallies = tally_moves(moves)
+
+        return self.summarize_tallies(tallies["white"], tallies["black"])
+
+    def summarize_tallies(
         self,
-        moves: list[EvaluatedMove],
-        color: str,
-    ) -> int:
+        white: PlayerTally,
+        black: PlayerTally,
+    ) -> dict:
         """
-        Counts only meaningful moves used for ELO estimation.
-        Must match ACPL / accuracy logic exactly.
+        Same summary as summarize(), from running per-player tallies
+        (lets a growing game be summarized without rescanning it).
         """
-        return sum(
-            1
-            for m in moves
-            if m.color == color
-            and m.quality != MoveQuality.BOOK
-        )
-
-    # -------------------------------------------------
-    # Public API
-    # -------------------------------------------------
-
-    def summarize(self, moves: list[EvaluatedMove]) -> dict:
         # -----------------------------
         # Metrics
         # -----------------------------
-        white_acpl = acpl(moves, "white")
-        black_acpl = acpl(moves, "black")
+        white_acpl = white.acpl
+        black_acpl = black.acpl
 
-        white_acc = accuracy_percentage(moves, "white")
-        black_acc = accuracy_percentage(moves, "black")
+        white_acc = white.accuracy
+        black_acc = black.accuracy
 
-        white_counts = count_by_quality(moves, "white")
-        black_counts = count_by_quality(moves, "black")
+        white_counts = white.counts()
+        black_counts = black.counts()
 
-        white_move_count = self._player_move_count(moves, "white")
-        black_move_count = self._player_move_count(moves, "black")
+        # Only meaningful (non-BOOK) moves, same as ACPL / accuracy
+        white_move_count = white.moves
+        black_move_count = black.moves
 
         # -----------------------------
         # Raw ELO estimation
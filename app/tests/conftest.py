@@ -0,0 +1,19 @@
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+
+FAKE_ENGINE = Path(__file__).with_name("fake_engine.py")
+
+
+@pytest.fixture(scope="session")
+def engine_path(tmp_path_factory) -> str:
+    """
+    Executable running fake_engine.py with this interpreter.
+    """
+    path = tmp_path_factory.mktemp("engine") / "fake_engine"
+    path.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_ENGINE}"\n')
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Minimal UCI engine for the tests: legal moves in generation order
+with scores derived from the position, a few ms per iteration.
+
+Deterministic, so sequential and parallel runs can be compared.
+"""
+import sys
+import threading
+import time
+import zlib
+
+import chess
+
+
+ITERATION_SECONDS = 0.002
+DEFAULT_DEPTH = 10
+
+
+class FakeEngine:
+    def __init__(self):
+        self.board = chess.Board()
+        self.multipv = 1
+        self.stop = threading.Event()
+        self.search: threading.Thread = None
+
+    def out(self, line: str) -> None:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+    def score(self, move: chess.Move, rank: int) -> int:
+        seed = zlib.crc32(f"{self.board.fen()} {move.uci()}".encode())
+        return seed % 101 - 50 - rank * 20
+
+    def run(self, depth, movetime, infinite) -> None:
+        moves = list(self.board.legal_moves)
+        lines = max(1, min(self.multipv, len(moves)))
+        start = time.monotonic()
+        best = None
+
+        for d in range(1, (depth or 100) + 1):
+            if self.stop.is_set():
+                break
+            if movetime is not None and time.monotonic() - start > movetime:
+                break
+            time.sleep(ITERATION_SECONDS)
+
+            if not moves:
+                score = "mate 0" if self.board.is_checkmate() else "cp 0"
+                self.out(f"info depth 0 score {score}")
+                break
+
+            for rank, move in enumerate(moves[:lines]):
+                after = self.board.copy(stack=False)
+                after.push(move)
+                reply = next(iter(after.legal_moves), None)
+                pv = move.uci() + (f" {reply.uci()}" if reply else "")
+                self.out(
+                    f"info depth {d} seldepth {d} multipv {rank + 1} "
+                    f"score cp {self.score(move, rank)} nodes 100 pv {pv}"
+                )
+            best = moves[0]
+
+        if infinite:
+            self.stop.wait()
+        self.out(f"bestmove {best.uci() if best else '(none)'}")
+
+    def position(self, parts) -> None:
+        if parts[1] == "startpos":
+            self.board = chess.Board()
+            rest = parts[2:]
+        else:
+            end = parts.index("moves") if "moves" in parts else len(parts)
+            self.board = chess.Board(" ".join(parts[2:end]))
+            rest = parts[end:]
+
+        for uci in rest[1:]:
+            self.board.push_uci(uci)
+
+    def go(self, parts) -> None:
+        def arg(name):
+            return parts[parts.index(name) + 1] if name in parts else None
+
+        depth = int(arg("depth")) if arg("depth") else None
+        movetime = int(arg("movetime")) / 1000 if arg("movetime") else None
+        infinite = "infinite" in parts
+        if not depth and movetime is None and not infinite:
+            depth = DEFAULT_DEPTH
+
+        self.stop.clear()
+        self.search = threading.Thread(
+            target=self.run,
+            args=(depth, movetime, infinite),
+        )
+        self.search.start()
+
+    def loop(self) -> None:
+        for line in sys.stdin:
+            parts = line.split()
+            if not parts:
+                continue
+
+            command = parts[0]
+            if command == "uci":
+                self.out("id name FakeEngine")
+                for option in (
+                    "Threads type spin default 1 min 1 max 512",
+                    "Hash type spin default 16 min 1 max 33554432",
+                    "MultiPV type spin default 1 min 1 max 500",
+                    "UCI_LimitStrength type check default false",
+                    "UCI_Elo type spin default 1320 min 1320 max 3190",
+                ):
+                    self.out(f"option name {option}")
+                self.out("uciok")
+            elif command == "isready":
+                self.out("readyok")
+            elif command == "setoption" and "MultiPV" in parts:
+                self.multipv = int(parts[parts.index("value") + 1])
+            elif command == "position":
+                self.position(parts)
+            elif command == "go":
+                self.go(parts)
+            elif command == "stop":
+                self.stop.set()
+                if self.search is not None:
+                    self.search.join()
+            elif command == "quit":
+                break
+
+
+if __name__ == "__main__":
+    FakeEngine().loop()
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from app.infrastructure.stockfish.async_pool import AsyncStockfishEnginePool
+from app.infrastructure.stockfish.pools import EnginePools, Workload
+
+
+PGN = (
+    "1. d4 d5 2. c4 e6 3. Nc3 Nf6 4. Bg5 Be7 5. e3 O-O 6. Nf3 h6 "
+    "7. Bh4 b6 8. cxd5 Nxd5 9. Bxe7 Qxe7 10. Nxd5 exd5 *"
+)
+
+
+def make_pool(
+    path: str,
+    size: int = 1,
+    priority_aging: float = 0,
+    search_timeout: Optional[float] = 10,
+) -> AsyncStockfishEnginePool:
+    return AsyncStockfishEnginePool(
+        path=path,
+        size=size,
+        threads=1,
+        hash_mb=16,
+        search_timeout=search_timeout,
+        ping_timeout=2,
+        priority_aging=priority_aging,
+        autoscale=False,
+    )
+
+
+def analysis_pools(pool: AsyncStockfishEnginePool) -> EnginePools:
+    return EnginePools({Workload.ANALYSIS: pool})
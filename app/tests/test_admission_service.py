@@ -0,0 +1,227 @@
+import asyncio
+import functools
+import io
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.admission import too_busy
+from app.domain.enums import JobStatus
+from app.services.admission_service import (
+    AdmissionController,
+    AdmissionRejected,
+)
+from app.services.analysis_service import AnalysisService
+from app.services.batch_analysis_service import BatchAnalysisService
+from app.services.job_service import AnalysisJobScheduler
+from app.services.search_service import SearchService
+from app.tests.support import PGN, analysis_pools, make_pool
+
+
+def test_accepted_batch_and_job_complete_with_a_full_queue(engine_path):
+    async def main():
+        pool = make_pool(engine_path)
+        await pool.create()
+
+        admission = AdmissionController(
+            pool,
+            max_queue=2,
+            ply_seconds=0.01,
+            fair=True,
+        )
+        analysis = AnalysisService(analysis_pools(pool), SearchService())
+        scheduler = AnalysisJobScheduler(
+            analysis,
+            workers=1,
+            result_ttl=60,
+            max_retained=10,
+            admission=admission,
+        )
+        await scheduler.start()
+
+        try:
+            # One request running, interactive requests fill the queue
+            held = await admission.enter("busy", 1, max_wait=1)
+            interactive = [
+                asyncio.create_task(admission.enter(f"user{i}", 1, 60))
+                for i in range(2)
+            ]
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected):
+                admission.check("late", max_wait=60)
+
+            # Accepted earlier: they queue behind without a place
+            batch = BatchAnalysisService(
+                analysis,
+                max_concurrent=2,
+                admit=functools.partial(
+                    admission.admit,
+                    "batch",
+                    max_wait=math.inf,
+                    bounded=False,
+                ),
+            )
+            job = scheduler.submit(PGN, depth=2, client="jobs")
+
+            async def collect():
+                games = io.StringIO(f"{PGN}\n\n{PGN}\n")
+                return [r async for r in batch.iter_results(games, 2)]
+
+            results = asyncio.create_task(collect())
+            await asyncio.sleep(0.2)
+
+            stats = admission.stats()
+            assert stats["queued"] == 5
+            assert stats["queued_unbounded"] == 3
+            assert admission.evicted == 0
+
+            admission.leave(held)
+            for task in interactive:
+                admission.leave(await task)
+
+            done = await asyncio.wait_for(results, 30)
+            while job.status not in (JobStatus.DONE, JobStatus.FAILED):
+                await asyncio.sleep(0.01)
+        finally:
+            await scheduler.stop()
+            await pool.shutdown()
+
+        assert [r.error for r in done] == [None, None]
+        assert all(len(r.moves) == 20 for r in done)
+        assert job.status == JobStatus.DONE
+        assert admission.rejected == 1
+        assert admission.stats()["queued"] == 0
+
+    asyncio.run(main())
+
+
+def one_slot_pool() -> SimpleNamespace:
+    """
+    All the controller reads of a pool: its shared size.
+    """
+    return SimpleNamespace(shared_size=1)
+
+
+async def served_order(admission, clients):
+    """
+    Queue one request per entry of `clients` behind a running one and
+    return the clients in the order they got the slot.
+    """
+    served = []
+
+    async def request(client):
+        async with admission.admit(client, 1, max_wait=60):
+            served.append(client)
+
+    held = await admission.enter("held", 1, max_wait=1)
+    tasks = [asyncio.create_task(request(c)) for c in clients]
+    await asyncio.sleep(0)
+    admission.leave(held)
+    await asyncio.gather(*tasks)
+    return served
+
+
+def test_fair_queuing_serves_clients_round_robin():
+    async def main():
+        fair = AdmissionController(
+            one_slot_pool(),
+            max_queue=10,
+            ply_seconds=0.01,
+            fair=True,
+        )
+        fifo = AdmissionController(
+            one_slot_pool(),
+            max_queue=10,
+            ply_seconds=0.01,
+        )
+        clients = ["a", "a", "a", "b", "c"]
+
+        assert await served_order(fair, clients) == ["a", "b", "c", "a", "a"]
+        assert await served_order(fifo, clients) == clients
+
+    asyncio.run(main())
+
+
+def test_full_queue_evicts_the_newest_request_of_the_longest_client():
+    async def main():
+        admission = AdmissionController(
+            one_slot_pool(),
+            max_queue=3,
+            ply_seconds=0.01,
+            fair=True,
+        )
+        held = await admission.enter("held", 1, max_wait=1)
+        heavy = [
+            asyncio.create_task(admission.enter("heavy", 1, 60))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+
+        light = asyncio.create_task(admission.enter("light", 1, 60))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await heavy[2]
+        assert admission.evicted == 1
+
+        # heavy 2, light 1: no longer worth evicting for light
+        with pytest.raises(AdmissionRejected, match="full"):
+            await admission.enter("light", 1, 60)
+
+        admission.leave(held)
+        for task in (heavy[0], light, heavy[1]):     # round-robin
+            admission.leave(await task)
+
+        stats = admission.stats()
+        assert (stats["queued"], stats["active"]) == (0, 0)
+        assert (stats["rejected"], stats["evicted"]) == (1, 1)
+
+    asyncio.run(main())
+
+
+def test_request_is_rejected_when_its_expected_wait_is_too_long():
+    async def main():
+        admission = AdmissionController(
+            one_slot_pool(),
+            max_queue=10,
+            ply_seconds=1.0,
+        )
+        held = await admission.enter("held", 10, max_wait=1)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.enter("late", 1, max_wait=5)
+        assert rejected.value.retry_after == 10
+        with pytest.raises(AdmissionRejected):
+            admission.check("late", max_wait=5)
+
+        response = too_busy(rejected.value)
+        assert response.status_code == 429
+        assert response.headers == {"Retry-After": "10"}
+
+        admission.check("patient", max_wait=60)
+        admission.leave(held)
+        assert admission.rejected == 2
+        assert admission.expected_wait() == 0.0
+
+    asyncio.run(main())
+
+
+def test_request_is_rejected_when_the_queue_does_not_move_in_time():
+    async def main():
+        admission = AdmissionController(
+            one_slot_pool(),
+            max_queue=10,
+            ply_seconds=0.001,
+        )
+        held = await admission.enter("held", 1, max_wait=1)
+
+        with pytest.raises(AdmissionRejected, match="in time"):
+            await admission.enter("waiting", 1, max_wait=0.05)
+
+        stats = admission.stats()
+        assert (stats["queued"], stats["rejected"]) == (0, 1)
+        admission.leave(held)
+        assert admission.stats()["active"] == 0
+
+    asyncio.run(main())
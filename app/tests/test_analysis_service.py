@@ -0,0 +1,106 @@
+import asyncio
+
+from app.infrastructure.cache.game_cache import GameAnalysisCache
+from app.infrastructure.stockfish.async_pool import AcquirePriority
+from app.services.analysis_service import AnalysisService
+from app.services.search_service import SearchService
+from app.tests.support import PGN, analysis_pools, make_pool
+
+
+def test_parallel_results_come_in_job_order_and_match_sequential(
+    engine_path,
+):
+    async def main():
+        pool = make_pool(engine_path, size=3)
+        await pool.create()
+        analysis = AnalysisService(analysis_pools(pool), SearchService())
+
+        try:
+            jobs, _ = analysis._schedule(analysis.plan_pgn(PGN), depth=4)
+            sequential = [
+                e
+                async for e in analysis._evaluate_sequential(
+                    jobs,
+                    AcquirePriority.NORMAL,
+                )
+            ]
+            parallel = [
+                e
+                async for e in analysis._evaluate_parallel(
+                    jobs,
+                    workers=3,
+                    priority=AcquirePriority.NORMAL,
+                )
+            ]
+        finally:
+            await pool.shutdown()
+
+        assert len(jobs) > 3
+        assert parallel == sequential
+        assert [e.best_move for e in parallel] == [
+            next(iter(board.legal_moves)) for board, _, _ in jobs
+        ]
+
+    asyncio.run(main())
+
+
+def test_parallel_evaluation_can_stop_early(engine_path):
+    async def main():
+        pool = make_pool(engine_path, size=2)
+        await pool.create()
+        analysis = AnalysisService(analysis_pools(pool), SearchService())
+
+        try:
+            jobs, _ = analysis._schedule(analysis.plan_pgn(PGN), depth=4)
+            evaluations = analysis._evaluate_parallel(
+                jobs,
+                workers=2,
+                priority=AcquirePriority.NORMAL,
+            )
+            await anext(evaluations)
+            await evaluations.aclose()
+
+            stats = pool.stats()
+        finally:
+            await pool.shutdown()
+
+        assert stats["idle"] == stats["size"] == 2
+
+    asyncio.run(main())
+
+
+def test_resumed_analysis_matches_a_full_one(engine_path):
+    prefix_pgn = "1. d4 d5 2. c4 e6 3. Nc3 Nf6 4. Bg5 Be7 5. e3 O-O *"
+
+    async def main():
+        pool = make_pool(engine_path)
+        await pool.create()
+        game_cache = GameAnalysisCache(max_entries=10)
+        resuming = AnalysisService(
+            analysis_pools(pool),
+            SearchService(),
+            game_cache,
+        )
+        fresh = AnalysisService(analysis_pools(pool), SearchService())
+
+        try:
+            prefix = await resuming.analyze_pgn_snapshot(prefix_pgn, 4)
+            resumed = await resuming.analyze_pgn_snapshot(PGN, 4)
+            again = await resuming.analyze_pgn_snapshot(PGN, 4)
+            full = await fresh.analyze_pgn_snapshot(PGN, 4)
+        finally:
+            await pool.shutdown()
+
+        assert prefix.plies == 10
+        assert game_cache.plies_reused == 10 + 20
+        assert again is resumed
+        assert resumed.base is prefix
+
+        assert resumed.plies == full.plies == 20
+        assert resumed.moves == full.moves
+        assert resumed.key_moments == full.key_moments
+        assert resumed.tallies == full.tallies
+        assert resumed.opening == full.opening
+        assert resumed.assembler == full.assembler
+
+    asyncio.run(main())
@@ -0,0 +1,226 @@
+import asyncio
+import time
+from typing import List
+
+import chess
+import chess.engine
+import pytest
+
+from app.infrastructure.stockfish.async_pool import (
+    AcquirePriority,
+    AsyncStockfishEnginePool,
+    CircuitBreaker,
+)
+from app.tests.support import make_pool
+
+
+async def queue_acquires(
+    pool: AsyncStockfishEnginePool,
+    priorities: List[AcquirePriority],
+    served: List[AcquirePriority],
+    gap: float = 0.01,
+) -> List[asyncio.Task]:
+    """
+    Start one acquire per priority, in order, `gap` seconds apart.
+    Each records its priority once served and releases at once.
+    """
+    async def take(priority: AcquirePriority) -> None:
+        engine = await pool.acquire(timeout=10, priority=priority)
+        served.append(priority)
+        await pool.release(engine)
+
+    tasks = []
+    for priority in priorities:
+        tasks.append(asyncio.create_task(take(priority)))
+        await asyncio.sleep(gap)
+    return tasks
+
+
+def test_waiters_are_served_by_priority_class_then_age(engine_path):
+    async def main():
+        pool = make_pool(engine_path)
+        await pool.create()
+        served: List[AcquirePriority] = []
+
+        try:
+            held = await pool.acquire(priority=AcquirePriority.LOW)
+            tasks = await queue_acquires(
+                pool,
+                [
+                    AcquirePriority.LOW,
+                    AcquirePriority.NORMAL,
+                    AcquirePriority.HIGH,
+                    AcquirePriority.NORMAL,
+                ],
+                served,
+            )
+
+            assert pool.should_yield(AcquirePriority.LOW)
+            assert pool.should_yield(AcquirePriority.NORMAL)
+            assert not pool.should_yield(AcquirePriority.HIGH)
+            assert pool.stats()["waiting_by_priority"] == {
+                "high": 1,
+                "normal": 2,
+                "low": 1,
+            }
+
+            await pool.release(held)
+            await asyncio.wait_for(asyncio.gather(*tasks), 10)
+        finally:
+            await pool.shutdown()
+
+        assert served == [
+            AcquirePriority.HIGH,
+            AcquirePriority.NORMAL,
+            AcquirePriority.NORMAL,
+            AcquirePriority.LOW,
+        ]
+
+    asyncio.run(main())
+
+
+def test_long_waiting_low_priority_ages_past_high(engine_path):
+    async def main():
+        # One class per 50 ms of waiting
+        pool = make_pool(engine_path, priority_aging=0.05)
+        await pool.create()
+        served: List[AcquirePriority] = []
+
+        try:
+            held = await pool.acquire()
+            tasks = await queue_acquires(
+                pool,
+                [AcquirePriority.LOW, AcquirePriority.HIGH],
+                served,
+                gap=0.2,
+            )
+
+            await pool.release(held)
+            await asyncio.wait_for(asyncio.gather(*tasks), 10)
+        finally:
+            await pool.shutdown()
+
+        assert served == [AcquirePriority.LOW, AcquirePriority.HIGH]
+
+    asyncio.run(main())
+
+
+def test_timed_out_waiter_leaves_the_queue(engine_path):
+    async def main():
+        pool = make_pool(engine_path)
+        await pool.create()
+
+        try:
+            held = await pool.acquire()
+            with pytest.raises(RuntimeError):
+                await pool.acquire(timeout=0.05, priority=AcquirePriority.HIGH)
+
+            assert not pool.should_yield(AcquirePriority.LOW)
+            await pool.release(held)
+            stats = pool.stats()
+        finally:
+            await pool.shutdown()
+
+        assert (stats["idle"], stats["waiting"]) == (1, 0)
+
+    asyncio.run(main())
+
+
+def test_crashed_engine_is_replaced_on_release(engine_path):
+    async def main():
+        pool = make_pool(engine_path)
+        await pool.create()
+
+        try:
+            engine = await pool.acquire()
+            engine._transport.kill()
+            await asyncio.sleep(0.05)
+            await pool.release(engine)
+
+            replacement = await pool.acquire(timeout=10)
+            result = await replacement.analyze(
+                chess.Board(),
+                chess.engine.Limit(depth=2),
+            )
+            await pool.release(replacement)
+            stats = pool.stats()
+        finally:
+            await pool.shutdown()
+
+        assert replacement is not engine
+        assert result["depth"] == 2
+        assert (stats["failures"], stats["restarts"]) == (1, 1)
+        assert (stats["size"], stats["idle"]) == (1, 1)
+
+    asyncio.run(main())
+
+
+def test_acquire_skips_an_engine_that_died_idle(engine_path):
+    async def main():
+        pool = make_pool(engine_path, size=2)
+        await pool.create()
+
+        try:
+            dead, alive = list(pool._idle)
+            dead._transport.kill()
+            await asyncio.sleep(0.05)
+
+            engine = await pool.acquire(timeout=10)
+            assert engine is alive
+            await pool.release(engine)
+
+            while pool.restarts < 1:
+                await asyncio.sleep(0.01)
+            stats = pool.stats()
+        finally:
+            await pool.shutdown()
+
+        assert stats["failures"] == 1
+        assert (stats["size"], stats["idle"]) == (2, 2)
+
+    asyncio.run(main())
+
+
+def test_hung_search_times_out_and_the_engine_is_replaced(engine_path):
+    async def main():
+        pool = make_pool(engine_path, search_timeout=0.05)
+        await pool.create()
+
+        try:
+            engine = await pool.acquire()
+            with pytest.raises(RuntimeError):
+                await engine.analyze(
+                    chess.Board(),
+                    chess.engine.Limit(depth=1000),
+                )
+            assert engine.broken
+            await pool.release(engine)
+
+            async with pool.engine(timeout=10) as replacement:
+                assert replacement.alive
+            stats = pool.stats()
+        finally:
+            await pool.shutdown()
+
+        assert (stats["failures"], stats["restarts"]) == (1, 1)
+
+    asyncio.run(main())
+
+
+def test_breaker_opens_on_repeated_failures_and_closes_on_success():
+    breaker = CircuitBreaker(threshold=2, window=10, cooldown=0.05)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert (breaker.state, breaker.trips) == ("open", 1)
+    assert breaker.retry_in() > 0
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    breaker.record_failure()            # failed attempt: another cooldown
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.record_success()
+    assert (breaker.state, breaker.retry_in()) == ("closed", 0.0)
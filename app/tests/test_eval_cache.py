@@ -0,0 +1,67 @@
+import chess
+
+from app.domain.enums import SearchStopReason
+from app.domain.evaluation import EngineLine, PositionEval
+from app.infrastructure.cache.eval_cache import EvalCache
+
+
+def evaluation(depth: int, multipv: int = 1, **kwargs) -> PositionEval:
+    line = EngineLine(depth * 10, (chess.Move.from_uci("e2e4"),))
+    return PositionEval(depth, (line,) * multipv, multipv, **kwargs)
+
+
+def test_entry_answers_requests_not_deeper_or_wider():
+    cache = EvalCache(max_entries=10)
+    cache.put(1, evaluation(12, multipv=3))
+
+    assert cache.get(1, depth=8) is not None
+    assert cache.get(1, depth=12, multipv=3) is not None
+    assert cache.get(1, depth=13) is None
+    assert cache.get(1, depth=8, multipv=4) is None
+    assert cache.get(2, depth=1) is None
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_converged_search_answers_its_requested_depth():
+    cache = EvalCache(max_entries=10)
+    cache.put(
+        1,
+        evaluation(
+            9,
+            stop_reason=SearchStopReason.CONVERGED,
+            target_depth=16,
+        ),
+    )
+
+    assert cache.get(1, depth=16) is not None
+    assert cache.get(1, depth=17) is None
+
+
+def test_put_never_replaces_a_dominating_entry():
+    cache = EvalCache(max_entries=10)
+    deep = evaluation(16, multipv=2)
+    cache.put(1, deep)
+
+    cache.put(1, evaluation(10))
+    cache.put(1, evaluation(16, multipv=2))
+    assert cache.get(1, depth=1) is deep
+
+    # Deeper but narrower replaces it
+    deeper = evaluation(20)
+    cache.put(1, deeper)
+    assert cache.get(1, depth=20) is deeper
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EvalCache(max_entries=2)
+    cache.put(1, evaluation(10))
+    cache.put(2, evaluation(10))
+
+    assert cache.get(1, depth=10) is not None     # 2 is now the oldest
+    cache.put(3, evaluation(10))
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.get(2, depth=1) is None
+    assert cache.get(1, depth=1) is not None
+    assert cache.get(3, depth=1) is not None
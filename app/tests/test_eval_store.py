@@ -0,0 +1,118 @@
+import sqlite3
+
+import chess
+
+from app.domain.enums import SearchStopReason
+from app.domain.evaluation import EngineLine, PositionEval
+from app.infrastructure.cache.eval_store import SqliteEvalStore
+
+
+def evaluation(depth: int, multipv: int = 1, **kwargs) -> PositionEval:
+    line = EngineLine(depth * 10, (chess.Move.from_uci("e2e4"),))
+    return PositionEval(depth, (line,) * multipv, multipv, **kwargs)
+
+
+def test_put_replaces_only_with_a_deeper_or_wider_result(tmp_path):
+    store = SqliteEvalStore(str(tmp_path / "evals.db"), max_entries=100)
+    key = (1 << 64) - 1          # unsigned Zobrist hash past int64
+
+    store.put(key, evaluation(16, multipv=2))
+    store.put(key, evaluation(10))
+    assert store.get(key, depth=16, multipv=2).score == 1.6
+
+    store.put(key, evaluation(20))
+    stored = store.get(key, depth=20)
+    assert stored.depth == 20
+    assert stored.multipv == 1
+    assert store.get(key, depth=21) is None
+    store.close()
+
+
+def test_converged_result_round_trips(tmp_path):
+    store = SqliteEvalStore(str(tmp_path / "evals.db"), max_entries=100)
+    store.put(
+        1,
+        evaluation(
+            9,
+            stop_reason=SearchStopReason.CONVERGED,
+            target_depth=16,
+        ),
+    )
+
+    stored = store.get(1, depth=16)
+    assert (stored.depth, stored.target_depth) == (9, 16)
+    assert stored.covered_depth == 16
+    store.close()
+
+
+def test_files_without_the_reached_column_are_migrated(tmp_path):
+    path = str(tmp_path / "evals.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE evals (
+            key        INTEGER PRIMARY KEY,
+            depth      INTEGER NOT NULL,
+            multipv    INTEGER NOT NULL,
+            lines      TEXT    NOT NULL,
+            hits       INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL    NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO evals VALUES (1, 12, 1, '[[25, \"e2e4 e7e5\"]]', 0, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = SqliteEvalStore(path, max_entries=100)
+
+    old = store.get(1, depth=12)
+    assert (old.depth, old.target_depth, old.score) == (12, None, 0.25)
+
+    store.put(
+        2,
+        evaluation(
+            9,
+            stop_reason=SearchStopReason.CONVERGED,
+            target_depth=16,
+        ),
+    )
+    assert store.get(2, depth=16).depth == 9
+    store.close()
+
+
+def test_compaction_keeps_the_hottest_rows(tmp_path):
+    store = SqliteEvalStore(
+        str(tmp_path / "evals.db"),
+        max_entries=10,
+        compact_every=1000,
+    )
+    for key in range(12):
+        store.put(key, evaluation(10))
+    for key in range(6, 12):
+        store.get(key, depth=10)
+
+    assert store.compact() == 3            # down to 90% of the cap
+    assert store.stats()["entries"] == 9
+    assert store.compactions == 1
+    assert [k for k in range(12) if store.get(k, depth=1)] == list(
+        range(3, 12)
+    )
+    assert store.compact() == 0
+    store.close()
+
+
+def test_compaction_runs_every_compact_every_writes(tmp_path):
+    store = SqliteEvalStore(
+        str(tmp_path / "evals.db"),
+        max_entries=4,
+        compact_every=5,
+    )
+    for key in range(5):
+        store.put(key, evaluation(10))
+
+    assert store.compactions == 1
+    assert store.stats()["entries"] == 3
+    store.close()
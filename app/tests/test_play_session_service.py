@@ -0,0 +1,62 @@
+import asyncio
+
+import chess
+
+from app.services.play_service import PlayService
+from app.services.play_session_service import PlaySessionManager
+from app.tests.support import analysis_pools, make_pool
+
+
+def test_ponder_hits_and_misses_are_counted(engine_path):
+    async def main():
+        pool = make_pool(engine_path, size=2)
+        await pool.create()
+        pools = analysis_pools(pool)
+        sessions = PlaySessionManager(
+            pools,
+            PlayService(pools),
+            idle_timeout=60,
+            max_sessions=1,
+            acquire_timeout=5,
+        )
+        await sessions.start()
+
+        try:
+            session = await sessions.create(chess.STARTING_FEN, depth=3)
+            first = await sessions.move(session)
+
+            # The fake engine expects the first legal reply
+            board = session.board
+            predicted = session.ponder.reply
+            assert predicted == next(iter(board.legal_moves))
+
+            after = board.copy()
+            after.push(predicted)
+            answer = next(iter(after.legal_moves))
+            hit = await sessions.move(session, predicted.uci())
+            assert hit["engine_move_uci"] == answer.uci()
+
+            other = list(board.legal_moves)[-1]
+            assert other != session.ponder.reply
+            miss = await sessions.move(session, other.uci())
+
+            stats = sessions.stats()
+            assert session.ponder is not None
+        finally:
+            await sessions.stop()
+            pool_stats = pool.stats()
+            await pool.shutdown()
+
+        assert [r["ponder_hit"] for r in (first, hit, miss)] == [
+            False,
+            True,
+            False,
+        ]
+        assert (stats["ponder_hits"], stats["ponder_misses"]) == (1, 1)
+        assert stats["ponder_hit_rate"] == 0.5
+
+        # Closing stopped the last ponder and gave the engine back
+        assert sessions.stats()["closed"] == 1
+        assert (pool_stats["idle"], pool_stats["bound"]) == (2, 0)
+
+    asyncio.run(main())